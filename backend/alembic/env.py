@@ -22,7 +22,12 @@ from app.models import (
     Expense,
     Transaction,
     Invoice,
+    InvoiceSequence,
     Prediction,
+    BalanceCheckpoint,
+    EmailOutbox,
+    EarningFeature,
+    EarningFeatureState,
 )
 
 # this is the Alembic Config object
@@ -0,0 +1,221 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+user_tier = sa.Enum('FREE', 'CREATOR', 'PRO', 'BUSINESS', name='usertier')
+platform_type = sa.Enum(
+    'YOUTUBE', 'TIKTOK', 'INSTAGRAM', 'TWITCH', 'PATREON',
+    'ONLYFANS', 'SUBSTACK', 'SHOPIFY', 'OTHER',
+    name='platformtype',
+)
+expense_category = sa.Enum(
+    'EQUIPMENT', 'SOFTWARE', 'TRAVEL', 'MEALS', 'MARKETING', 'EDUCATION',
+    'OFFICE', 'PROFESSIONAL_SERVICES', 'INSURANCE', 'TEAM', 'OTHER',
+    name='expensecategory',
+)
+transaction_type = sa.Enum(
+    'DEPOSIT', 'WITHDRAWAL', 'TRANSFER', 'TAX_SAVINGS', 'CARD_PAYMENT',
+    'ACH_IN', 'ACH_OUT', 'REFUND',
+    name='transactiontype',
+)
+invoice_status = sa.Enum(
+    'DRAFT', 'SENT', 'VIEWED', 'PAID', 'OVERDUE', 'CANCELLED',
+    name='invoicestatus',
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('hashed_password', sa.String(), nullable=False),
+        sa.Column('full_name', sa.String(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('is_verified', sa.Boolean(), nullable=True),
+        sa.Column('tier', user_tier, nullable=False),
+        sa.Column('tax_withholding_rate', sa.Numeric(5, 2), nullable=True),
+        sa.Column('tax_savings_balance', sa.Numeric(12, 2), nullable=True),
+        sa.Column('country', sa.String(2), nullable=True),
+        sa.Column('timezone', sa.String(50), nullable=True),
+        sa.Column('currency', sa.String(3), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_login_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_users_id', 'users', ['id'])
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'connected_platforms',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('platform_type', platform_type, nullable=False),
+        sa.Column('access_token', sa.Text(), nullable=False),
+        sa.Column('refresh_token', sa.Text(), nullable=True),
+        sa.Column('token_expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('platform_user_id', sa.String(), nullable=True),
+        sa.Column('platform_username', sa.String(), nullable=True),
+        sa.Column('metadata', sa.JSON(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('last_synced_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_connected_platforms_id', 'connected_platforms', ['id'])
+
+    op.create_table(
+        'earnings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('platform_id', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Numeric(12, 2), nullable=False),
+        sa.Column('currency', sa.String(3), nullable=True),
+        sa.Column('earning_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('payout_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('earning_type', sa.String(50), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('tax_withheld', sa.Numeric(12, 2), nullable=True),
+        sa.Column('is_taxable', sa.Boolean(), nullable=True),
+        sa.Column('metadata', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['platform_id'], ['connected_platforms.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_earnings_id', 'earnings', ['id'])
+
+    op.create_table(
+        'expenses',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Numeric(12, 2), nullable=False),
+        sa.Column('currency', sa.String(3), nullable=True),
+        sa.Column('expense_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('category', expense_category, nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('vendor', sa.String(255), nullable=True),
+        sa.Column('is_deductible', sa.Boolean(), nullable=True),
+        sa.Column('deduction_percentage', sa.Numeric(5, 2), nullable=True),
+        sa.Column('receipt_url', sa.String(500), nullable=True),
+        sa.Column('receipt_filename', sa.String(255), nullable=True),
+        sa.Column('ocr_confidence', sa.Numeric(5, 2), nullable=True),
+        sa.Column('ai_suggested_category', expense_category, nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_expenses_id', 'expenses', ['id'])
+
+    op.create_table(
+        'transactions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Numeric(12, 2), nullable=False),
+        sa.Column('currency', sa.String(3), nullable=True),
+        sa.Column('transaction_type', transaction_type, nullable=False),
+        sa.Column('transaction_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('merchant', sa.String(255), nullable=True),
+        sa.Column('balance_before', sa.Numeric(12, 2), nullable=True),
+        sa.Column('balance_after', sa.Numeric(12, 2), nullable=True),
+        sa.Column('external_id', sa.String(255), nullable=True),
+        sa.Column('related_earning_id', sa.Integer(), nullable=True),
+        sa.Column('related_expense_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['related_earning_id'], ['earnings.id']),
+        sa.ForeignKeyConstraint(['related_expense_id'], ['expenses.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_transactions_id', 'transactions', ['id'])
+
+    op.create_table(
+        'invoices',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('invoice_number', sa.String(50), nullable=False),
+        sa.Column('status', invoice_status, nullable=True),
+        sa.Column('amount', sa.Numeric(12, 2), nullable=False),
+        sa.Column('currency', sa.String(3), nullable=True),
+        sa.Column('client_name', sa.String(255), nullable=False),
+        sa.Column('client_email', sa.String(255), nullable=True),
+        sa.Column('client_address', sa.Text(), nullable=True),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('invoice_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('due_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('paid_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('pdf_url', sa.String(500), nullable=True),
+        sa.Column('payment_method', sa.String(50), nullable=True),
+        sa.Column('payment_reference', sa.String(255), nullable=True),
+        sa.Column('reminder_sent_count', sa.Integer(), nullable=True),
+        sa.Column('last_reminder_sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('invoice_number'),
+    )
+    op.create_index('ix_invoices_id', 'invoices', ['id'])
+
+    op.create_table(
+        'predictions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('prediction_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('forecast_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('predicted_amount', sa.Numeric(12, 2), nullable=False),
+        sa.Column('confidence_interval_lower', sa.Numeric(12, 2), nullable=True),
+        sa.Column('confidence_interval_upper', sa.Numeric(12, 2), nullable=True),
+        sa.Column('model_version', sa.String(50), nullable=True),
+        sa.Column('model_type', sa.String(50), nullable=True),
+        sa.Column('features_used', sa.JSON(), nullable=True),
+        sa.Column('actual_amount', sa.Numeric(12, 2), nullable=True),
+        sa.Column('prediction_error', sa.Numeric(12, 2), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_predictions_id', 'predictions', ['id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_predictions_id', table_name='predictions')
+    op.drop_table('predictions')
+    op.drop_index('ix_invoices_id', table_name='invoices')
+    op.drop_table('invoices')
+    op.drop_index('ix_transactions_id', table_name='transactions')
+    op.drop_table('transactions')
+    op.drop_index('ix_expenses_id', table_name='expenses')
+    op.drop_table('expenses')
+    op.drop_index('ix_earnings_id', table_name='earnings')
+    op.drop_table('earnings')
+    op.drop_index('ix_connected_platforms_id', table_name='connected_platforms')
+    op.drop_table('connected_platforms')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_table('users')
+
+    bind = op.get_bind()
+    for enum in (invoice_status, transaction_type, expense_category, platform_type, user_tier):
+        enum.drop(bind, checkfirst=True)
@@ -0,0 +1,142 @@
+"""Partition earnings and transactions by month
+
+Converts the two append-only ledger tables into native PostgreSQL
+range-partitioned tables with one partition per calendar month.
+
+The partition key has to be part of every unique constraint, so the
+primary keys become (id, earning_date) and (id, transaction_date).
+Rows keep their ids from the original sequences. PostgreSQL can't
+reference a partitioned table by id alone, so this also drops the
+transactions.related_earning_id foreign key.
+
+Future partitions are created, and expired ones detached into the
+``archive`` schema, by PartitionService (see app/services/partition_service.py).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+# Months to create ahead of today so inserts never miss a partition
+PRECREATE_MONTHS = 3
+
+# table -> (partition key, foreign keys to recreate)
+PARTITIONED_TABLES = {
+    'earnings': (
+        'earning_date',
+        [('user_id', 'users'), ('platform_id', 'connected_platforms')],
+    ),
+    'transactions': (
+        'transaction_date',
+        [('user_id', 'users'), ('related_expense_id', 'expenses')],
+    ),
+}
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_of(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _create_partition(table: str, month: date) -> None:
+    next_month = _add_months(month, 1)
+    op.execute(
+        f"CREATE TABLE IF NOT EXISTS {table}_y{month.year:04d}m{month.month:02d} "
+        f"PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+        f"TO ('{next_month.isoformat()} 00:00:00+00')"
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    op.execute("CREATE SCHEMA IF NOT EXISTS archive")
+    op.execute(
+        "ALTER TABLE transactions "
+        "DROP CONSTRAINT IF EXISTS transactions_related_earning_id_fkey"
+    )
+
+    this_month = _month_of(datetime.utcnow())
+
+    for table, (key, foreign_keys) in PARTITIONED_TABLES.items():
+        legacy = f"{table}_unpartitioned"
+
+        op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        op.execute(f"ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey")
+        op.execute(f"ALTER INDEX ix_{table}_id RENAME TO ix_{legacy}_id")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE ({key})"
+        )
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, {key})")
+        for column, referenced in foreign_keys:
+            op.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_fkey "
+                f"FOREIGN KEY ({column}) REFERENCES {referenced} (id)"
+            )
+        op.create_index(f'ix_{table}_id', table, ['id'])
+        op.create_index(f'ix_{table}_user_id_{key}', table, ['user_id', key])
+
+        # One partition per month from the oldest row through the precreate window
+        oldest, newest = bind.execute(
+            sa.text(f"SELECT min({key}), max({key}) FROM {legacy}")
+        ).one()
+        first = _month_of(oldest) if oldest else this_month
+        last = max(_month_of(newest) if newest else this_month, this_month)
+        last = _add_months(last, PRECREATE_MONTHS)
+
+        month = first
+        while month <= last:
+            _create_partition(table, month)
+            month = _add_months(month, 1)
+
+        op.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+        op.execute(f"DROP TABLE {legacy}")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+
+def downgrade() -> None:
+    for table, (key, foreign_keys) in PARTITIONED_TABLES.items():
+        partitioned = f"{table}_partitioned"
+
+        op.execute(f"ALTER TABLE {table} RENAME TO {partitioned}")
+        op.execute(f"ALTER TABLE {partitioned} RENAME CONSTRAINT {table}_pkey TO {partitioned}_pkey")
+        op.execute(f"ALTER INDEX ix_{table}_id RENAME TO ix_{partitioned}_id")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+
+        op.execute(f"CREATE TABLE {table} (LIKE {partitioned} INCLUDING DEFAULTS)")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)")
+        for column, referenced in foreign_keys:
+            op.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_fkey "
+                f"FOREIGN KEY ({column}) REFERENCES {referenced} (id)"
+            )
+        op.create_index(f'ix_{table}_id', table, ['id'])
+
+        op.execute(f"INSERT INTO {table} SELECT * FROM {partitioned}")
+        op.execute(f"DROP TABLE {partitioned} CASCADE")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+    op.execute(
+        "ALTER TABLE transactions ADD CONSTRAINT transactions_related_earning_id_fkey "
+        "FOREIGN KEY (related_earning_id) REFERENCES earnings (id)"
+    )
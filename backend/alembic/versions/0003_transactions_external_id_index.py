@@ -0,0 +1,30 @@
+"""Index transactions by external id
+
+Statement imports dedupe each batch on (user_id, external_id).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_transactions_user_id_external_id',
+        'transactions',
+        ['user_id', 'external_id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_user_id_external_id', table_name='transactions')
@@ -0,0 +1,27 @@
+"""Add transactions.match_confidence
+
+Stores how confident reconciliation was when it linked a transaction
+to an earning or expense.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('transactions', sa.Column('match_confidence', sa.Numeric(5, 2), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('transactions', 'match_confidence')
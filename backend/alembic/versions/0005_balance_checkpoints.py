@@ -0,0 +1,38 @@
+"""Add balance_checkpoints
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'balance_checkpoints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('currency', sa.String(3), nullable=False),
+        sa.Column('checkpoint_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('balance', sa.Numeric(14, 2), nullable=False),
+        sa.Column('transaction_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'currency', 'checkpoint_date', name='uq_balance_checkpoints_user_currency_date'),
+    )
+    op.create_index('ix_balance_checkpoints_id', 'balance_checkpoints', ['id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_balance_checkpoints_id', table_name='balance_checkpoints')
+    op.drop_table('balance_checkpoints')
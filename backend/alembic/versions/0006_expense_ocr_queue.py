@@ -0,0 +1,36 @@
+"""Add expense OCR result columns
+
+Expenses with a receipt and no ocr_processed_at form the OCR queue;
+a partial index keeps claiming the next batch cheap.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('expenses', sa.Column('ocr_extracted', sa.JSON(), nullable=True))
+    op.add_column('expenses', sa.Column('ocr_processed_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_expenses_ocr_pending',
+        'expenses',
+        ['id'],
+        postgresql_where=sa.text('receipt_url IS NOT NULL AND ocr_processed_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_expenses_ocr_pending', table_name='expenses')
+    op.drop_column('expenses', 'ocr_processed_at')
+    op.drop_column('expenses', 'ocr_extracted')
@@ -0,0 +1,26 @@
+"""Index expenses by user and date
+
+Deduction reports and quarterly estimates sum a user's expenses over a
+date range.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_expenses_user_id_expense_date', 'expenses', ['user_id', 'expense_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_expenses_user_id_expense_date', table_name='expenses')
@@ -0,0 +1,37 @@
+"""Trigram indexes for vendor and merchant search
+
+GIN indexes over lower(vendor) / lower(merchant) with pg_trgm, used by
+the vendor typeahead (% and LIKE '%...%' are both index-assisted).
+On the partitioned transactions table the index is created on every
+partition.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX ix_expenses_vendor_trgm ON expenses "
+        "USING gin (lower(vendor) gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX ix_transactions_merchant_trgm ON transactions "
+        "USING gin (lower(merchant) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_transactions_merchant_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_expenses_vendor_trgm")
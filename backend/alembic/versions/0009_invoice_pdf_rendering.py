@@ -0,0 +1,33 @@
+"""Track invoice PDF rendering
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+invoice_pdf_status = sa.Enum('PENDING', 'READY', 'FAILED', name='invoicepdfstatus')
+
+
+def upgrade() -> None:
+    invoice_pdf_status.create(op.get_bind(), checkfirst=True)
+    op.add_column('invoices', sa.Column('pdf_status', invoice_pdf_status, nullable=True))
+    op.add_column('invoices', sa.Column('pdf_content_hash', sa.String(64), nullable=True))
+    op.add_column('invoices', sa.Column('pdf_rendered_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('invoices', 'pdf_rendered_at')
+    op.drop_column('invoices', 'pdf_content_hash')
+    op.drop_column('invoices', 'pdf_status')
+    invoice_pdf_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,46 @@
+"""Per-user invoice number sequences
+
+Invoice numbers become unique per user instead of globally, and each
+user gets a counter row that number blocks are reserved from.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'invoice_sequences',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('next_value', sa.BigInteger(), nullable=False),
+        sa.Column('number_format', sa.String(50), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+
+    op.drop_constraint('invoices_invoice_number_key', 'invoices', type_='unique')
+    op.create_unique_constraint(
+        'uq_invoices_user_id_invoice_number',
+        'invoices',
+        ['user_id', 'invoice_number'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_invoices_user_id_invoice_number', 'invoices', type_='unique')
+    op.create_unique_constraint('invoices_invoice_number_key', 'invoices', ['invoice_number'])
+
+    op.drop_table('invoice_sequences')
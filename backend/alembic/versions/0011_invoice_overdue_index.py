@@ -0,0 +1,32 @@
+"""Index open invoices by due date
+
+The overdue sweeper only looks at sent/viewed/overdue invoices; a
+partial index keeps it from scanning paid and draft history.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_invoices_open_due_date',
+        'invoices',
+        ['due_date'],
+        postgresql_where=sa.text("status IN ('SENT', 'VIEWED', 'OVERDUE')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_invoices_open_due_date', table_name='invoices')
@@ -0,0 +1,56 @@
+"""Add email_outbox
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'email_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('idempotency_key', sa.String(255), nullable=False),
+        sa.Column('to_email', sa.String(255), nullable=False),
+        sa.Column('from_email', sa.String(255), nullable=True),
+        sa.Column('subject', sa.String(500), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column(
+            'status',
+            sa.Enum('PENDING', 'SENDING', 'SENT', 'FAILED', name='emailstatus'),
+            nullable=False,
+        ),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('idempotency_key'),
+    )
+    op.create_index('ix_email_outbox_id', 'email_outbox', ['id'])
+    op.create_index(
+        'ix_email_outbox_due',
+        'email_outbox',
+        ['next_attempt_at'],
+        postgresql_where=sa.text("status IN ('PENDING', 'SENDING')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_email_outbox_due', table_name='email_outbox')
+    op.drop_index('ix_email_outbox_id', table_name='email_outbox')
+    op.drop_table('email_outbox')
+    sa.Enum(name='emailstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,25 @@
+"""Index predictions by user and run date
+
+The earnings summary reads each user's latest forecast run.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_predictions_user_id_prediction_date', 'predictions', ['user_id', 'prediction_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_predictions_user_id_prediction_date', table_name='predictions')
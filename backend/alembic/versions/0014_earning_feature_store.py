@@ -0,0 +1,48 @@
+"""Add the earnings feature store
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0014'
+down_revision = '0013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'earning_features',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('feature_date', sa.Date(), nullable=False),
+        sa.Column('amount', sa.Numeric(12, 2), nullable=False),
+        sa.Column('mean_7d', sa.Float(), nullable=False),
+        sa.Column('mean_30d', sa.Float(), nullable=False),
+        sa.Column('mean_90d', sa.Float(), nullable=False),
+        sa.Column('volatility_30d', sa.Float(), nullable=False),
+        sa.Column('active_days_30d', sa.Integer(), nullable=False),
+        sa.Column('weekday_factor', sa.Float(), nullable=False),
+        sa.Column('platform_mix', sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id', 'feature_date'),
+    )
+    op.create_table(
+        'earning_feature_state',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('computed_through', sa.Date(), nullable=False),
+        sa.Column('watermark', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('earning_feature_state')
+    op.drop_table('earning_features')
@@ -0,0 +1,31 @@
+"""Index predictions awaiting actuals
+
+The nightly backfill only touches predictions with no actual_amount yet.
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0015'
+down_revision = '0014'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_predictions_unsettled_forecast_date',
+        'predictions',
+        ['forecast_date'],
+        postgresql_where=sa.text('actual_amount IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_predictions_unsettled_forecast_date', table_name='predictions')
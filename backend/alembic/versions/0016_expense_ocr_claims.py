@@ -0,0 +1,28 @@
+"""Add expense OCR claim timestamps
+
+OCR workers stamp the receipts they take and commit, instead of holding
+row locks while OCR runs. A claim older than the worker lease is taken
+again.
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0016'
+down_revision = '0015'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('expenses', sa.Column('ocr_claimed_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('expenses', 'ocr_claimed_at')
@@ -11,6 +11,7 @@ from datetime import datetime
 from typing import Annotated
 
 from app.db.base import get_db
+from app.db.replicas import get_read_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse, Token
 from app.core.security import (
@@ -25,13 +26,7 @@ router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"/api/v1/auth/login")
 
 
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: AsyncSession = Depends(get_db),
-) -> User:
-    """
-    Dependency to get current authenticated user from JWT token.
-    """
+async def _authenticated_user(token: str, db: AsyncSession) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -42,8 +37,10 @@ async def get_current_user(
     if payload is None:
         raise credentials_exception
 
-    user_id: int = payload.get("sub")
-    if user_id is None:
+    # python-jose only accepts string subjects
+    try:
+        user_id = int(payload.get("sub"))
+    except (TypeError, ValueError):
         raise credentials_exception
 
     # Fetch user from database
@@ -59,6 +56,29 @@ async def get_current_user(
     return user
 
 
+async def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """
+    Dependency to get current authenticated user from JWT token.
+    """
+    return await _authenticated_user(token, db)
+
+
+async def get_current_read_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: AsyncSession = Depends(get_read_db),
+) -> User:
+    """
+    Dependency to get current authenticated user for read-only endpoints.
+
+    The user is loaded through get_read_db's session, so a request routed
+    to a replica never checks out a primary connection.
+    """
+    return await _authenticated_user(token, db)
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: UserCreate,
@@ -122,8 +142,8 @@ async def login(
     await db.commit()
 
     # Create tokens
-    access_token = create_access_token(data={"sub": user.id})
-    refresh_token = create_refresh_token(data={"sub": user.id})
+    access_token = create_access_token(data={"sub": str(user.id)})
+    refresh_token = create_refresh_token(data={"sub": str(user.id)})
 
     return {
         "access_token": access_token,
@@ -148,7 +168,13 @@ async def refresh_token(
             detail="Invalid refresh token",
         )
 
-    user_id: int = payload.get("sub")
+    try:
+        user_id = int(payload.get("sub"))
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+        )
 
     # Verify user exists and is active
     result = await db.execute(select(User).where(User.id == user_id))
@@ -161,8 +187,8 @@ async def refresh_token(
         )
 
     # Create new tokens
-    access_token = create_access_token(data={"sub": user.id})
-    new_refresh_token = create_refresh_token(data={"sub": user.id})
+    access_token = create_access_token(data={"sub": str(user.id)})
+    new_refresh_token = create_refresh_token(data={"sub": str(user.id)})
 
     return {
         "access_token": access_token,
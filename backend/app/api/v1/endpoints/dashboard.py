@@ -8,19 +8,20 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from datetime import datetime, timedelta
 
-from app.db.base import get_db
+from app.core.config import settings
+from app.db.replicas import get_read_db
 from app.models.user import User
 from app.models.platform import Earning, ConnectedPlatform
 from app.models.invoice import Invoice, InvoiceStatus
-from app.api.v1.endpoints.auth import get_current_user
+from app.api.v1.endpoints.auth import get_current_read_user
 
 router = APIRouter()
 
 
 @router.get("/")
 async def get_dashboard(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_read_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get main dashboard data.
@@ -55,10 +56,14 @@ async def get_dashboard(
     pending_invoices_count = result.scalar()
 
     # Upcoming payout schedule (next 7 days)
+    # Platforms pay out 30-60 days after earning, so bounding earning_date
+    # lets the planner skip all but the last few monthly partitions.
     next_week = now + timedelta(days=7)
+    payout_lookback = timedelta(days=settings.MAX_PAYOUT_DELAY_DAYS)
     result = await db.execute(
         select(Earning.payout_date, func.sum(Earning.amount))
         .where(Earning.user_id == current_user.id)
+        .where(Earning.earning_date.between(now - payout_lookback, next_week))
         .where(Earning.payout_date.between(now, next_week))
         .group_by(Earning.payout_date)
         .order_by(Earning.payout_date)
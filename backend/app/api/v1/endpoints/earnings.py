@@ -5,16 +5,16 @@ API for fetching and analyzing creator earnings.
 """
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, case
 from datetime import datetime, timedelta
 from typing import List, Optional
 from decimal import Decimal
 
-from app.db.base import get_db
+from app.db.replicas import get_read_db
 from app.models.user import User
 from app.models.platform import Earning, ConnectedPlatform
 from app.schemas.platform import EarningResponse, EarningsSummary
-from app.api.v1.endpoints.auth import get_current_user
+from app.api.v1.endpoints.auth import get_current_read_user
 
 router = APIRouter()
 
@@ -26,8 +26,8 @@ async def get_earnings(
     platform_id: Optional[int] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_read_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get earnings history with optional filtering.
@@ -53,8 +53,8 @@ async def get_earnings(
 
 @router.get("/summary", response_model=EarningsSummary)
 async def get_earnings_summary(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_read_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get earnings summary across all platforms.
@@ -64,49 +64,25 @@ async def get_earnings_summary(
     last_month_start = (month_start - timedelta(days=1)).replace(day=1)
     year_start = datetime(now.year, 1, 1)
 
-    # Total all time
-    result = await db.execute(
-        select(func.sum(Earning.amount))
-        .where(Earning.user_id == current_user.id)
-    )
-    total_all_time = result.scalar() or Decimal(0)
-
-    # Total this month
-    result = await db.execute(
-        select(func.sum(Earning.amount))
-        .where(
-            and_(
-                Earning.user_id == current_user.id,
-                Earning.earning_date >= month_start,
-            )
-        )
-    )
-    total_this_month = result.scalar() or Decimal(0)
-
-    # Total last month
-    result = await db.execute(
-        select(func.sum(Earning.amount))
-        .where(
-            and_(
-                Earning.user_id == current_user.id,
-                Earning.earning_date >= last_month_start,
-                Earning.earning_date < month_start,
-            )
-        )
-    )
-    total_last_month = result.scalar() or Decimal(0)
+    def total_since(start: datetime, end: Optional[datetime] = None):
+        in_period = Earning.earning_date >= start
+        if end is not None:
+            in_period = and_(in_period, Earning.earning_date < end)
+        return func.sum(case((in_period, Earning.amount)))
 
-    # Total this year
+    # All totals in one pass over the user's earnings
     result = await db.execute(
-        select(func.sum(Earning.amount))
-        .where(
-            and_(
-                Earning.user_id == current_user.id,
-                Earning.earning_date >= year_start,
-            )
+        select(
+            func.sum(Earning.amount),
+            total_since(month_start),
+            total_since(last_month_start, month_start),
+            total_since(year_start),
+            func.sum(Earning.tax_withheld),
         )
+        .where(Earning.user_id == current_user.id)
     )
-    total_this_year = result.scalar() or Decimal(0)
+    totals = [value or Decimal(0) for value in result.one()]
+    total_all_time, total_this_month, total_last_month, total_this_year, tax_withheld_total = totals
 
     # By platform
     result = await db.execute(
@@ -120,12 +96,17 @@ async def get_earnings_summary(
     )
     by_platform = {row[0]: float(row[1]) for row in result}
 
-    # Total tax withheld
-    result = await db.execute(
-        select(func.sum(Earning.tax_withheld))
-        .where(Earning.user_id == current_user.id)
+    # Read from the latest scheduled forecast; never fitted per request.
+    # Imported here so NumPy only loads once a summary is requested
+    from app.services.forecast_service import ForecastService
+
+    next_month_start = (month_start + timedelta(days=32)).replace(day=1)
+    projected_next_month = await ForecastService.projected_total(
+        db,
+        current_user.id,
+        next_month_start,
+        (next_month_start + timedelta(days=32)).replace(day=1),
     )
-    tax_withheld_total = result.scalar() or Decimal(0)
 
     return EarningsSummary(
         total_all_time=float(total_all_time),
@@ -134,5 +115,5 @@ async def get_earnings_summary(
         total_this_year=float(total_this_year),
         by_platform=by_platform,
         tax_withheld_total=float(tax_withheld_total),
-        projected_next_month=None,  # TODO: Implement ML prediction
+        projected_next_month=float(projected_next_month) if projected_next_month is not None else None,
     )
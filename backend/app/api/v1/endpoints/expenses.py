@@ -0,0 +1,187 @@
+"""
+Expense endpoints.
+
+Business expenses and their receipts.
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.db.base import get_db
+from app.db.replicas import get_read_db
+from app.models.user import User
+from app.models.expense import Expense
+from app.schemas.expense import ReceiptUploadResponse, DeductionsReport, DuplicateExpenseCandidate
+from app.services.deduction_service import DeductionService
+from app.services.search_service import SearchService
+from app.services.file_storage import FileTooLargeError, get_storage
+from app.services.receipt_service import ReceiptService, ReceiptUploadError
+from app.api.v1.endpoints.auth import get_current_read_user, get_current_user
+
+router = APIRouter()
+
+# The receipt body is streamed by ReceiptService rather than parsed by
+# FastAPI, so its schema is declared by hand
+RECEIPT_UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                },
+            },
+        },
+    },
+}
+
+
+async def get_user_expense(expense_id: int, user: User, db: AsyncSession) -> Expense:
+    """Fetch an expense owned by user or raise 404."""
+    result = await db.execute(
+        select(Expense)
+        .where(Expense.id == expense_id)
+        .where(Expense.user_id == user.id)
+    )
+    expense = result.scalar_one_or_none()
+
+    if not expense:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Expense not found",
+        )
+
+    return expense
+
+
+async def receipt_key(expense: Expense) -> str:
+    """Storage key of an expense's stored receipt or raise 404."""
+    storage = get_storage()
+    key = storage.key_from_url(expense.receipt_url)
+    if key is None or not await storage.exists(key):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Receipt not found",
+        )
+    return key
+
+
+@router.get("/deductions", response_model=DeductionsReport)
+async def get_deductions_report(
+    year: Optional[int] = Query(None, ge=2000, le=2100),
+    current_user: User = Depends(get_current_read_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Get deductible expense totals for a tax year.
+
+    Broken down by category, month and vendor. Category caps apply
+    (e.g. meals are at most 50% deductible). Defaults to the current year.
+    """
+    year = year or datetime.utcnow().year
+    return await DeductionService.get_report(db, current_user.id, year)
+
+
+@router.get("/duplicates", response_model=List[DuplicateExpenseCandidate])
+async def find_duplicate_expenses(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: User = Depends(get_current_read_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    List expenses that look recorded twice.
+
+    Pairs have the same amount, dates within a few days and similar
+    vendors. Defaults to the last 12 months.
+    """
+    return await SearchService.find_duplicate_expenses(
+        db,
+        current_user.id,
+        start_date=start_date,
+        end_date=end_date,
+    )
+
+
+@router.post("/{expense_id}/receipt", response_model=ReceiptUploadResponse, openapi_extra=RECEIPT_UPLOAD_BODY)
+async def upload_receipt(
+    expense_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Upload a receipt (image or PDF) for an expense, as the "file" field
+    of a multipart form.
+
+    Identical files are stored once, however many times they are uploaded.
+    """
+    expense = await get_user_expense(expense_id, current_user, db)
+    # Release the connection while the body streams in; the final
+    # write takes a new one
+    await db.commit()
+
+    try:
+        stored = await ReceiptService.attach_upload(request, expense, db)
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except ReceiptUploadError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return ReceiptUploadResponse(
+        expense_id=expense.id,
+        receipt_url=expense.receipt_url,
+        receipt_filename=expense.receipt_filename,
+        sha256=stored.sha256,
+        size=stored.size,
+        deduplicated=not stored.created,
+    )
+
+
+@router.get("/{expense_id}/receipt")
+async def download_receipt(
+    expense_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Download the receipt for an expense.
+    """
+    expense = await get_user_expense(expense_id, current_user, db)
+    key = await receipt_key(expense)
+
+    return FileResponse(
+        get_storage().local_path(key),
+        media_type=ReceiptService.media_type(expense.receipt_filename),
+        filename=expense.receipt_filename,
+    )
+
+
+@router.get("/{expense_id}/receipt/thumbnail")
+async def get_receipt_thumbnail(
+    expense_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get a JPEG thumbnail of an image receipt.
+
+    Rendered on first request and cached afterwards.
+    """
+    expense = await get_user_expense(expense_id, current_user, db)
+    key = await receipt_key(expense)
+
+    path = await ReceiptService.thumbnail_path(key, expense.receipt_filename)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Thumbnails are only available for readable image receipts",
+        )
+
+    return FileResponse(path, media_type="image/jpeg")
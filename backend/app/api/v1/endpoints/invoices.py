@@ -0,0 +1,218 @@
+"""
+Invoice endpoints.
+
+Brand deal invoices and their PDFs.
+"""
+from typing import List
+
+from fastapi import APIRouter, Body, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.db.base import get_db
+from app.models.user import User
+from app.models.invoice import Invoice, InvoicePdfStatus
+from app.schemas.invoice import InvoicePdfStatusResponse, InvoiceCreate, InvoiceResponse, InvoiceNumbering
+from app.services.file_storage import get_storage
+from app.services.invoice_number_service import InvoiceNumberService, InvoiceNumberFormatError
+from app.services.invoice_pdf_service import InvoicePdfService, PdfRenderUnavailableError
+from app.api.v1.endpoints.auth import get_current_user
+
+router = APIRouter()
+
+# Most invoices accepted in one batch request
+MAX_INVOICE_BATCH = 500
+
+
+async def get_user_invoice(invoice_id: int, user: User, db: AsyncSession) -> Invoice:
+    """Fetch an invoice owned by user or raise 404."""
+    result = await db.execute(
+        select(Invoice)
+        .where(Invoice.id == invoice_id)
+        .where(Invoice.user_id == user.id)
+    )
+    invoice = result.scalar_one_or_none()
+
+    if not invoice:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Invoice not found",
+        )
+
+    return invoice
+
+
+async def create_invoices(
+    invoices_in: List[InvoiceCreate],
+    user: User,
+    db: AsyncSession,
+) -> List[Invoice]:
+    """Insert invoices, numbering those without a number from the user's sequence."""
+    unnumbered = [invoice_in for invoice_in in invoices_in if not invoice_in.invoice_number]
+    numbers = iter(await InvoiceNumberService.allocate(
+        db, user.id, [invoice_in.invoice_date for invoice_in in unnumbered],
+    ))
+
+    invoices = [
+        Invoice(
+            user_id=user.id,
+            **invoice_in.model_dump(exclude={"invoice_number"}),
+            invoice_number=invoice_in.invoice_number or next(numbers),
+        )
+        for invoice_in in invoices_in
+    ]
+    db.add_all(invoices)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Invoice number already in use",
+        )
+    return invoices
+
+
+def pdf_status_response(invoice: Invoice, user: User) -> InvoicePdfStatusResponse:
+    return InvoicePdfStatusResponse(
+        invoice_id=invoice.id,
+        status=invoice.pdf_status,
+        pdf_url=invoice.pdf_url,
+        rendered_at=invoice.pdf_rendered_at,
+        up_to_date=InvoicePdfService.is_current(invoice, user),
+    )
+
+
+@router.post("/", response_model=InvoiceResponse, status_code=status.HTTP_201_CREATED)
+async def create_invoice(
+    invoice_in: InvoiceCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Create an invoice.
+
+    Without an invoice_number, the next number in the user's format is
+    assigned. Numbers are unique but may have gaps.
+    """
+    invoices = await create_invoices([invoice_in], current_user, db)
+    return invoices[0]
+
+
+@router.post("/batch", response_model=List[InvoiceResponse], status_code=status.HTTP_201_CREATED)
+async def create_invoice_batch(
+    invoices_in: List[InvoiceCreate] = Body(..., min_length=1, max_length=MAX_INVOICE_BATCH),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Create many invoices at once, numbered in request order.
+    """
+    return await create_invoices(invoices_in, current_user, db)
+
+
+@router.get("/numbering", response_model=InvoiceNumbering)
+async def get_invoice_numbering(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get the user's invoice number format.
+    """
+    number_format = await InvoiceNumberService.get_format(db, current_user.id)
+    return InvoiceNumbering(
+        number_format=number_format,
+        example=InvoiceNumberService.format_number(number_format, 42),
+    )
+
+
+@router.put("/numbering", response_model=InvoiceNumbering)
+async def update_invoice_numbering(
+    numbering: InvoiceNumbering,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Change the invoice number format, e.g. "INV-{year}-{seq:04d}".
+
+    The sequence continues from its current value.
+    """
+    try:
+        await InvoiceNumberService.set_format(db, current_user.id, numbering.number_format)
+    except InvoiceNumberFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return InvoiceNumbering(
+        number_format=numbering.number_format,
+        example=InvoiceNumberService.format_number(numbering.number_format, 42),
+    )
+
+
+@router.post(
+    "/{invoice_id}/pdf",
+    response_model=InvoicePdfStatusResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def request_invoice_pdf(
+    invoice_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Queue rendering of an invoice PDF.
+
+    Returns immediately; poll the status endpoint until it is ready.
+    Nothing is queued if the current PDF already matches the invoice.
+    """
+    invoice = await get_user_invoice(invoice_id, current_user, db)
+
+    # Imported here: the task module pulls in Celery and the reminder
+    # and email services, none of which the API needs at startup
+    from app.tasks.invoices import render_invoice_pdf
+
+    try:
+        await InvoicePdfService.request_render(db, invoice, current_user, render_invoice_pdf.delay)
+    except PdfRenderUnavailableError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+    return pdf_status_response(invoice, current_user)
+
+
+@router.get("/{invoice_id}/pdf/status", response_model=InvoicePdfStatusResponse)
+async def get_invoice_pdf_status(
+    invoice_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get the rendering status of an invoice PDF.
+    """
+    invoice = await get_user_invoice(invoice_id, current_user, db)
+    return pdf_status_response(invoice, current_user)
+
+
+@router.get("/{invoice_id}/pdf")
+async def download_invoice_pdf(
+    invoice_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Download the rendered invoice PDF.
+    """
+    invoice = await get_user_invoice(invoice_id, current_user, db)
+
+    key = get_storage().key_from_url(invoice.pdf_url)
+    if invoice.pdf_status != InvoicePdfStatus.READY or key is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Invoice PDF has not been rendered yet",
+        )
+
+    return FileResponse(
+        get_storage().local_path(key),
+        media_type="application/pdf",
+        filename=f"invoice-{invoice.invoice_number}.pdf",
+    )
@@ -9,18 +9,19 @@ from sqlalchemy import select
 from typing import List
 
 from app.db.base import get_db
+from app.db.replicas import get_read_db
 from app.models.user import User
 from app.models.platform import ConnectedPlatform, PlatformType
 from app.schemas.platform import ConnectedPlatformResponse, PlatformOAuthInitiate
-from app.api.v1.endpoints.auth import get_current_user
+from app.api.v1.endpoints.auth import get_current_read_user, get_current_user
 
 router = APIRouter()
 
 
 @router.get("/connected", response_model=List[ConnectedPlatformResponse])
 async def get_connected_platforms(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_read_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get all connected platforms for the current user.
@@ -0,0 +1,54 @@
+"""
+Request profile endpoints.
+
+Serve profiles taken by the request profiler (app/core/profiler.py) to
+holders of the profiler token.
+"""
+import hmac
+import os
+import re
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.core.config import settings
+from app.services.file_storage import get_storage
+
+router = APIRouter()
+
+PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+async def require_profiler_token(x_profile_token: str = Header("")) -> None:
+    """Allow only requests with the profiler token; hide the endpoints otherwise."""
+    if not settings.PROFILER_TOKEN or not hmac.compare_digest(x_profile_token, settings.PROFILER_TOKEN):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+
+
+def profile_file(profile_id: str, extension: str) -> str:
+    """Local path of a stored profile file."""
+    path = get_storage().local_path(f"profiles/{profile_id}.{extension}") if PROFILE_ID.match(profile_id) else None
+    if path is None or not os.path.exists(path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return path
+
+
+@router.get("/{profile_id}", dependencies=[Depends(require_profiler_token)])
+async def get_profile(profile_id: str):
+    """
+    Summary and SQL timeline of a profiled request.
+    """
+    return FileResponse(profile_file(profile_id, "json"), media_type="application/json")
+
+
+@router.get("/{profile_id}/flamegraph", dependencies=[Depends(require_profiler_token)])
+async def get_profile_flamegraph(profile_id: str):
+    """
+    Sampled stacks of a profiled request in the collapsed format, for
+    flamegraph.pl, speedscope or inferno.
+    """
+    return FileResponse(
+        profile_file(profile_id, "folded"),
+        media_type="text/plain",
+        filename=f"{profile_id}.folded",
+    )
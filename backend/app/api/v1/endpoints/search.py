@@ -0,0 +1,32 @@
+"""
+Search endpoints.
+
+Fuzzy lookups across a creator's expenses and transactions.
+"""
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.replicas import get_read_db
+from app.models.user import User
+from app.schemas.search import VendorSuggestion
+from app.services.search_service import SearchService
+from app.api.v1.endpoints.auth import get_current_read_user
+
+router = APIRouter()
+
+
+@router.get("/vendors", response_model=List[VendorSuggestion])
+async def suggest_vendors(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_read_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Typeahead over expense vendors and transaction merchants.
+
+    Tolerates typos and partial names ("adob" finds "Adobe Inc.").
+    """
+    return await SearchService.suggest_vendors(db, current_user.id, q, limit)
@@ -0,0 +1,154 @@
+"""
+Bank transaction endpoints.
+
+Import and browse bank account transactions.
+"""
+import io
+from datetime import date, datetime, timedelta
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from app.db.base import get_db
+from app.db.replicas import get_read_db
+from app.models.user import User
+from app.schemas.transaction import (
+    StatementImportResult,
+    ReconciliationReport,
+    BalanceResponse,
+    BalanceHistory,
+    BalancePoint,
+)
+from app.services.statement_import_service import StatementImportService, StatementFormatError
+from app.services.reconciliation_service import ReconciliationService
+from app.services.balance_service import BalanceService
+from app.api.v1.endpoints.auth import get_current_read_user, get_current_user
+
+router = APIRouter()
+
+# Longest daily balance series returned in one request
+MAX_BALANCE_HISTORY_DAYS = 731
+
+
+@router.post("/import", response_model=StatementImportResult)
+async def import_statement(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ofx)$"),
+    currency: str = Query("USD", min_length=3, max_length=3),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Import a CSV or OFX bank statement.
+
+    The upload is parsed incrementally and inserted in batches.
+    Transactions already imported (same external id) are skipped, so
+    re-uploading an overlapping statement is safe.
+    """
+    fmt = format or StatementImportService.detect_format(file.filename)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Could not detect statement format, pass format=csv or format=ofx",
+        )
+
+    # Blocking reads of the spooled upload; import_rows does them in a worker thread
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        totals = await StatementImportService.import_statement(
+            db,
+            current_user.id,
+            stream,
+            fmt,
+            currency=currency.upper(),
+        )
+    except StatementFormatError as e:
+        detail = str(e)
+        if e.totals and e.totals["inserted"]:
+            detail += (
+                f" ({e.totals['inserted']} transactions before it were imported;"
+                " importing the corrected file skips them)"
+            )
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+    finally:
+        stream.detach()
+
+    return StatementImportResult(filename=file.filename, format=fmt, **totals)
+
+
+@router.post("/reconcile", response_model=ReconciliationReport)
+async def reconcile_transactions(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Link unmatched transactions to earnings and expenses.
+
+    Deposits are matched to platform payouts and card payments to
+    expenses. Defaults to the last 12 months; already linked
+    transactions are left untouched.
+    """
+    return await ReconciliationService.reconcile_user(
+        db,
+        current_user.id,
+        start_date=start_date,
+        end_date=end_date,
+    )
+
+
+@router.get("/balance", response_model=BalanceResponse)
+async def get_balance(
+    at: Optional[datetime] = None,
+    currency: Optional[str] = Query(None, min_length=3, max_length=3),
+    current_user: User = Depends(get_current_read_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Get the account balance at a point in time (defaults to now).
+    """
+    at = at or datetime.utcnow()
+    currency = (currency or current_user.currency or "USD").upper()
+
+    balance = await BalanceService.balance_at(db, current_user.id, at, currency)
+
+    return BalanceResponse(at=at, currency=currency, balance=float(balance))
+
+
+@router.get("/balance/history", response_model=BalanceHistory)
+async def get_balance_history(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    currency: Optional[str] = Query(None, min_length=3, max_length=3),
+    current_user: User = Depends(get_current_read_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Get the daily end-of-day balance series (defaults to the last year).
+    """
+    end_date = end_date or datetime.utcnow().date()
+    start_date = start_date or end_date - timedelta(days=364)
+    currency = (currency or current_user.currency or "USD").upper()
+
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must not be after end_date",
+        )
+    if (end_date - start_date).days >= MAX_BALANCE_HISTORY_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Balance history is limited to {MAX_BALANCE_HISTORY_DAYS} days",
+        )
+
+    series = await BalanceService.balance_history(
+        db, current_user.id, start_date, end_date, currency,
+    )
+
+    return BalanceHistory(
+        currency=currency,
+        start=start_date,
+        end=end_date,
+        points=[BalancePoint(date=day, balance=float(balance)) for day, balance in series],
+    )
@@ -2,7 +2,7 @@
 API v1 router - combines all endpoint routes.
 """
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, platforms, earnings, dashboard
+from app.api.v1.endpoints import auth, users, platforms, earnings, dashboard, transactions, expenses, search, invoices, profiles
 
 api_router = APIRouter()
 
@@ -12,3 +12,8 @@ api_router.include_router(users.router, prefix="/users", tags=["Users"])
 api_router.include_router(platforms.router, prefix="/platforms", tags=["Platforms"])
 api_router.include_router(earnings.router, prefix="/earnings", tags=["Earnings"])
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
+api_router.include_router(transactions.router, prefix="/transactions", tags=["Transactions"])
+api_router.include_router(expenses.router, prefix="/expenses", tags=["Expenses"])
+api_router.include_router(invoices.router, prefix="/invoices", tags=["Invoices"])
+api_router.include_router(search.router, prefix="/search", tags=["Search"])
+api_router.include_router(profiles.router, prefix="/profiles", tags=["Profiling"])
@@ -0,0 +1,222 @@
+"""
+CreatorBank command-line tools.
+
+Usage:
+    python -m app.cli import-statement --user-id 42 statement.csv
+    python -m app.cli ocr-receipts
+    python -m app.cli bench-forecast --users 5000
+    python -m app.cli forecast-accuracy --days 30
+    python -m app.cli import-profile app.worker
+    python -m app.cli generate-data --users 10000 --days 1095 --seed 1
+    python -m app.cli bench-api --database-url sqlite+aiosqlite:///benchmark.db --baseline baseline.json
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import date
+
+from app.core import api_benchmark
+from app.core.import_profile import profile_import, summarize
+from app.db.base import run_with_session
+from app.services.forecast_evaluation_service import ForecastEvaluationService
+from app.services.forecast_service import ForecastService
+from app.services.ocr_service import OcrService
+from app.services.statement_import_service import StatementImportService, StatementFormatError
+from app.services.synthetic_data_service import SyntheticDataService
+
+
+def import_statement(args: argparse.Namespace) -> int:
+    """Import a bank statement file for a user."""
+    fmt = args.format or StatementImportService.detect_format(args.path)
+    if fmt is None:
+        print("Could not detect statement format, pass --format", file=sys.stderr)
+        return 2
+
+    def report(totals):
+        print(
+            f"\r{totals['read']} read, {totals['inserted']} inserted, "
+            f"{totals['duplicates']} duplicates",
+            end="",
+            file=sys.stderr,
+            flush=True,
+        )
+
+    with open(args.path, encoding="utf-8-sig", errors="replace", newline="") as stream:
+        try:
+            totals = run_with_session(
+                StatementImportService.import_statement,
+                args.user_id,
+                stream,
+                fmt,
+                currency=args.currency.upper(),
+                batch_size=args.batch_size,
+                progress=report,
+            )
+        except StatementFormatError as e:
+            print(f"\nInvalid statement: {e}", file=sys.stderr)
+            if e.totals and e.totals["inserted"]:
+                print(f"{e.totals['inserted']} transactions before it were imported; "
+                      "importing the corrected file skips them", file=sys.stderr)
+            return 1
+
+    print(file=sys.stderr)
+    print(f"Imported {totals['inserted']} of {totals['read']} transactions "
+          f"({totals['duplicates']} duplicates skipped)")
+    return 0
+
+
+def ocr_receipts(args: argparse.Namespace) -> int:
+    """Run OCR on all receipts waiting in the queue."""
+    processed = run_with_session(
+        OcrService.process_pending,
+        backend=args.backend,
+        batch_size=args.batch_size,
+    )
+    print(f"Processed {processed} receipts")
+    return 0
+
+
+def bench_forecast(args: argparse.Namespace) -> int:
+    """Benchmark the forecasting models on synthetic creators."""
+    report = ForecastService.benchmark(
+        users=args.users,
+        days=args.days,
+        holdout=args.holdout,
+        prophet_sample=args.prophet_sample,
+        seed=args.seed,
+    )
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def forecast_accuracy(args: argparse.Namespace) -> int:
+    """Backfill forecast actuals and print accuracy per model."""
+    report = run_with_session(ForecastEvaluationService.evaluate, days=args.days)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def import_profile(args: argparse.Namespace) -> int:
+    """Show what importing a module costs at startup."""
+    try:
+        timings = profile_import(args.module)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(json.dumps(summarize(timings, args.module, args.top), indent=2))
+    return 0
+
+
+def generate_data(args: argparse.Namespace) -> int:
+    """Load synthetic creators into the database, or write them as files."""
+    started = time.perf_counter()
+    options = dict(users=args.users, days=args.days, seed=args.seed, end=args.end)
+    if args.output_dir:
+        counts = SyntheticDataService.write_files(args.output_dir, **options)
+    else:
+        counts = run_with_session(SyntheticDataService.load, **options)
+    print(json.dumps({"rows": counts, "seconds": round(time.perf_counter() - started, 1)}, indent=2))
+    return 0
+
+
+def bench_api(args: argparse.Namespace) -> int:
+    """Load-test the API on seeded data and compare with a baseline."""
+    try:
+        report = asyncio.run(api_benchmark.run_benchmark(
+            args.database_url,
+            users=args.users,
+            days=args.days,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            scenarios=args.scenarios,
+            seed=args.seed,
+            reseed=not args.no_seed,
+        ))
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    if args.baseline:
+        report["regressions"] = api_benchmark.compare(
+            report, api_benchmark.load_report(args.baseline), args.tolerance
+        )
+    if args.output:
+        api_benchmark.save_report(report, args.output)
+    if args.save_baseline:
+        api_benchmark.save_report({k: v for k, v in report.items() if k != "regressions"}, args.save_baseline)
+    print(json.dumps(report, indent=2))
+    return 1 if report.get("regressions") else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser with all subcommands."""
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__.strip().splitlines()[0])
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    command = subcommands.add_parser("import-statement", help="Import a CSV/OFX bank statement")
+    command.add_argument("path", help="Statement file")
+    command.add_argument("--user-id", type=int, required=True)
+    command.add_argument("--format", choices=StatementImportService.SUPPORTED_FORMATS)
+    command.add_argument("--currency", default="USD")
+    command.add_argument("--batch-size", type=int, default=StatementImportService.BATCH_SIZE)
+    command.set_defaults(handler=import_statement)
+
+    command = subcommands.add_parser("ocr-receipts", help="Run OCR on pending receipts")
+    command.add_argument("--backend", help="OCR backend, defaults to OCR_BACKEND")
+    command.add_argument("--batch-size", type=int)
+    command.set_defaults(handler=ocr_receipts)
+
+    command = subcommands.add_parser("bench-forecast", help="Compare forecasting models for accuracy and speed")
+    command.add_argument("--users", type=int, default=1000)
+    command.add_argument("--days", type=int, default=120, help="Days per series, including the holdout")
+    command.add_argument("--holdout", type=int, default=28, help="Days forecast and scored")
+    command.add_argument("--prophet-sample", type=int, default=20, help="Series also fitted with Prophet")
+    command.add_argument("--seed", type=int, default=0)
+    command.set_defaults(handler=bench_forecast)
+
+    command = subcommands.add_parser("forecast-accuracy", help="Score stored forecasts against actual earnings")
+    command.add_argument("--days", type=int, default=90, help="Forecast days covered by the report")
+    command.set_defaults(handler=forecast_accuracy)
+
+    command = subcommands.add_parser("import-profile", help="Profile the import time of a module")
+    command.add_argument("module", nargs="?", default="app.main")
+    command.add_argument("--top", type=int, default=20, help="Slowest modules and packages listed")
+    command.set_defaults(handler=import_profile)
+
+    command = subcommands.add_parser("generate-data", help="Bulk-load a deterministic synthetic dataset")
+    command.add_argument("--users", type=int, default=1000)
+    command.add_argument("--days", type=int, default=730, help="Days of history per creator")
+    command.add_argument("--seed", type=int, default=0)
+    command.add_argument("--end", type=date.fromisoformat, help="First day not covered (YYYY-MM-DD), defaults to today")
+    command.add_argument("--output-dir", help="Write CSV files and a psql load script instead of loading")
+    command.set_defaults(handler=generate_data)
+
+    command = subcommands.add_parser("bench-api", help="Load-test API endpoints on a seeded database")
+    command.add_argument("--database-url", default="sqlite+aiosqlite:///benchmark.db",
+                         help="Dedicated database, dropped and reseeded")
+    command.add_argument("--users", type=int, default=20)
+    command.add_argument("--days", type=int, default=365, help="Days of earnings per user")
+    command.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    command.add_argument("--concurrency", type=int, default=10)
+    command.add_argument("--scenarios", nargs="+", choices=sorted(api_benchmark.SCENARIOS))
+    command.add_argument("--seed", type=int, default=0)
+    command.add_argument("--no-seed", action="store_true", help="Reuse the data of an earlier run")
+    command.add_argument("--output", help="Also write the report to this file")
+    command.add_argument("--baseline", help="Report to compare with; exit 1 on regressions")
+    command.add_argument("--save-baseline", help="Write this run as the new baseline")
+    command.add_argument("--tolerance", type=float, default=api_benchmark.DEFAULT_TOLERANCE,
+                         help="Relative p95/throughput change allowed")
+    command.set_defaults(handler=bench_api)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
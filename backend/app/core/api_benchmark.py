@@ -0,0 +1,241 @@
+"""
+API load-test and benchmark.
+
+Boots the app in-process against a dedicated database (Postgres or
+SQLite), seeds it with synthetic creators, then drives a fixed set of
+endpoint scenarios at a configurable concurrency. Each scenario reports
+throughput, latency percentiles, errors and SQL statements per request
+as JSON, and can be compared against a stored baseline run.
+
+Requests go through httpx's ASGI transport, so the numbers cover the
+app, the ORM and the database but not uvicorn or the network.
+"""
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import make_url, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.query_log import record_queries
+from app.services.synthetic_data_service import SyntheticDataService
+
+# name -> (method, path); "login" posts the user's credentials
+SCENARIOS: Dict[str, Tuple[str, str]] = {
+    "login": ("POST", "/api/v1/auth/login"),
+    "me": ("GET", "/api/v1/auth/me"),
+    "dashboard": ("GET", "/api/v1/dashboard/"),
+    "earnings_list": ("GET", "/api/v1/earnings/?limit=100"),
+    "earnings_summary": ("GET", "/api/v1/earnings/summary"),
+    "tax_deductions": ("GET", "/api/v1/expenses/deductions"),
+}
+
+# Relative change beyond which a metric counts as a regression
+DEFAULT_TOLERANCE = 0.10
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of values (fraction in 0..1)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(-(-fraction * len(ordered) // 1)), 1)  # ceil, at least the first
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+async def seed_database(url: str, users: int, days: int, seed: int = 0) -> None:
+    """Recreate the schema and load synthetic creators (app/services/synthetic_data_service.py)."""
+    # Imported here: every model has to be registered before create_all
+    import app.models  # noqa: F401
+    from app.db.base import Base
+
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as db:
+            await SyntheticDataService.load(db, users, days, seed)
+    finally:
+        await engine.dispose()
+
+
+async def _drive(
+    client,
+    name: str,
+    requests: int,
+    concurrency: int,
+    users: List[Tuple[str, Dict[str, str]]],
+) -> Dict[str, Any]:
+    """Send `requests` requests of one scenario from `concurrency` workers."""
+    method, path = SCENARIOS[name]
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for number in counter:
+            email, headers = users[number % len(users)]
+            with record_queries() as recorder:
+                started = time.perf_counter()
+                if name == "login":
+                    response = await client.post(path, data={"username": email, "password": SyntheticDataService.PASSWORD})
+                else:
+                    response = await client.request(method, path, headers=headers)
+                latencies.append(time.perf_counter() - started)
+            queries.append(len(recorder))
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies_ms = [latency * 1000 for latency in latencies]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies_ms) / len(latencies_ms), 3) if latencies_ms else 0.0,
+        "p50_ms": round(percentile(latencies_ms, 0.50), 3),
+        "p95_ms": round(percentile(latencies_ms, 0.95), 3),
+        "p99_ms": round(percentile(latencies_ms, 0.99), 3),
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else 0.0,
+        "max_queries": max(queries, default=0),
+    }
+
+
+async def run_benchmark(
+    database_url: str,
+    users: int = 20,
+    days: int = 365,
+    requests: int = 200,
+    concurrency: int = 10,
+    scenarios: Optional[Sequence[str]] = None,
+    seed: int = 0,
+    reseed: bool = True,
+) -> Dict[str, Any]:
+    """
+    Seed a database, boot the app against it and run the scenarios.
+
+    Args:
+        database_url: Async SQLAlchemy URL of a dedicated database (dropped and recreated)
+        users: Creators seeded; requests rotate between them
+        days: Days of earnings history per creator
+        requests: Requests per scenario
+        concurrency: Requests in flight at once
+        scenarios: Scenario names, defaults to all of SCENARIOS
+        seed: Random seed of the data
+        reseed: Seed the database first (False reuses an earlier run's data)
+
+    Returns:
+        Run parameters and per-scenario results
+    """
+    if database_url == settings.DATABASE_URL:
+        raise ValueError("Benchmarks drop and recreate the schema; use a dedicated database")
+    scenarios = list(scenarios or SCENARIOS)
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    # Imported here: booting the app is part of what the benchmark does
+    from httpx import ASGITransport, AsyncClient
+    from app.db.base import get_db
+    from app.main import app
+    from app.models.user import User
+
+    if reseed:
+        await seed_database(database_url, users, days, seed)
+
+    # Same pool limits as the app; SQLite connections aren't pooled
+    pool = {} if make_url(database_url).get_backend_name() == "sqlite" else {
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+    }
+    engine = create_async_engine(database_url, **pool)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def benchmark_db():
+        async with sessions() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = benchmark_db
+    try:
+        async with sessions() as db:
+            emails = (await db.execute(select(User.email).order_by(User.id).limit(users))).scalars().all()
+        # Server errors become 500 responses counted as errors, not crashes
+        transport = ASGITransport(app=app, raise_app_exceptions=False)
+        async with AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            logged_in = []
+            for email in emails:
+                response = await client.post("/api/v1/auth/login", data={"username": email, "password": SyntheticDataService.PASSWORD})
+                response.raise_for_status()
+                logged_in.append((email, {"Authorization": f"Bearer {response.json()['access_token']}"}))
+
+            results = {}
+            for name in scenarios:
+                # Warm-up, so one-off costs (imports, caches, connections) aren't measured
+                await _drive(client, name, min(concurrency, requests), concurrency, logged_in)
+                results[name] = await _drive(client, name, requests, concurrency, logged_in)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        await engine.dispose()
+
+    return {
+        "database": engine.dialect.name,
+        "users": users,
+        "days": days,
+        "requests": requests,
+        "concurrency": concurrency,
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "scenarios": results,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE) -> List[Dict[str, Any]]:
+    """
+    Scenario metrics that got worse than the baseline.
+
+    p95 latency and throughput may move by up to `tolerance` (relative);
+    queries per request and errors may not grow at all.
+
+    Returns:
+        One entry per regression: scenario, metric, baseline and current value
+    """
+    regressions = []
+    for name, current in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        checks = [
+            ("p95_ms", current["p95_ms"] > before["p95_ms"] * (1 + tolerance)),
+            ("throughput_rps", current["throughput_rps"] < before["throughput_rps"] * (1 - tolerance)),
+            ("queries_per_request", current["queries_per_request"] > before["queries_per_request"]),
+            ("errors", current["errors"] > before["errors"]),
+        ]
+        for metric, regressed in checks:
+            if regressed:
+                regressions.append({
+                    "scenario": name,
+                    "metric": metric,
+                    "baseline": before[metric],
+                    "current": current[metric],
+                })
+    return regressions
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as stream:
+        return json.load(stream)
+
+
+def save_report(report: Dict[str, Any], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as stream:
+        json.dump(report, stream, indent=2)
+        stream.write("\n")
@@ -0,0 +1,88 @@
+"""
+Redis-backed cache for computed reports.
+
+The cache is an optimization only: if Redis is unreachable, reads miss
+and writes are dropped, and callers fall back to computing the value.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Optional
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Redis clients hold connections bound to an event loop, and Celery tasks
+# and CLI commands each run their own loop, so keep one client per loop.
+_clients = {}
+
+
+def get_redis() -> redis.Redis:
+    """Redis client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        _clients.clear()
+        client = redis.from_url(
+            settings.REDIS_URL,
+            socket_connect_timeout=settings.CACHE_TIMEOUT_SECONDS,
+            socket_timeout=settings.CACHE_TIMEOUT_SECONDS,
+        )
+        _clients[loop] = client
+    return client
+
+
+async def cache_get(key: str) -> Optional[Any]:
+    """Cached JSON value for key, or None on a miss or cache outage."""
+    try:
+        value = await get_redis().get(key)
+    except (RedisError, OSError) as e:
+        logger.debug("Cache read failed for %s: %s", key, e)
+        return None
+    return json.loads(value) if value is not None else None
+
+
+async def cache_set(key: str, value: Any, ttl: int) -> None:
+    """Store a JSON-serializable value for ttl seconds."""
+    try:
+        await get_redis().set(key, json.dumps(value, default=str), ex=ttl)
+    except (RedisError, OSError) as e:
+        logger.debug("Cache write failed for %s: %s", key, e)
+
+
+async def cache_version(key: str) -> Optional[int]:
+    """
+    Current value of a version counter, or None on a cache outage.
+
+    Keys computed from the version go stale when cache_bump advances it.
+    A missing counter starts at the current time in nanoseconds, so one
+    that was evicted never comes back to a value it had before.
+    """
+    try:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            pipe.set(key, time.time_ns(), nx=True)
+            pipe.get(key)
+            _, value = await pipe.execute()
+    except (RedisError, OSError) as e:
+        logger.debug("Cache version read failed for %s: %s", key, e)
+        return None
+    return int(value)
+
+
+async def cache_bump(*keys: str) -> None:
+    """Advance version counters (see cache_version)."""
+    if not keys:
+        return
+    try:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.set(key, time.time_ns(), nx=True)
+                pipe.incr(key)
+            await pipe.execute()
+    except (RedisError, OSError) as e:
+        logger.debug("Cache version bump failed for %s: %s", ", ".join(keys), e)
@@ -0,0 +1,81 @@
+"""
+Import-time profiling.
+
+Imports a module in a fresh interpreter with `python -X importtime` and
+reports where the time went, so heavy dependencies creeping into the
+API's or the worker's startup path are easy to spot.
+"""
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple
+
+
+class ImportTiming(NamedTuple):
+    module: str
+    depth: int  # 0 for modules imported directly by the profiled import
+    self_ms: float
+    cumulative_ms: float
+
+
+def profile_import(module: str) -> List[ImportTiming]:
+    """
+    Time `import module` in a new interpreter.
+
+    Returns:
+        One timing per module loaded, in the order they finished loading
+
+    Raises:
+        RuntimeError: If the import fails
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{process.stderr[-2000:]}")
+
+    timings = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # Header
+        stripped = name.lstrip()
+        timings.append(ImportTiming(
+            module=stripped,
+            depth=(len(name) - len(stripped) - 1) // 2,
+            self_ms=int(self_us) / 1000,
+            cumulative_ms=int(cumulative_us) / 1000,
+        ))
+    return timings
+
+
+def summarize(timings: List[ImportTiming], module: str, top: int = 20) -> Dict:
+    """
+    Total time of the profiled import plus its slowest modules.
+
+    Returns:
+        Dict with the total, the number of modules loaded, the `top`
+        slowest modules by self time, and the heaviest top-level
+        packages by cumulative time
+    """
+    packages: Dict[str, float] = {}
+    for timing in timings:
+        package = timing.module.split(".")[0]
+        packages[package] = packages.get(package, 0.0) + timing.self_ms
+
+    return {
+        "module": module,
+        "total_ms": round(next((t.cumulative_ms for t in timings if t.module == module), 0.0), 1),
+        "modules_loaded": len(timings),
+        "slowest_modules": [
+            {"module": t.module, "self_ms": round(t.self_ms, 1), "cumulative_ms": round(t.cumulative_ms, 1)}
+            for t in sorted(timings, key=lambda t: t.self_ms, reverse=True)[:top]
+        ],
+        "packages": [
+            {"package": package, "ms": round(ms, 1)}
+            for package, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        ],
+    }
@@ -0,0 +1,315 @@
+"""
+Prometheus metrics.
+
+A small in-process registry of counters, gauges and histograms, rendered
+in the Prometheus text exposition format at /metrics. Each process
+(uvicorn worker) keeps and serves its own values; Prometheus sums them
+across scrape targets.
+
+Requests are measured by MetricsMiddleware, SQL by engine events and
+pool checkout waits by the instrumented pool in app/db/base.py, and
+event-loop lag by monitor_event_loop.
+"""
+import asyncio
+import math
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Prometheus client defaults, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class Metric:
+    """A named metric with a fixed set of label names."""
+
+    TYPE = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[Tuple[str, Sequence[str], Sequence[str], float]]:
+        """(suffixed name, label names, label values, value) per sample."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        for name, labelnames, labelvalues, value in self.samples():
+            lines.append(f"{name}{_format_labels(labelnames, labelvalues)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    TYPE = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        # Unlabelled metrics are exported from the start, as zero
+        self._values: Dict[LabelValues, float] = {} if labelnames else {(): 0}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, self.labelnames, key, value) for key, value in sorted(self._values.items())]
+
+
+class Gauge(Metric):
+    """Value that goes up and down, or is read at scrape time."""
+
+    TYPE = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the (unlabelled) value from function on every scrape."""
+        self._function = function
+
+    def samples(self):
+        if self._function is not None:
+            return [(self.name, (), (), float(self._function()))]
+        with self._lock:
+            return [(self.name, self.labelnames, key, value) for key, value in sorted(self._values.items())]
+
+
+class Histogram(Metric):
+    """Distribution of observed values over cumulative buckets."""
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> (count per bucket, not cumulative; sum)
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        if not labelnames:
+            self._values[()] = ([0] * len(self.buckets), [0.0])
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * len(self.buckets), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def samples(self):
+        labelnames = self.labelnames + ("le",)
+        samples = []
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    samples.append((f"{self.name}_bucket", labelnames, key + (_format_value(bound),), cumulative))
+                samples.append((f"{self.name}_sum", self.labelnames, key, total[0]))
+                samples.append((f"{self.name}_count", self.labelnames, key, cumulative))
+        return samples
+
+
+class Registry:
+    """Metrics exposed together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Queries per request, and the time they took
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests handled.", ("method", "route", "status"),
+))
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route"),
+))
+HTTP_REQUESTS_IN_PROGRESS = REGISTRY.register(Gauge(
+    "http_requests_in_progress", "HTTP requests being handled.",
+))
+HTTP_REQUEST_QUERIES = REGISTRY.register(Histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request.", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+))
+HTTP_REQUEST_QUERY_DURATION = REGISTRY.register(Histogram(
+    "http_request_db_query_seconds", "Time spent in SQL per HTTP request.", ("method", "route"),
+))
+DB_QUERIES = REGISTRY.register(Counter(
+    "db_queries_total", "SQL statements executed.",
+))
+DB_QUERY_DURATION = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "SQL statement latency.",
+))
+DB_POOL_CHECKOUT_WAIT = REGISTRY.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Time waited for a pooled database connection.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+))
+DB_POOL_SIZE = REGISTRY.register(Gauge("db_pool_size", "Configured connection pool size."))
+DB_POOL_CHECKED_OUT = REGISTRY.register(Gauge("db_pool_checked_out", "Pooled connections in use."))
+DB_POOL_OVERFLOW = REGISTRY.register(Gauge(
+    "db_pool_overflow", "Connections open beyond the pool size (negative: pool not yet filled).",
+))
+DB_READ_SESSIONS = REGISTRY.register(Counter(
+    "db_read_sessions_total", "Sessions of read-only endpoints, by where they were routed and why.",
+    ("target", "reason"),
+))
+DB_REPLICA_LAG = REGISTRY.register(Gauge(
+    "db_replica_lag_seconds", "Last measured replay lag per read replica (+Inf: unreachable).", ("replica",),
+))
+EVENT_LOOP_LAG = REGISTRY.register(Histogram(
+    "event_loop_lag_seconds", "How late the event loop ran a scheduled callback.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+))
+
+
+class RequestStats:
+    """SQL issued while handling one request."""
+
+    __slots__ = ("queries", "query_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Stats of the request being handled, None outside requests."""
+    return _request_stats.get()
+
+
+def record_query(seconds: float) -> None:
+    """Count one SQL statement, globally and against the current request."""
+    DB_QUERIES.inc()
+    DB_QUERY_DURATION.observe(seconds)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += seconds
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request.
+
+    Requests are labelled by route template (/api/v1/invoices/{invoice_id}),
+    not by path, so label cardinality stays bounded; requests that match
+    no route are labelled "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            _request_stats.reset(token)
+
+            route = scope.get("route")
+            labels = {"method": scope["method"], "route": getattr(route, "path", "unmatched")}
+            HTTP_REQUESTS.inc(status=str(status), **labels)
+            HTTP_REQUEST_DURATION.observe(elapsed, **labels)
+            HTTP_REQUEST_QUERIES.observe(stats.queries, **labels)
+            HTTP_REQUEST_QUERY_DURATION.observe(stats.query_seconds, **labels)
+
+
+async def monitor_event_loop(interval: float = 0.5) -> None:
+    """
+    Record how late the loop wakes from a sleep of interval seconds,
+    i.e. how long callbacks wait behind blocking work. Runs until cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(loop.time() - expected, 0.0))
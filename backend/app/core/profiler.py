@@ -0,0 +1,183 @@
+"""
+On-demand profiling of single requests.
+
+A request carrying the X-Profile-Token header, matching PROFILER_TOKEN,
+is profiled: a background thread samples the event-loop thread's stack
+every PROFILER_INTERVAL_MS while the request runs, and its SQL is
+recorded with call sites. The result is stored as
+
+    profiles/{id}.folded  collapsed stacks ("frame;frame;frame count"),
+                          for flamegraph.pl, speedscope or inferno
+    profiles/{id}.json    request summary and SQL timeline
+
+and the id is returned in the X-Profile-Id response header. Samples
+taken while another request's task holds the loop, or while this one
+awaits I/O, are counted as "(waiting)".
+
+Without PROFILER_TOKEN the middleware is not installed; with it, an
+unprofiled request costs one header lookup.
+"""
+import asyncio
+import hmac
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.query_log import record_queries
+
+logger = logging.getLogger(__name__)
+
+HEADER = "x-profile-token"
+WAITING = "(waiting)"
+
+# Fetching profiles (app/api/v1/endpoints/profiles.py) isn't profiled
+PROFILES_PATH = f"{settings.API_V1_PREFIX}/profiles"
+
+# Stack frames from these files are noise in a request profile
+_HIDDEN = (os.path.dirname(asyncio.__file__), os.path.dirname(__file__) + os.sep + "profiler.py")
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    for path in sys.path:
+        if path and filename.startswith(path + os.sep):
+            filename = filename[len(path) + 1:]
+            break
+    # ';' separates frames in the collapsed format
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    """Samples one thread's stack while one asyncio task is running on it."""
+
+    def __init__(self, root: str, interval: float):
+        self.root = root.replace(";", ":")
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start sampling the calling thread, attributing samples to the current task."""
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        target = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, args=(loop, task, target), daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self, loop, task, target: int) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            if frame is None or asyncio.current_task(loop) is not task:
+                self.stacks[(self.root, WAITING)] += 1
+                continue
+
+            names = []
+            while frame is not None:
+                if not frame.f_code.co_filename.startswith(_HIDDEN):
+                    names.append(_frame_name(frame))
+                frame = frame.f_back
+            self.stacks[(self.root, *reversed(names))] += 1
+
+    def folded(self) -> str:
+        """Samples in the collapsed-stack format."""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfilerMiddleware:
+    """ASGI middleware profiling requests that carry the profiler token."""
+
+    def __init__(self, app):
+        self.app = app
+        self.token = settings.PROFILER_TOKEN.encode()
+
+    def _requested(self, scope) -> bool:
+        if scope["path"] == PROFILES_PATH or scope["path"].startswith(PROFILES_PATH + "/"):
+            return False
+        for name, value in scope["headers"]:
+            if name == HEADER.encode():
+                return hmac.compare_digest(value, self.token)
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        profiler = SamplingProfiler(f"{scope['method']} {scope['path']}", settings.PROFILER_INTERVAL_MS / 1000)
+        started = time.perf_counter()
+        with record_queries(capture_sites=True) as recorder:
+            profiler.start()
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                profiler.stop()
+                elapsed = time.perf_counter() - started
+                # A failed save mustn't replace the request's own outcome
+                try:
+                    await save_profile(profile_id, profiler, recorder, {
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "query_string": scope.get("query_string", b"").decode("latin-1"),
+                        "status": status,
+                        "duration_ms": round(elapsed * 1000, 3),
+                    }, started)
+                except Exception:
+                    logger.exception("Saving profile %s failed", profile_id)
+
+
+def sql_timeline(recorder, started: float) -> List[Dict]:
+    """Recorded statements with their start offsets from the request start."""
+    return [
+        {
+            "start_ms": round((query.started - started) * 1000, 3),
+            "duration_ms": round(query.seconds * 1000, 3),
+            "statement": query.statement,
+            "site": query.site,
+        }
+        for query in recorder.queries
+    ]
+
+
+async def save_profile(profile_id: str, profiler: SamplingProfiler, recorder, summary: Dict, started: float) -> None:
+    """Store a request's profile under profiles/ in file storage."""
+    # Imported here: storage is only needed once a profile is taken
+    from app.services.file_storage import get_storage
+
+    timeline = sql_timeline(recorder, started)
+    report = {
+        "id": profile_id,
+        **summary,
+        "interval_ms": settings.PROFILER_INTERVAL_MS,
+        "samples": sum(profiler.stacks.values()),
+        "waiting_samples": profiler.stacks.get((profiler.root, WAITING), 0),
+        "queries": len(timeline),
+        "sql_ms": round(sum(query["duration_ms"] for query in timeline), 3),
+        "sql": timeline,
+    }
+    storage = get_storage()
+    await storage.write_bytes(f"profiles/{profile_id}.folded", profiler.folded().encode())
+    await storage.write_bytes(f"profiles/{profile_id}.json", json.dumps(report, indent=2).encode())
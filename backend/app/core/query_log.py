@@ -0,0 +1,183 @@
+"""
+Per-request SQL recording.
+
+Engine events in app/db/base.py hand every statement to record(); while
+a recorder is active in the current context (a request, a test block)
+the statement is kept, optionally with the line of project code that
+issued it.
+
+Tests bound endpoints with assert_max_queries. With QUERY_DEBUG set,
+QueryDebugMiddleware logs, per request, statements run more than once
+(the signature of an N+1: one query per row of an earlier result) and
+requests over QUERY_DEBUG_MAX_QUERIES, with their call sites.
+"""
+import logging
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import greenlet
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Code outside these directories (and anything installed) isn't a call site
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_SKIPPED = (
+    os.path.join(_ROOT, "app", "db") + os.sep,
+    os.path.join(_ROOT, "app", "core") + os.sep,
+)
+
+# Bind parameter lists, e.g. IN ($1, $2, $3), vary in length with the data
+_PARAMETER_LIST = re.compile(r"\((?:\s*(?:\$\d+|\?|%\(\w+\)s|:\w+)\s*,)+\s*(?:\$\d+|\?|%\(\w+\)s|:\w+)\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(statement: str) -> str:
+    """Statement text with whitespace and bind parameter lists collapsed."""
+    return _PARAMETER_LIST.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def _is_project_frame(filename: str) -> bool:
+    return (
+        filename.startswith(_ROOT)
+        and "site-packages" not in filename
+        and not filename.startswith(_SKIPPED)
+    )
+
+
+def call_site() -> Optional[str]:
+    """
+    Innermost project frame that led to the current statement.
+
+    Async sessions run SQLAlchemy in a child greenlet, so the awaiting
+    code is found by continuing into the parent greenlet's frames.
+    """
+    frame = sys._getframe(1)
+    current = greenlet.getcurrent()
+    while True:
+        while frame is not None:
+            if _is_project_frame(frame.f_code.co_filename):
+                return f"{os.path.relpath(frame.f_code.co_filename, _ROOT)}:{frame.f_lineno} in {frame.f_code.co_name}"
+            frame = frame.f_back
+        current = current.parent
+        if current is None:
+            return None
+        frame = current.gr_frame
+
+
+class RecordedQuery(NamedTuple):
+    statement: str
+    seconds: float
+    site: Optional[str]
+    started: float  # time.perf_counter() when the statement was sent
+
+
+class QueryRecorder:
+    """Statements executed while the recorder is active."""
+
+    def __init__(self, capture_sites: bool = False):
+        self.capture_sites = capture_sites
+        self.queries: List[RecordedQuery] = []
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+    def duplicates(self, min_count: int = 2) -> List[Tuple[str, int, List[str]]]:
+        """
+        Statements run at least min_count times, most repeated first.
+
+        Returns:
+            (normalized statement, times run, distinct call sites)
+        """
+        by_statement: Dict[str, List[RecordedQuery]] = defaultdict(list)
+        for query in self.queries:
+            by_statement[normalize(query.statement)].append(query)
+        repeated = [
+            (statement, len(runs), sorted({run.site for run in runs if run.site}))
+            for statement, runs in by_statement.items()
+            if len(runs) >= min_count
+        ]
+        return sorted(repeated, key=lambda item: item[1], reverse=True)
+
+    def report(self) -> str:
+        """Every statement with its call site, for assertion messages and logs."""
+        lines = [
+            f"{number}. {normalize(query.statement)[:300]}" + (f"  [{query.site}]" if query.site else "")
+            for number, query in enumerate(self.queries, 1)
+        ]
+        return "\n".join(lines)
+
+
+_recorders: ContextVar[Tuple[QueryRecorder, ...]] = ContextVar("query_recorders", default=())
+
+
+def record(statement: str, seconds: float) -> None:
+    """Add a statement to the recorders active in this context."""
+    recorders = _recorders.get()
+    if not recorders:
+        return
+    site = call_site() if any(recorder.capture_sites for recorder in recorders) else None
+    query = RecordedQuery(statement, seconds, site, time.perf_counter() - seconds)
+    for recorder in recorders:
+        recorder.queries.append(query)
+
+
+@contextmanager
+def record_queries(capture_sites: bool = False) -> Iterator[QueryRecorder]:
+    """Record the statements executed inside the block (nestable)."""
+    recorder = QueryRecorder(capture_sites)
+    token = _recorders.set(_recorders.get() + (recorder,))
+    try:
+        yield recorder
+    finally:
+        _recorders.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryRecorder]:
+    """
+    Fail unless the block runs at most limit statements.
+
+    The assertion message lists every statement with its call site.
+    """
+    with record_queries(capture_sites=True) as recorder:
+        yield recorder
+    if len(recorder) > limit:
+        raise AssertionError(f"Expected at most {limit} queries, ran {len(recorder)}:\n{recorder.report()}")
+
+
+class QueryDebugMiddleware:
+    """
+    ASGI middleware logging likely N+1s and query-heavy requests.
+
+    Finding call sites walks the stack on every statement, so this is
+    for development only (QUERY_DEBUG).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with record_queries(capture_sites=True) as recorder:
+            await self.app(scope, receive, send)
+
+        request = f"{scope['method']} {scope['path']}"
+        for statement, count, sites in recorder.duplicates():
+            logger.warning(
+                "%s ran the same statement %d times (possible N+1) from %s: %s",
+                request, count, ", ".join(sites) or "unknown", statement[:300],
+            )
+        if len(recorder) > settings.QUERY_DEBUG_MAX_QUERIES:
+            logger.warning("%s ran %d queries:\n%s", request, len(recorder), recorder.report())
@@ -1,20 +1,71 @@
 """
 Database configuration and session management.
 """
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core import metrics, query_log
 from app.core.config import settings
 
 
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Connection pool recording how long each checkout waited."""
+
+    def _do_get(self):
+        # Waiting for a free connection, or opening one into the overflow
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
+    poolclass=InstrumentedPool,
     pool_size=settings.DATABASE_POOL_SIZE,
     max_overflow=settings.DATABASE_MAX_OVERFLOW,
     pool_pre_ping=True,
 )
 
+
+# SQL timing, on every engine in the process
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    metrics.record_query(elapsed)
+    query_log.record(statement, elapsed)
+
+
+@event.listens_for(Engine, "handle_error")
+def _record_failed_query(context):
+    # after_cursor_execute doesn't run for a statement that raised
+    if context.statement is not None and context.connection is not None:
+        started = context.connection.info.get("query_started")
+        if started:
+            elapsed = time.perf_counter() - started.pop()
+            metrics.record_query(elapsed)
+            query_log.record(context.statement, elapsed)
+
+
+# Read at scrape time; engine.pool is replaced whenever the engine is disposed
+metrics.DB_POOL_SIZE.set_function(lambda: engine.pool.size())
+metrics.DB_POOL_CHECKED_OUT.set_function(lambda: engine.pool.checkedout())
+metrics.DB_POOL_OVERFLOW.set_function(lambda: engine.pool.overflow())
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -40,3 +91,27 @@ async def get_db() -> AsyncSession:
             yield session
         finally:
             await session.close()
+
+
+def run_with_session(func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+    """
+    Run an async function with a fresh database session from sync code.
+
+    Used by Celery tasks and CLI commands, which each get their own event
+    loop. The engine's connection pool is bound to that loop, so it is
+    disposed once the function finishes.
+
+    Args:
+        func: Coroutine function taking the session as its first argument
+
+    Returns:
+        Whatever func returns
+    """
+    async def runner():
+        try:
+            async with AsyncSessionLocal() as db:
+                return await func(db, *args, **kwargs)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(runner())
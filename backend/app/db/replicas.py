@@ -0,0 +1,256 @@
+"""
+Read-replica routing.
+
+Read-only endpoints take their session from get_read_db instead of
+get_db. With DATABASE_REPLICA_URLS set, it hands out sessions on the
+replicas in turn, skipping any that are more than
+DATABASE_REPLICA_MAX_LAG_SECONDS behind (or unreachable), and falls
+back to the primary when none qualifies. They authenticate with
+get_current_read_user, which loads the user on that same session: the
+request's primary session is then never used and holds no connection.
+
+Read-your-writes: ReadYourWritesMiddleware notes requests whose session
+wrote, and for DATABASE_READ_YOUR_WRITES_SECONDS afterwards that user's
+reads stay on the primary. The marks live in Redis so they hold across
+API processes (and in process memory, should Redis be down). Keep the
+window above the lag limit: by the time a replica serves the user
+again, it has replayed their write.
+
+Without replicas, get_read_db yields the request's get_db session and
+nothing else here runs.
+"""
+import asyncio
+import itertools
+import logging
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from fastapi import Depends, Request
+from sqlalchemy import event, make_url, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from starlette.datastructures import Headers
+
+from app.core import metrics
+from app.core.cache import cache_get, cache_set
+from app.core.config import settings
+from app.core.security import decode_token
+from app.db.base import InstrumentedPool, get_db
+
+logger = logging.getLogger(__name__)
+
+# Seconds a lag check may take before the replica counts as unreachable
+LAG_CHECK_TIMEOUT = 1.0
+
+# Replay lag; zero when everything received has been replayed (an idle
+# primary writes nothing, so the last replay timestamp alone would grow)
+LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+    """A read replica's engine and its last measured lag."""
+
+    def __init__(self, url: str):
+        self.name = self.label(url)
+        self.engine = create_async_engine(
+            url,
+            poolclass=InstrumentedPool,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_pre_ping=True,
+        )
+        self.sessions = async_sessionmaker(
+            self.engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autoflush=False,
+        )
+        self.lag = float("inf")
+        self.checked_at = float("-inf")
+
+    @staticmethod
+    def label(url: str) -> str:
+        """Metric label for a replica: host:port/database, no credentials."""
+        parsed = make_url(url)
+        address = f"{parsed.host}:{parsed.port}" if parsed.port else parsed.host or ""
+        return f"{address}/{parsed.database or ''}"
+
+    async def _measure(self) -> float:
+        if self.engine.dialect.name != "postgresql":
+            return 0.0
+        async with self.engine.connect() as conn:
+            return float((await conn.execute(LAG_QUERY)).scalar())
+
+    async def current_lag(self) -> float:
+        """Replay lag in seconds, measured at most every DATABASE_REPLICA_LAG_CHECK_SECONDS."""
+        now = time.monotonic()
+        if now - self.checked_at < settings.DATABASE_REPLICA_LAG_CHECK_SECONDS:
+            return self.lag
+        # Requests arriving during the check use the previous value
+        self.checked_at = now
+        try:
+            self.lag = await asyncio.wait_for(self._measure(), LAG_CHECK_TIMEOUT)
+        except Exception as e:  # Down, starting up or unreachable: route around it
+            logger.warning("Read replica %s unavailable: %s", self.name, e)
+            self.lag = float("inf")
+        metrics.DB_REPLICA_LAG.set(self.lag, replica=self.name)
+        return self.lag
+
+
+REPLICAS: List[Replica] = [Replica(url) for url in settings.DATABASE_REPLICA_URLS]
+_turns = itertools.count()
+
+# user -> monotonic time until which their reads stay on the primary
+_recent_writers: Dict[str, float] = {}
+
+
+def token_subject(authorization: Optional[str]) -> Optional[str]:
+    """User id from an "Authorization: Bearer <jwt>" header, if valid."""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = decode_token(token)
+    subject = payload.get("sub") if payload else None
+    return str(subject) if subject is not None else None
+
+
+def _write_key(user: str) -> str:
+    return f"db:recent-write:{user}"
+
+
+async def mark_write(user: str) -> None:
+    """Keep user's reads on the primary for DATABASE_READ_YOUR_WRITES_SECONDS."""
+    now = time.monotonic()
+    if len(_recent_writers) > 10000:
+        for stale in [key for key, until in _recent_writers.items() if until <= now]:
+            del _recent_writers[stale]
+    _recent_writers[user] = now + settings.DATABASE_READ_YOUR_WRITES_SECONDS
+    await cache_set(_write_key(user), 1, settings.DATABASE_READ_YOUR_WRITES_SECONDS)
+
+
+async def wrote_recently(user: str) -> bool:
+    """Whether user wrote within the read-your-writes window, through any process."""
+    until = _recent_writers.get(user)
+    if until is not None and until > time.monotonic():
+        return True
+    return await cache_get(_write_key(user)) is not None
+
+
+async def route_read(user: Optional[str]) -> Optional[Replica]:
+    """
+    Replica to serve a read for user, or None for the primary.
+
+    Replicas take turns; a lagging or unreachable one is skipped.
+    """
+    if user is not None and await wrote_recently(user):
+        metrics.DB_READ_SESSIONS.inc(target="primary", reason="read_your_writes")
+        return None
+
+    start = next(_turns)
+    for offset in range(len(REPLICAS)):
+        replica = REPLICAS[(start + offset) % len(REPLICAS)]
+        if await replica.current_lag() <= settings.DATABASE_REPLICA_MAX_LAG_SECONDS:
+            metrics.DB_READ_SESSIONS.inc(target=replica.name, reason="replica")
+            return replica
+
+    metrics.DB_READ_SESSIONS.inc(target="primary", reason="replicas_lagging")
+    return None
+
+
+async def get_read_db(request: Request, db: AsyncSession = Depends(get_db)) -> AsyncSession:
+    """
+    Dependency function to get a session for read-only endpoints.
+
+    A replica session when one is within the lag limit and the user has
+    not written recently; otherwise the request's primary session (which
+    only connects if used).
+
+    Yields:
+        AsyncSession: Database session
+    """
+    replica = await route_read(token_subject(request.headers.get("authorization"))) if REPLICAS else None
+    if replica is None:
+        yield db
+        return
+
+    async with replica.sessions() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+class _RequestWrites:
+    __slots__ = ("wrote",)
+
+    def __init__(self):
+        self.wrote = False
+
+
+_request_writes: ContextVar[Optional[_RequestWrites]] = ContextVar("request_writes", default=None)
+
+
+def _note_write() -> None:
+    writes = _request_writes.get()
+    if writes is not None:
+        writes.wrote = True
+
+
+@event.listens_for(Session, "after_flush")
+def _flushed(session, flush_context):
+    # Only called when the flush had changes to write
+    _note_write()
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _executed(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _note_write()
+
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI middleware sending a user's reads to the primary after their
+    own writes.
+
+    The mark is stored before the response starts, so the client's next
+    request already sees it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        writes = _RequestWrites()
+        marked = False
+
+        async def mark():
+            nonlocal marked
+            marked = True
+            user = token_subject(Headers(scope=scope).get("authorization"))
+            if user is not None:
+                await mark_write(user)
+
+        async def send_after_marking(message):
+            if message["type"] == "http.response.start" and writes.wrote:
+                await mark()
+            await send(message)
+
+        token = _request_writes.set(writes)
+        try:
+            await self.app(scope, receive, send_after_marking)
+        finally:
+            _request_writes.reset(token)
+            # Writes made after the response started (background tasks)
+            if writes.wrote and not marked:
+                await mark()
@@ -3,10 +3,24 @@ CreatorBank FastAPI Application.
 
 Main application entry point for the CreatorBank backend API.
 """
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+from app.core import metrics, profiler, query_log
 from app.core.config import settings
 from app.api.v1.router import api_router
+from app.db import replicas
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    monitor = asyncio.create_task(metrics.monitor_event_loop()) if settings.METRICS_ENABLED else None
+    yield
+    if monitor is not None:
+        monitor.cancel()
 
 
 # Create FastAPI application
@@ -16,6 +30,7 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -27,6 +42,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+if settings.QUERY_DEBUG:
+    app.add_middleware(query_log.QueryDebugMiddleware)
+
+if settings.PROFILER_TOKEN:
+    app.add_middleware(profiler.ProfilerMiddleware)
+
+if settings.DATABASE_REPLICA_URLS:
+    app.add_middleware(replicas.ReadYourWritesMiddleware)
+
 
 @app.get("/")
 async def root():
@@ -45,6 +72,14 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Metrics of this worker process in the Prometheus text format."""
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=404)
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
@@ -5,8 +5,11 @@ from app.models.user import User, UserTier
 from app.models.platform import ConnectedPlatform, Earning, PlatformType
 from app.models.expense import Expense, ExpenseCategory
 from app.models.transaction import Transaction, TransactionType
-from app.models.invoice import Invoice, InvoiceStatus
+from app.models.invoice import Invoice, InvoiceStatus, InvoicePdfStatus, InvoiceSequence
 from app.models.prediction import Prediction
+from app.models.balance import BalanceCheckpoint
+from app.models.email import EmailOutbox, EmailStatus
+from app.models.feature import EarningFeature, EarningFeatureState
 
 __all__ = [
     "User",
@@ -20,5 +23,12 @@ __all__ = [
     "TransactionType",
     "Invoice",
     "InvoiceStatus",
+    "InvoicePdfStatus",
+    "InvoiceSequence",
     "Prediction",
+    "BalanceCheckpoint",
+    "EmailOutbox",
+    "EmailStatus",
+    "EarningFeature",
+    "EarningFeatureState",
 ]
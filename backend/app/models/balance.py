@@ -0,0 +1,38 @@
+"""
+Account balance checkpoint models.
+"""
+from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+
+
+class BalanceCheckpoint(Base):
+    """
+    Account balance at the start of a month.
+
+    Balance queries start from the latest checkpoint and only sum the
+    transactions after it, instead of the whole ledger.
+    """
+    __tablename__ = "balance_checkpoints"
+    __table_args__ = (
+        UniqueConstraint("user_id", "currency", "checkpoint_date", name="uq_balance_checkpoints_user_currency_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    currency = Column(String(3), nullable=False, default="USD")
+
+    # Sum of all transactions strictly before checkpoint_date
+    checkpoint_date = Column(DateTime(timezone=True), nullable=False)
+    balance = Column(Numeric(14, 2), nullable=False)
+    transaction_count = Column(Integer, nullable=False, default=0)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    user = relationship("User")
+
+    def __repr__(self):
+        return f"<BalanceCheckpoint(user_id={self.user_id}, date={self.checkpoint_date}, balance={self.balance})>"
@@ -0,0 +1,62 @@
+"""
+Outbound email queue models.
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, Text, Index
+from sqlalchemy.sql import func, text
+from sqlalchemy.orm import relationship
+import enum
+from app.db.base import Base
+
+
+class EmailStatus(str, enum.Enum):
+    """Delivery state of a queued email."""
+    PENDING = "pending"  # Waiting for (another) delivery attempt
+    SENDING = "sending"  # Claimed by a delivery worker
+    SENT = "sent"
+    FAILED = "failed"  # Gave up after EMAIL_MAX_ATTEMPTS
+
+
+class EmailOutbox(Base):
+    """
+    An email waiting to be (or already) delivered.
+
+    Request handlers and jobs only insert rows here, in the same
+    transaction as the change the email is about; a delivery worker
+    sends them. The idempotency key makes enqueueing the same email
+    twice a no-op.
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Delivery workers only scan undelivered mail
+        Index(
+            "ix_email_outbox_due",
+            "next_attempt_at",
+            postgresql_where=text("status IN ('PENDING', 'SENDING')"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    idempotency_key = Column(String(255), unique=True, nullable=False)
+
+    # Message
+    to_email = Column(String(255), nullable=False)
+    from_email = Column(String(255), nullable=True)  # NULL = FROM_EMAIL
+    subject = Column(String(500), nullable=False)
+    body = Column(Text, nullable=False)
+
+    # Delivery
+    status = Column(SQLEnum(EmailStatus), nullable=False, default=EmailStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text, nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    user = relationship("User")
+
+    def __repr__(self):
+        return f"<EmailOutbox(id={self.id}, to={self.to_email}, status={self.status})>"
@@ -1,8 +1,8 @@
 """
 Expense tracking models.
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Numeric, ForeignKey, Enum as SQLEnum, Text
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Numeric, ForeignKey, Enum as SQLEnum, Text, JSON, Index
+from sqlalchemy.sql import func, text
 from sqlalchemy.orm import relationship
 import enum
 from app.db.base import Base
@@ -30,6 +30,14 @@ class Expense(Base):
     Tracks creator business expenses for tax deductions.
     """
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index("ix_expenses_user_id_expense_date", "user_id", "expense_date"),
+        Index(
+            "ix_expenses_ocr_pending",
+            "id",
+            postgresql_where=text("receipt_url IS NOT NULL AND ocr_processed_at IS NULL"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -54,6 +62,9 @@ class Expense(Base):
 
     # OCR/AI extracted data
     ocr_confidence = Column(Numeric(5, 2), nullable=True)  # 0-100
+    ocr_extracted = Column(JSON, nullable=True)  # amount, date, vendor read from the receipt
+    ocr_processed_at = Column(DateTime(timezone=True), nullable=True)  # NULL with a receipt = queued for OCR
+    ocr_claimed_at = Column(DateTime(timezone=True), nullable=True)  # When an OCR worker took it
     ai_suggested_category = Column(SQLEnum(ExpenseCategory), nullable=True)
 
     # Timestamps
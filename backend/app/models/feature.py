@@ -0,0 +1,53 @@
+"""
+Feature store models.
+"""
+from sqlalchemy import Column, Integer, Date, DateTime, Float, ForeignKey, JSON, Numeric
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class EarningFeature(Base):
+    """
+    One creator's earnings features as of the end of one day.
+
+    Rows are appended daily by the feature store job, so training and
+    inference read ready-made vectors instead of re-aggregating raw
+    earnings. Rolling windows include the row's own day.
+    """
+    __tablename__ = "earning_features"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    feature_date = Column(Date, primary_key=True)
+
+    # Earnings on feature_date
+    amount = Column(Numeric(12, 2), nullable=False)
+
+    # Rolling daily means
+    mean_7d = Column(Float, nullable=False)
+    mean_30d = Column(Float, nullable=False)
+    mean_90d = Column(Float, nullable=False)
+
+    volatility_30d = Column(Float, nullable=False)  # Std dev of daily earnings
+    active_days_30d = Column(Integer, nullable=False)  # Days with any earnings
+
+    # This weekday's average over the last 13 weeks relative to mean_90d
+    weekday_factor = Column(Float, nullable=False)
+
+    # Share of the last 30 days' earnings per platform type
+    platform_mix = Column(JSON, nullable=False, default={})
+
+
+class EarningFeatureState(Base):
+    """
+    How far a creator's features have been computed.
+
+    Earnings created after `watermark` (late or backdated payouts) make
+    the job recompute that creator's features from the earliest day they
+    touch.
+    """
+    __tablename__ = "earning_feature_state"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    computed_through = Column(Date, nullable=False)  # Last feature_date written
+    watermark = Column(DateTime(timezone=True), nullable=False)  # Newest earning created_at seen
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
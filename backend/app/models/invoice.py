@@ -1,8 +1,8 @@
 """
 Brand deal invoice and contract models.
 """
-from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey, Enum as SQLEnum, Text, Boolean
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Numeric, ForeignKey, Enum as SQLEnum, Text, Boolean, UniqueConstraint, Index
+from sqlalchemy.sql import func, text
 from sqlalchemy.orm import relationship
 import enum
 from app.db.base import Base
@@ -18,6 +18,13 @@ class InvoiceStatus(str, enum.Enum):
     CANCELLED = "cancelled"
 
 
+class InvoicePdfStatus(str, enum.Enum):
+    """State of an invoice's rendered PDF."""
+    PENDING = "pending"  # Queued for rendering
+    READY = "ready"
+    FAILED = "failed"
+
+
 class Invoice(Base):
     """
     Brand deal invoice.
@@ -25,12 +32,22 @@ class Invoice(Base):
     Manages invoicing for sponsorships and brand partnerships.
     """
     __tablename__ = "invoices"
+    __table_args__ = (
+        # Numbers come from per-user sequences, so they are unique per user
+        UniqueConstraint("user_id", "invoice_number", name="uq_invoices_user_id_invoice_number"),
+        # Overdue sweeps only scan unpaid invoices
+        Index(
+            "ix_invoices_open_due_date",
+            "due_date",
+            postgresql_where=text("status IN ('SENT', 'VIEWED', 'OVERDUE')"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     # Invoice details
-    invoice_number = Column(String(50), unique=True, nullable=False)
+    invoice_number = Column(String(50), nullable=False)
     status = Column(SQLEnum(InvoiceStatus), default=InvoiceStatus.DRAFT)
 
     # Amount
@@ -53,6 +70,9 @@ class Invoice(Base):
 
     # Document storage
     pdf_url = Column(String(500), nullable=True)  # Generated PDF
+    pdf_status = Column(SQLEnum(InvoicePdfStatus), nullable=True)  # NULL = never requested
+    pdf_content_hash = Column(String(64), nullable=True)  # Hash of the content pdf_url was rendered from
+    pdf_rendered_at = Column(DateTime(timezone=True), nullable=True)
 
     # Payment tracking
     payment_method = Column(String(50), nullable=True)  # ACH, wire, PayPal, etc.
@@ -71,3 +91,25 @@ class Invoice(Base):
 
     def __repr__(self):
         return f"<Invoice(id={self.id}, number={self.invoice_number}, status={self.status})>"
+
+
+class InvoiceSequence(Base):
+    """
+    Per-user invoice number counter.
+
+    next_value is the first number not yet reserved. Processes reserve
+    numbers in blocks, so this row is written once per block rather
+    than once per invoice.
+    """
+    __tablename__ = "invoice_sequences"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    next_value = Column(BigInteger, nullable=False, default=1)
+    number_format = Column(String(50), nullable=False)  # e.g. "INV-{year}-{seq:04d}"
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<InvoiceSequence(user_id={self.user_id}, next_value={self.next_value})>"
@@ -1,7 +1,7 @@
 """
 Platform connection and earnings models.
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Numeric, ForeignKey, Enum as SQLEnum, Text, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Numeric, ForeignKey, Enum as SQLEnum, Text, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -43,7 +43,7 @@ class ConnectedPlatform(Base):
     platform_username = Column(String, nullable=True)  # Display name on platform
 
     # Platform metadata
-    metadata = Column(JSON, default={})  # Store channel stats, subscriber count, etc.
+    extra_data = Column("metadata", JSON, default={})  # Store channel stats, subscriber count, etc.
 
     # Status
     is_active = Column(Boolean, default=True)
@@ -66,8 +66,16 @@ class Earning(Base):
     Historical earnings from platforms.
 
     Tracks all earnings from connected platforms over time.
+
+    In PostgreSQL this table is range-partitioned by month on earning_date
+    (migration 0002), with primary key (id, earning_date). Queries should
+    filter on earning_date whenever possible so the planner can prune
+    partitions.
     """
     __tablename__ = "earnings"
+    __table_args__ = (
+        Index("ix_earnings_user_id_earning_date", "user_id", "earning_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -88,7 +96,7 @@ class Earning(Base):
     is_taxable = Column(Boolean, default=True)
 
     # Metadata
-    metadata = Column(JSON, default={})  # Video ID, stream ID, etc.
+    extra_data = Column("metadata", JSON, default={})  # Video ID, stream ID, etc.
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,8 +1,8 @@
 """
 ML model predictions for income forecasting.
 """
-from sqlalchemy import Column, Integer, DateTime, Numeric, ForeignKey, Text, JSON
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey, Text, JSON, Index
+from sqlalchemy.sql import func, text
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -14,6 +14,16 @@ class Prediction(Base):
     Stores ML model predictions for future earnings.
     """
     __tablename__ = "predictions"
+    __table_args__ = (
+        # Latest forecast run per user
+        Index("ix_predictions_user_id_prediction_date", "user_id", "prediction_date"),
+        # Predictions still waiting for their actual earnings
+        Index(
+            "ix_predictions_unsettled_forecast_date",
+            "forecast_date",
+            postgresql_where=text("actual_amount IS NULL"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -1,7 +1,7 @@
 """
 Bank account transaction models.
 """
-from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey, Enum as SQLEnum, Text
+from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey, Enum as SQLEnum, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -25,8 +25,17 @@ class Transaction(Base):
     Bank account transaction.
 
     Tracks all financial transactions in the CreatorBank account.
+
+    In PostgreSQL this table is range-partitioned by month on
+    transaction_date (migration 0002), with primary key
+    (id, transaction_date). Queries should filter on transaction_date
+    whenever possible so the planner can prune partitions.
     """
     __tablename__ = "transactions"
+    __table_args__ = (
+        Index("ix_transactions_user_id_transaction_date", "user_id", "transaction_date"),
+        Index("ix_transactions_user_id_external_id", "user_id", "external_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -47,8 +56,9 @@ class Transaction(Base):
 
     # External references
     external_id = Column(String(255), nullable=True)  # Bank provider transaction ID
-    related_earning_id = Column(Integer, ForeignKey("earnings.id"), nullable=True)
+    related_earning_id = Column(Integer, nullable=True)  # earnings is partitioned, so no FK
     related_expense_id = Column(Integer, ForeignKey("expenses.id"), nullable=True)
+    match_confidence = Column(Numeric(5, 2), nullable=True)  # 0-100, set by reconciliation
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
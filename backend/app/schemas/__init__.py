@@ -16,6 +16,30 @@ from app.schemas.platform import (
     PlatformOAuthInitiate,
     PlatformOAuthCallback,
 )
+from app.schemas.expense import (
+    ReceiptUploadResponse,
+    DeductionTotal,
+    CategoryDeduction,
+    MonthDeduction,
+    VendorDeduction,
+    DeductionsReport,
+    DuplicateExpenseCandidate,
+)
+from app.schemas.search import VendorSuggestion
+from app.schemas.invoice import (
+    InvoicePdfStatusResponse,
+    InvoiceCreate,
+    InvoiceResponse,
+    InvoiceNumbering,
+)
+from app.schemas.transaction import (
+    StatementImportResult,
+    ReconciliationMatch,
+    ReconciliationReport,
+    BalanceResponse,
+    BalancePoint,
+    BalanceHistory,
+)
 
 __all__ = [
     "UserBase",
@@ -29,4 +53,22 @@ __all__ = [
     "EarningsSummary",
     "PlatformOAuthInitiate",
     "PlatformOAuthCallback",
+    "ReceiptUploadResponse",
+    "DeductionTotal",
+    "CategoryDeduction",
+    "MonthDeduction",
+    "VendorDeduction",
+    "DeductionsReport",
+    "DuplicateExpenseCandidate",
+    "VendorSuggestion",
+    "InvoicePdfStatusResponse",
+    "InvoiceCreate",
+    "InvoiceResponse",
+    "InvoiceNumbering",
+    "StatementImportResult",
+    "ReconciliationMatch",
+    "ReconciliationReport",
+    "BalanceResponse",
+    "BalancePoint",
+    "BalanceHistory",
 ]
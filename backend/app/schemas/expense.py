@@ -0,0 +1,57 @@
+"""
+Expense schemas.
+"""
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from app.models.expense import ExpenseCategory
+
+
+class ReceiptUploadResponse(BaseModel):
+    """Result of a receipt upload."""
+    expense_id: int
+    receipt_url: str
+    receipt_filename: str
+    sha256: str
+    size: int
+    deduplicated: bool  # True when identical content was already stored
+
+
+class DeductionTotal(BaseModel):
+    """Expense and deductible totals for one rollup bucket."""
+    expense_count: int
+    total_amount: float
+    deductible_amount: float
+
+
+class CategoryDeduction(DeductionTotal):
+    category: ExpenseCategory
+
+
+class MonthDeduction(DeductionTotal):
+    month: int  # 1-12
+
+
+class VendorDeduction(DeductionTotal):
+    vendor: Optional[str]
+
+
+class DeductionsReport(BaseModel):
+    """Deductible expenses for a tax year."""
+    year: int
+    expense_count: int
+    total_expenses: float
+    total_deductible: float
+    by_category: List[CategoryDeduction]
+    by_month: List[MonthDeduction]
+    by_vendor: List[VendorDeduction]  # Largest deductions first
+
+
+class DuplicateExpenseCandidate(BaseModel):
+    """Two expenses that may record the same purchase."""
+    expense_id: int
+    duplicate_id: int
+    amount: float
+    days_apart: float
+    vendor_similarity: float  # 0-1
@@ -0,0 +1,59 @@
+"""
+Invoice schemas.
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from app.models.invoice import InvoicePdfStatus, InvoiceStatus
+
+
+class InvoicePdfStatusResponse(BaseModel):
+    """Rendering state of an invoice PDF."""
+    invoice_id: int
+    status: Optional[InvoicePdfStatus]  # None until a PDF is requested
+    pdf_url: Optional[str]
+    rendered_at: Optional[datetime]
+    up_to_date: bool  # False when the invoice changed since it was rendered
+
+
+class InvoiceCreate(BaseModel):
+    """Schema for creating an invoice."""
+    invoice_number: Optional[str] = Field(None, max_length=50)  # Assigned from the user's sequence if omitted
+    amount: Decimal = Field(..., gt=0)
+    currency: str = Field("USD", min_length=3, max_length=3)
+    client_name: str = Field(..., max_length=255)
+    client_email: Optional[str] = Field(None, max_length=255)
+    client_address: Optional[str] = None
+    description: str
+    notes: Optional[str] = None
+    invoice_date: datetime
+    due_date: datetime
+
+
+class InvoiceResponse(BaseModel):
+    """Schema for invoice response."""
+    id: int
+    invoice_number: str
+    status: InvoiceStatus
+    amount: float
+    currency: str
+    client_name: str
+    client_email: Optional[str]
+    description: str
+    invoice_date: datetime
+    due_date: datetime
+    paid_date: Optional[datetime]
+    pdf_url: Optional[str]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class InvoiceNumbering(BaseModel):
+    """A user's invoice number format."""
+    number_format: str = Field(..., max_length=50)  # str.format fields: {seq} (required), {year}, {month}
+    example: Optional[str] = None
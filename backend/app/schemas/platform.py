@@ -15,7 +15,7 @@ class ConnectedPlatformResponse(BaseModel):
     platform_username: Optional[str]
     is_active: bool
     last_synced_at: Optional[datetime]
-    metadata: Dict[str, Any] = {}
+    metadata: Dict[str, Any] = Field(default={}, validation_alias="extra_data")
     created_at: datetime
 
     class Config:
@@ -0,0 +1,10 @@
+"""
+Search schemas.
+"""
+from pydantic import BaseModel
+
+
+class VendorSuggestion(BaseModel):
+    """A vendor or merchant name matching a typeahead query."""
+    name: str
+    score: float  # Trigram similarity, 0-1
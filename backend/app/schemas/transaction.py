@@ -0,0 +1,53 @@
+"""
+Bank transaction schemas.
+"""
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date, datetime
+
+
+class StatementImportResult(BaseModel):
+    """Result of a bank statement import."""
+    filename: Optional[str]
+    format: str
+    read: int
+    inserted: int
+    duplicates: int
+
+
+class ReconciliationMatch(BaseModel):
+    """A transaction linked to an earning or expense."""
+    transaction_id: int
+    earning_id: Optional[int] = None
+    expense_id: Optional[int] = None
+    confidence: float  # 0-100
+
+
+class ReconciliationReport(BaseModel):
+    """Result of a reconciliation run."""
+    transactions_checked: int
+    matched_earnings: int
+    matched_expenses: int
+    unmatched: int
+    matches: List[ReconciliationMatch]
+
+
+class BalanceResponse(BaseModel):
+    """Account balance at a point in time."""
+    at: datetime
+    currency: str
+    balance: float
+
+
+class BalancePoint(BaseModel):
+    """End-of-day balance."""
+    date: date
+    balance: float
+
+
+class BalanceHistory(BaseModel):
+    """Daily balance series."""
+    currency: str
+    start: date
+    end: date
+    points: List[BalancePoint]
@@ -0,0 +1,256 @@
+"""
+Account balance service.
+
+Answers "what was the balance on date X" from monthly checkpoints plus
+a scan of at most one month of transactions, instead of summing the
+whole ledger.
+"""
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, delete, insert, func, extract
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.balance import BalanceCheckpoint
+from app.models.transaction import Transaction, TransactionType
+
+
+class BalanceService:
+    """Service for point-in-time and historical account balances."""
+
+    # Tax savings moves are internal allocations tracked on
+    # User.tax_savings_balance, not money entering or leaving the account.
+    EXCLUDED_TYPES = (TransactionType.TAX_SAVINGS,)
+
+    @staticmethod
+    def _month_start(value: datetime) -> datetime:
+        return datetime(value.year, value.month, 1)
+
+    @staticmethod
+    def _next_month(value: datetime) -> datetime:
+        return datetime(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+    @staticmethod
+    def _ledger_filter(query, user_id: int, currency: Optional[str] = None):
+        query = (
+            query.where(Transaction.user_id == user_id)
+            .where(Transaction.transaction_type.not_in(BalanceService.EXCLUDED_TYPES))
+        )
+        if currency is not None:
+            query = query.where(Transaction.currency == currency)
+        return query
+
+    @staticmethod
+    async def _latest_checkpoint(
+        db: AsyncSession,
+        user_id: int,
+        currency: str,
+        at: datetime,
+    ) -> Optional[BalanceCheckpoint]:
+        result = await db.execute(
+            select(BalanceCheckpoint)
+            .where(BalanceCheckpoint.user_id == user_id)
+            .where(BalanceCheckpoint.currency == currency)
+            .where(BalanceCheckpoint.checkpoint_date <= at)
+            .order_by(BalanceCheckpoint.checkpoint_date.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def refresh_checkpoints(
+        db: AsyncSession,
+        user_id: int,
+        now: Optional[datetime] = None,
+    ) -> int:
+        """
+        Write checkpoints for every completed month since the latest one.
+
+        Only transactions after the latest checkpoint are aggregated, in
+        a single GROUP BY month query.
+
+        Args:
+            db: Database session
+            user_id: User to checkpoint
+            now: Reference time, defaults to now (UTC)
+
+        Returns:
+            Number of checkpoints written
+        """
+        current_month = BalanceService._month_start(now or datetime.utcnow())
+
+        result = await db.execute(
+            select(func.max(BalanceCheckpoint.checkpoint_date))
+            .where(BalanceCheckpoint.user_id == user_id)
+        )
+        latest = result.scalar()
+
+        running: Dict[str, Tuple[Decimal, int]] = {}
+        if latest is not None:
+            latest = latest.replace(tzinfo=None)
+            result = await db.execute(
+                select(BalanceCheckpoint)
+                .where(BalanceCheckpoint.user_id == user_id)
+                .where(BalanceCheckpoint.checkpoint_date == latest)
+            )
+            running = {
+                checkpoint.currency: (Decimal(checkpoint.balance), checkpoint.transaction_count)
+                for checkpoint in result.scalars()
+            }
+            if latest >= current_month:
+                return 0
+
+        year = extract("year", Transaction.transaction_date)
+        month = extract("month", Transaction.transaction_date)
+        query = BalanceService._ledger_filter(
+            select(Transaction.currency, year, month, func.sum(Transaction.amount), func.count())
+            .where(Transaction.transaction_date < current_month),
+            user_id,
+        )
+        if latest is not None:
+            query = query.where(Transaction.transaction_date >= latest)
+        result = await db.execute(query.group_by(Transaction.currency, year, month))
+
+        monthly: Dict[datetime, Dict[str, Tuple[Decimal, int]]] = {}
+        for currency, row_year, row_month, total, count in result:
+            monthly.setdefault(datetime(int(row_year), int(row_month), 1), {})[currency or "USD"] = (
+                Decimal(total or 0), count,
+            )
+
+        if latest is None:
+            if not monthly:
+                return 0
+            latest = min(monthly)
+
+        rows = []
+        month_start = latest
+        while month_start < current_month:
+            for currency, (total, count) in monthly.get(month_start, {}).items():
+                balance, seen = running.get(currency, (Decimal(0), 0))
+                running[currency] = (balance + total, seen + count)
+
+            month_start = BalanceService._next_month(month_start)
+            rows.extend(
+                {
+                    "user_id": user_id,
+                    "currency": currency,
+                    "checkpoint_date": month_start,
+                    "balance": balance,
+                    "transaction_count": count,
+                }
+                for currency, (balance, count) in running.items()
+            )
+
+        if rows:
+            await db.execute(insert(BalanceCheckpoint), rows)
+            await db.commit()
+        return len(rows)
+
+    @staticmethod
+    async def invalidate_from(db: AsyncSession, user_id: int, since: datetime) -> None:
+        """
+        Drop checkpoints that a backdated transaction at `since` makes stale.
+
+        The caller commits. The next refresh_checkpoints rebuilds them.
+        """
+        await db.execute(
+            delete(BalanceCheckpoint)
+            .where(BalanceCheckpoint.user_id == user_id)
+            .where(BalanceCheckpoint.checkpoint_date > since)
+        )
+
+    @staticmethod
+    async def balance_at(
+        db: AsyncSession,
+        user_id: int,
+        at: datetime,
+        currency: str = "USD",
+    ) -> Decimal:
+        """
+        Get the account balance at a point in time.
+
+        Args:
+            db: Database session
+            user_id: Account owner
+            at: Point in time (inclusive)
+            currency: Balance currency
+
+        Returns:
+            Balance after all transactions up to and including `at`
+        """
+        checkpoint = await BalanceService._latest_checkpoint(db, user_id, currency, at)
+
+        query = BalanceService._ledger_filter(
+            select(func.sum(Transaction.amount)).where(Transaction.transaction_date <= at),
+            user_id,
+            currency,
+        )
+        base = Decimal(0)
+        if checkpoint is not None:
+            base = Decimal(checkpoint.balance)
+            query = query.where(Transaction.transaction_date >= checkpoint.checkpoint_date)
+
+        result = await db.execute(query)
+        return base + Decimal(result.scalar() or 0)
+
+    @staticmethod
+    async def balance_history(
+        db: AsyncSession,
+        user_id: int,
+        start: date,
+        end: date,
+        currency: str = "USD",
+    ) -> List[Tuple[date, Decimal]]:
+        """
+        Get the end-of-day balance for every day in a range.
+
+        Uses the checkpoint before `start` and one grouped query for the
+        daily deltas, no matter how many days are requested.
+
+        Args:
+            db: Database session
+            user_id: Account owner
+            start: First day (inclusive)
+            end: Last day (inclusive)
+            currency: Balance currency
+
+        Returns:
+            (day, balance) pairs, one per day
+        """
+        start_at = datetime.combine(start, time.min)
+        end_before = datetime.combine(end + timedelta(days=1), time.min)
+
+        checkpoint = await BalanceService._latest_checkpoint(db, user_id, currency, start_at)
+
+        day = func.date(Transaction.transaction_date)
+        query = BalanceService._ledger_filter(
+            select(day, func.sum(Transaction.amount)).where(Transaction.transaction_date < end_before),
+            user_id,
+            currency,
+        )
+        balance = Decimal(0)
+        if checkpoint is not None:
+            balance = Decimal(checkpoint.balance)
+            query = query.where(Transaction.transaction_date >= checkpoint.checkpoint_date)
+
+        result = await db.execute(query.group_by(day))
+
+        deltas: Dict[date, Decimal] = {}
+        for row_day, total in result:
+            if isinstance(row_day, str):
+                row_day = date.fromisoformat(row_day)
+            elif isinstance(row_day, datetime):
+                row_day = row_day.date()
+            if row_day < start:
+                balance += Decimal(total or 0)
+            else:
+                deltas[row_day] = Decimal(total or 0)
+
+        series = []
+        current = start
+        while current <= end:
+            balance += deltas.get(current, Decimal(0))
+            series.append((current, balance))
+            current += timedelta(days=1)
+        return series
@@ -0,0 +1,305 @@
+"""
+Expense categorization service.
+
+Predicts an ExpenseCategory from an expense's vendor and description
+with a linear model over hashed character n-grams. The model is kept in
+the model registry and memory-mapped, so every worker process shares one
+copy of the weights, and inference is done in batches of thousands of
+expenses per call.
+"""
+import logging
+from datetime import datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select, update, bindparam, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.expense import Expense, ExpenseCategory
+from app.services.model_registry import ModelRegistry, get_model_registry
+from app.services.statement_import_service import StatementImportService
+
+if TYPE_CHECKING:
+    from sklearn.linear_model import SGDClassifier
+
+logger = logging.getLogger(__name__)
+
+
+# Cold-start examples used until the model has learned from real expenses
+SEED_EXAMPLES = [
+    ("B&H Photo Sony camera", ExpenseCategory.EQUIPMENT),
+    ("Apple Store MacBook Pro", ExpenseCategory.EQUIPMENT),
+    ("Amazon Shure microphone", ExpenseCategory.EQUIPMENT),
+    ("Best Buy monitor", ExpenseCategory.EQUIPMENT),
+    ("Adobe Creative Cloud subscription", ExpenseCategory.SOFTWARE),
+    ("Epidemic Sound music license", ExpenseCategory.SOFTWARE),
+    ("Google Workspace", ExpenseCategory.SOFTWARE),
+    ("AWS hosting", ExpenseCategory.SOFTWARE),
+    ("Delta Air Lines flight", ExpenseCategory.TRAVEL),
+    ("Uber trip", ExpenseCategory.TRAVEL),
+    ("Marriott hotel stay", ExpenseCategory.TRAVEL),
+    ("Airbnb conference accommodation", ExpenseCategory.TRAVEL),
+    ("Starbucks coffee meeting", ExpenseCategory.MEALS),
+    ("Chipotle lunch with editor", ExpenseCategory.MEALS),
+    ("Restaurant dinner with sponsor", ExpenseCategory.MEALS),
+    ("DoorDash food delivery", ExpenseCategory.MEALS),
+    ("Facebook Ads campaign", ExpenseCategory.MARKETING),
+    ("Google Ads promotion", ExpenseCategory.MARKETING),
+    ("Vistaprint business cards", ExpenseCategory.MARKETING),
+    ("Udemy course", ExpenseCategory.EDUCATION),
+    ("Skillshare membership", ExpenseCategory.EDUCATION),
+    ("VidCon conference ticket", ExpenseCategory.EDUCATION),
+    ("WeWork studio rent", ExpenseCategory.OFFICE),
+    ("Comcast internet bill", ExpenseCategory.OFFICE),
+    ("Staples office supplies", ExpenseCategory.OFFICE),
+    ("CPA tax preparation", ExpenseCategory.PROFESSIONAL_SERVICES),
+    ("LegalZoom attorney contract review", ExpenseCategory.PROFESSIONAL_SERVICES),
+    ("Hiscox business insurance", ExpenseCategory.INSURANCE),
+    ("State Farm equipment insurance policy", ExpenseCategory.INSURANCE),
+    ("Upwork video editor contractor", ExpenseCategory.TEAM),
+    ("Fiverr thumbnail designer", ExpenseCategory.TEAM),
+    ("Gusto payroll", ExpenseCategory.TEAM),
+    ("Miscellaneous", ExpenseCategory.OTHER),
+]
+
+
+class ExpenseCategorizer:
+    """Hashed n-gram features plus an incrementally trainable linear model."""
+
+    MODEL_TYPE = "expense_categorizer"
+
+    CLASSES = np.array([category.value for category in ExpenseCategory])
+
+    N_FEATURES = 2 ** 18
+
+    def __init__(self, classifier: Optional["SGDClassifier"] = None, trained_until: Optional[datetime] = None):
+        # scikit-learn takes longer to import than the rest of the app;
+        # only processes that categorize pay for it
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.linear_model import SGDClassifier
+
+        # Hashing keeps no vocabulary, so new vendors never need a refit
+        self.vectorizer = HashingVectorizer(
+            analyzer="char_wb",
+            ngram_range=(3, 5),
+            n_features=self.N_FEATURES,
+            alternate_sign=False,
+        )
+        self.classifier = classifier or SGDClassifier(loss="log_loss", alpha=1e-5, random_state=0)
+        self.trained_until = trained_until
+
+    @staticmethod
+    def text(vendor: Optional[str], description: Optional[str]) -> str:
+        """Model input for an expense."""
+        merchant = StatementImportService.normalize_merchant(vendor) or ""
+        return f"{merchant} {description or ''}".strip().lower()
+
+    @classmethod
+    def bootstrap(cls) -> "ExpenseCategorizer":
+        """Categorizer trained on the built-in seed examples only."""
+        categorizer = cls()
+        texts = [cls.text(None, text) for text, _ in SEED_EXAMPLES]
+        labels = [category.value for _, category in SEED_EXAMPLES]
+        for _ in range(20):
+            categorizer.partial_fit(texts, labels)
+        return categorizer
+
+    def predict(self, texts: Sequence[str]) -> List[Tuple[ExpenseCategory, float]]:
+        """
+        Predict categories for a batch of texts in one vectorized call.
+
+        Returns:
+            (category, probability) per text
+        """
+        if not texts:
+            return []
+        probabilities = self.classifier.predict_proba(self.vectorizer.transform(texts))
+        best = probabilities.argmax(axis=1)
+        classes = self.classifier.classes_
+        return [
+            (ExpenseCategory(classes[index]), float(probabilities[row, index]))
+            for row, index in enumerate(best)
+        ]
+
+    def partial_fit(
+        self,
+        texts: Sequence[str],
+        labels: Sequence[str],
+        sample_weight: Optional[Sequence[float]] = None,
+    ) -> None:
+        """Update the model with a batch of labelled examples."""
+        self.classifier.partial_fit(
+            self.vectorizer.transform(texts),
+            np.asarray(labels),
+            classes=self.CLASSES,
+            sample_weight=None if sample_weight is None else np.asarray(sample_weight),
+        )
+
+    def save(self, path: str) -> None:
+        """Write the model uncompressed, so it can be memory-mapped."""
+        import joblib
+
+        joblib.dump({"classifier": self.classifier, "trained_until": self.trained_until}, path)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "ExpenseCategorizer":
+        """
+        Load a saved model.
+
+        With mmap the weight arrays are read-only views of the file,
+        shared between processes; pass mmap=False to train further.
+        """
+        import joblib
+
+        state = joblib.load(path, mmap_mode="r" if mmap else None)
+        return cls(state["classifier"], state["trained_until"])
+
+
+@lru_cache
+def _seed_categorizer() -> ExpenseCategorizer:
+    return ExpenseCategorizer.bootstrap()
+
+
+def get_categorizer(registry: Optional[ModelRegistry] = None) -> ExpenseCategorizer:
+    """
+    Live categorizer from the model registry, loaded once per process
+    and swapped when a retrained version is published.
+
+    Falls back to the seed-trained model until one is published.
+    """
+    registry = registry or get_model_registry()
+    categorizer = registry.get(ExpenseCategorizer.MODEL_TYPE, load=ExpenseCategorizer.load)
+    return categorizer or _seed_categorizer()
+
+
+class CategorizationService:
+    """Service for suggesting expense categories and learning from users."""
+
+    # User corrections of a wrong suggestion count more than confirmations
+    CORRECTION_WEIGHT = 5.0
+
+    @staticmethod
+    async def suggest_pending(
+        db: AsyncSession,
+        user_id: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> int:
+        """
+        Fill in ai_suggested_category for expenses that have none.
+
+        Each batch is one predict call and one executemany UPDATE.
+        updated_at is left alone, so the suggestions don't look like
+        user edits to retrain.
+
+        Args:
+            db: Database session
+            user_id: Only this user's expenses, defaults to everyone's
+            batch_size: Expenses per batch, defaults to CATEGORIZER_BATCH_SIZE
+
+        Returns:
+            Number of expenses categorized
+        """
+        batch_size = batch_size or settings.CATEGORIZER_BATCH_SIZE
+        categorizer = get_categorizer()
+
+        statement = (
+            update(Expense.__table__)
+            .where(Expense.__table__.c.id == bindparam("expense_id"))
+            .values(
+                ai_suggested_category=bindparam("suggested"),
+                # Not a user edit: retrain reads updated_at as "category changed"
+                updated_at=Expense.__table__.c.updated_at,
+            )
+        )
+
+        categorized = 0
+        last_id = 0
+        while True:
+            query = (
+                select(Expense.id, Expense.vendor, Expense.description)
+                .where(Expense.ai_suggested_category.is_(None))
+                .where(Expense.id > last_id)
+                .order_by(Expense.id)
+                .limit(batch_size)
+            )
+            if user_id is not None:
+                query = query.where(Expense.user_id == user_id)
+            rows = (await db.execute(query)).all()
+            if not rows:
+                break
+
+            predictions = categorizer.predict([
+                ExpenseCategorizer.text(vendor, description) for _, vendor, description in rows
+            ])
+            await db.execute(statement, [
+                {"expense_id": expense_id, "suggested": category}
+                for (expense_id, _, _), (category, _) in zip(rows, predictions)
+            ])
+            await db.commit()
+
+            categorized += len(rows)
+            last_id = rows[-1][0]
+
+        return categorized
+
+    @staticmethod
+    async def retrain(
+        db: AsyncSession,
+        batch_size: Optional[int] = None,
+        registry: Optional[ModelRegistry] = None,
+    ) -> int:
+        """
+        Incrementally train on expenses categorized since the last run.
+
+        Expenses where the user's category differs from the suggestion
+        are weighted by CORRECTION_WEIGHT. Only new or edited expenses
+        are read, so each run costs as much as the changes since the last.
+
+        Args:
+            db: Database session
+            batch_size: Expenses per partial_fit call
+            registry: Model registry to publish to, defaults to this process's
+
+        Returns:
+            Number of expenses trained on
+        """
+        batch_size = batch_size or settings.CATEGORIZER_BATCH_SIZE
+        registry = registry or get_model_registry()
+
+        # Not memory-mapped: training writes to the weights
+        version = registry.current_version(ExpenseCategorizer.MODEL_TYPE)
+        categorizer = (
+            ExpenseCategorizer.load(registry.path(ExpenseCategorizer.MODEL_TYPE, version), mmap=False)
+            if version is not None else ExpenseCategorizer.bootstrap()
+        )
+
+        changed_at = func.coalesce(Expense.updated_at, Expense.created_at)
+        query = select(
+            Expense.id, Expense.vendor, Expense.description,
+            Expense.category, Expense.ai_suggested_category, changed_at,
+        )
+        if categorizer.trained_until is not None:
+            query = query.where(changed_at > categorizer.trained_until)
+
+        trained = 0
+        trained_until = categorizer.trained_until
+        result = await db.stream(query.order_by(changed_at).execution_options(yield_per=batch_size))
+        async for rows in result.partitions(batch_size):
+            categorizer.partial_fit(
+                [ExpenseCategorizer.text(vendor, description) for _, vendor, description, _, _, _ in rows],
+                [category.value for _, _, _, category, _, _ in rows],
+                [
+                    CategorizationService.CORRECTION_WEIGHT if suggested is not None and suggested != category else 1.0
+                    for _, _, _, category, suggested, _ in rows
+                ],
+            )
+            trained += len(rows)
+            trained_until = rows[-1][5]
+
+        if trained:
+            categorizer.trained_until = trained_until
+            registry.publish(ExpenseCategorizer.MODEL_TYPE, categorizer, dump=ExpenseCategorizer.save)
+            logger.info("Expense categorizer trained on %d expenses", trained)
+        return trained
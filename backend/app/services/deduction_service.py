@@ -0,0 +1,178 @@
+"""
+Tax deduction service.
+
+Rolls a creator's expenses up into deductible totals per category,
+month and vendor. All summing happens in one GROUP BY query; results
+are cached until the user's expenses change.
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import select, func, case, and_, extract
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache_bump, cache_get, cache_set, cache_version
+from app.core.config import settings
+from app.models.expense import Expense, ExpenseCategory
+
+
+class DeductionService:
+    """Service for deductible expense totals and reports."""
+
+    # Statutory caps on deduction_percentage per category
+    DEDUCTION_CAPS = {
+        ExpenseCategory.MEALS: Decimal(50),
+    }
+
+    # Vendors listed individually in the report, by deductible amount
+    VENDOR_LIMIT = 50
+
+    @staticmethod
+    def deductible_amount():
+        """SQL expression for an expense's deductible amount."""
+        percentage = func.coalesce(Expense.deduction_percentage, 100)
+        capped = case(
+            *[
+                (and_(Expense.category == category, percentage > cap), cap)
+                for category, cap in DeductionService.DEDUCTION_CAPS.items()
+            ],
+            else_=percentage,
+        )
+        return case(
+            (Expense.is_deductible == False, 0),
+            else_=Expense.amount * capped / 100,
+        )
+
+    @staticmethod
+    def _year_range(year: int) -> Tuple[datetime, datetime]:
+        return datetime(year, 1, 1), datetime(year + 1, 1, 1)
+
+    @staticmethod
+    async def deductible_total(
+        db: AsyncSession,
+        user_id: int,
+        start: datetime,
+        end: datetime,
+    ) -> Decimal:
+        """
+        Sum of deductible expenses in [start, end).
+
+        Args:
+            db: Database session
+            user_id: Expense owner
+            start: Range start (inclusive)
+            end: Range end (exclusive)
+
+        Returns:
+            Deductible amount
+        """
+        result = await db.execute(
+            select(func.sum(DeductionService.deductible_amount()))
+            .where(Expense.user_id == user_id)
+            .where(Expense.expense_date >= start)
+            .where(Expense.expense_date < end)
+        )
+        return Decimal(result.scalar() or 0)
+
+    @staticmethod
+    def _version_key(user_id: int) -> str:
+        return f"deductions:version:{user_id}"
+
+    @staticmethod
+    async def expenses_changed(user_ids: Iterable[int]) -> None:
+        """
+        Invalidate the cached reports of users whose expenses changed.
+
+        Call after committing any insert, update or delete of expenses
+        that touches amounts, dates, categories, vendors or deductibility.
+        """
+        await cache_bump(*(DeductionService._version_key(user_id) for user_id in set(user_ids)))
+
+    @staticmethod
+    async def build_report(db: AsyncSession, user_id: int, year: int) -> Dict[str, Any]:
+        """
+        Compute the deductions report for a tax year.
+
+        Args:
+            db: Database session
+            user_id: Expense owner
+            year: Tax year
+
+        Returns:
+            Totals plus per-category, per-month and per-vendor rollups
+        """
+        start, end = DeductionService._year_range(year)
+        month = extract("month", Expense.expense_date)
+        result = await db.execute(
+            select(
+                Expense.category,
+                month,
+                Expense.vendor,
+                func.count(),
+                func.sum(Expense.amount),
+                func.sum(DeductionService.deductible_amount()),
+            )
+            .where(Expense.user_id == user_id)
+            .where(Expense.expense_date >= start)
+            .where(Expense.expense_date < end)
+            .group_by(Expense.category, month, Expense.vendor)
+        )
+
+        categories: Dict[ExpenseCategory, list] = {}
+        months: Dict[int, list] = {}
+        vendors: Dict[Optional[str], list] = {}
+        for category, row_month, vendor, count, total, deductible in result:
+            total, deductible = Decimal(total or 0), Decimal(deductible or 0)
+            for rollup, key in ((categories, category), (months, int(row_month)), (vendors, vendor)):
+                entry = rollup.setdefault(key, [0, Decimal(0), Decimal(0)])
+                entry[0] += count
+                entry[1] += total
+                entry[2] += deductible
+
+        top_vendors = sorted(vendors.items(), key=lambda item: item[1][2], reverse=True)
+        return {
+            "year": year,
+            "expense_count": sum(entry[0] for entry in categories.values()),
+            "total_expenses": float(sum(entry[1] for entry in categories.values())),
+            "total_deductible": float(sum(entry[2] for entry in categories.values())),
+            "by_category": [
+                {"category": category.value, "expense_count": count,
+                 "total_amount": float(total), "deductible_amount": float(deductible)}
+                for category, (count, total, deductible)
+                in sorted(categories.items(), key=lambda item: item[1][2], reverse=True)
+            ],
+            "by_month": [
+                {"month": row_month, "expense_count": count,
+                 "total_amount": float(total), "deductible_amount": float(deductible)}
+                for row_month, (count, total, deductible) in sorted(months.items())
+            ],
+            "by_vendor": [
+                {"vendor": vendor, "expense_count": count,
+                 "total_amount": float(total), "deductible_amount": float(deductible)}
+                for vendor, (count, total, deductible) in top_vendors[:DeductionService.VENDOR_LIMIT]
+            ],
+        }
+
+    @staticmethod
+    async def get_report(db: AsyncSession, user_id: int, year: int) -> Dict[str, Any]:
+        """
+        Deductions report for a tax year, served from cache when fresh.
+
+        Cache keys include the user's expenses version, which
+        expenses_changed advances, so checking freshness costs one cache
+        round trip and no queries. Without the cache the report is built
+        directly.
+        """
+        version = await cache_version(DeductionService._version_key(user_id))
+        if version is None:
+            return await DeductionService.build_report(db, user_id, year)
+
+        key = f"deductions:{user_id}:{year}:{version}"
+        cached = await cache_get(key)
+        if cached is not None:
+            return cached
+
+        report = await DeductionService.build_report(db, user_id, year)
+        await cache_set(key, report, settings.DEDUCTIONS_CACHE_TTL_SECONDS)
+        return report
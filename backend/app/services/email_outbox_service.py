@@ -0,0 +1,227 @@
+"""
+Email outbox service.
+
+Mail is queued as rows in email_outbox, in the caller's transaction,
+and delivered later by a worker. Workers lease batches of due rows with
+SKIP LOCKED, send each batch through the pooled email backend and
+record the outcome with one executemany UPDATE. Failed messages are
+retried with exponential backoff.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import select, update, bindparam
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.models.email import EmailOutbox, EmailStatus
+from app.services.email_service import EmailBackend, EmailMessage, get_email_backend
+
+logger = logging.getLogger(__name__)
+
+
+class EmailOutboxService:
+    """Service for queueing and delivering outbound email."""
+
+    # A claimed batch not reported back within this time (worker died)
+    # becomes due again
+    LEASE_SECONDS = 300
+
+    MAX_RETRY_DELAY_SECONDS = 6 * 3600
+
+    @staticmethod
+    async def enqueue_many(db: AsyncSession, emails: Sequence[Dict[str, Any]]) -> List[str]:
+        """
+        Queue emails for delivery.
+
+        Does not commit, so the emails are sent if and only if the
+        caller's transaction commits. Emails whose idempotency key is
+        already queued (or sent) are skipped.
+
+        Args:
+            db: Database session
+            emails: Dicts with idempotency_key, to_email, subject, body
+                and optionally user_id and from_email
+
+        Returns:
+            Idempotency keys of the emails newly queued
+        """
+        if not emails:
+            return []
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            insert = postgresql.insert
+        elif dialect == "sqlite":
+            insert = sqlite.insert
+        else:
+            raise ValueError(f"Unsupported database for the email outbox: {dialect}")
+
+        rows = [
+            {
+                "user_id": email.get("user_id"),
+                "idempotency_key": email["idempotency_key"],
+                "to_email": email["to_email"],
+                "from_email": email.get("from_email"),
+                "subject": email["subject"],
+                "body": email["body"],
+                "status": EmailStatus.PENDING,
+                "attempts": 0,
+                "next_attempt_at": datetime.utcnow(),
+            }
+            for email in emails
+        ]
+        result = await db.execute(
+            insert(EmailOutbox)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[EmailOutbox.idempotency_key])
+            .returning(EmailOutbox.idempotency_key)
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    async def enqueue(
+        db: AsyncSession,
+        idempotency_key: str,
+        to_email: str,
+        subject: str,
+        body: str,
+        user_id: Optional[int] = None,
+    ) -> bool:
+        """
+        Queue one email (see enqueue_many).
+
+        Returns:
+            False if an email with this idempotency key was already queued
+        """
+        return await EmailOutboxService.enqueue_many(db, [{
+            "idempotency_key": idempotency_key,
+            "to_email": to_email,
+            "subject": subject,
+            "body": body,
+            "user_id": user_id,
+        }]) == [idempotency_key]
+
+    @staticmethod
+    def retry_delay(attempts: int) -> timedelta:
+        """Backoff after a failed attempt: base, 2x base, 4x base, ... capped."""
+        seconds = settings.EMAIL_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+        return timedelta(seconds=min(seconds, EmailOutboxService.MAX_RETRY_DELAY_SECONDS))
+
+    @staticmethod
+    async def claim_batch(db: AsyncSession, limit: int, now: datetime) -> List[EmailOutbox]:
+        """
+        Lease the next due emails to this worker.
+
+        A single UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED)
+        marks them SENDING, counts the attempt and pushes next_attempt_at
+        out by the lease, then commits, so concurrent workers never send
+        the same email and a crashed worker's batch is picked up again.
+        """
+        due = (
+            select(EmailOutbox.id)
+            .where(EmailOutbox.status.in_((EmailStatus.PENDING, EmailStatus.SENDING)))
+            .where(EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(due))
+            .values(
+                status=EmailStatus.SENDING,
+                attempts=EmailOutbox.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=EmailOutboxService.LEASE_SECONDS),
+            )
+            .returning(EmailOutbox)
+            .execution_options(synchronize_session=False)
+        )
+        emails = result.scalars().all()
+        await db.commit()
+        return emails
+
+    @staticmethod
+    async def deliver_pending(
+        db: AsyncSession,
+        backend: Optional[EmailBackend] = None,
+        batch_size: Optional[int] = None,
+        max_batches: Optional[int] = None,
+    ) -> int:
+        """
+        Send due emails until none are left.
+
+        Args:
+            db: Database session
+            backend: Email backend, defaults to the configured one
+            batch_size: Emails per batch, defaults to EMAIL_BATCH_SIZE
+            max_batches: Stop after this many batches
+
+        Returns:
+            Number of emails sent
+        """
+        backend = backend or get_email_backend()
+        batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+
+        table = EmailOutbox.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("email_id"))
+            .values(
+                status=bindparam("new_status"),
+                next_attempt_at=bindparam("retry_at"),
+                last_error=bindparam("error"),
+                sent_at=bindparam("delivered_at"),
+            )
+        )
+
+        sent = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            now = datetime.utcnow()
+            emails = await EmailOutboxService.claim_batch(db, batch_size, now)
+            if not emails:
+                break
+
+            messages = [
+                EmailMessage(to=email.to_email, subject=email.subject, body=email.body, from_email=email.from_email)
+                for email in emails
+            ]
+            try:
+                accepted = await run_in_threadpool(backend.send_many, messages)
+                errors = [None if ok else "Rejected by email provider" for ok in accepted]
+            except Exception as e:
+                logger.warning("Email batch of %d failed: %s", len(messages), e)
+                errors = [str(e) or e.__class__.__name__] * len(messages)
+
+            done = datetime.utcnow()
+            rows = []
+            for email, error in zip(emails, errors):
+                if error is None:
+                    rows.append({
+                        "email_id": email.id, "new_status": EmailStatus.SENT,
+                        "retry_at": email.next_attempt_at, "error": None, "delivered_at": done,
+                    })
+                else:
+                    gave_up = email.attempts >= settings.EMAIL_MAX_ATTEMPTS
+                    rows.append({
+                        "email_id": email.id,
+                        "new_status": EmailStatus.FAILED if gave_up else EmailStatus.PENDING,
+                        "retry_at": done + EmailOutboxService.retry_delay(email.attempts),
+                        "error": error[:1000],
+                        "delivered_at": None,
+                    })
+
+            await db.execute(statement, rows)
+            await db.commit()
+
+            delivered = sum(error is None for error in errors)
+            sent += delivered
+            batches += 1
+            logger.info("Sent %d of %d queued emails", delivered, len(emails))
+
+        return sent
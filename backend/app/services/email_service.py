@@ -0,0 +1,228 @@
+"""
+Outbound email.
+
+Pluggable delivery backends: SendGrid's HTTP API or SMTP for production
+and a local in-memory backend for development and tests. Backends are
+created once per process and keep their connection open between sends.
+
+Nothing outside the delivery worker should send directly; queue mail
+with EmailOutboxService instead.
+"""
+import logging
+import smtplib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from email.message import EmailMessage as MimeMessage
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EmailMessage:
+    """A plain-text email."""
+    to: str
+    subject: str
+    body: str
+    from_email: Optional[str] = None
+
+
+class EmailBackend(ABC):
+    """Interface for email delivery backends."""
+
+    @abstractmethod
+    def send_many(self, messages: Sequence[EmailMessage]) -> List[bool]:
+        """
+        Send messages, reusing one connection for all of them.
+
+        Returns:
+            Whether each message was accepted, in order
+        """
+
+    def close(self) -> None:
+        """Release any open connection."""
+
+
+class LocalEmailBackend(EmailBackend):
+    """Keeps sent messages in memory (development and tests)."""
+
+    def __init__(self):
+        self.sent: List[EmailMessage] = []
+
+    def send_many(self, messages: Sequence[EmailMessage]) -> List[bool]:
+        for message in messages:
+            logger.info("Email to %s: %s", message.to, message.subject)
+        self.sent.extend(messages)
+        return [True] * len(messages)
+
+
+class SmtpEmailBackend(EmailBackend):
+    """
+    SMTP delivery over a persistent connection.
+
+    The connection is opened on first use and reused by later batches;
+    if the server drops it mid-batch, it is reopened and the batch
+    continues. If reopening fails, the messages already sent keep their
+    result and the rest of the batch is reported failed.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str = "",
+        password: str = "",
+        use_tls: bool = True,
+        timeout: float = 30,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self._connection: Optional[smtplib.SMTP] = None
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            connection.starttls()
+        if self.username:
+            connection.login(self.username, self.password)
+        return connection
+
+    def _connection_alive(self) -> bool:
+        if self._connection is None:
+            return False
+        try:
+            return self._connection.noop()[0] == 250
+        except smtplib.SMTPException:
+            return False
+
+    def _send(self, message: EmailMessage) -> None:
+        mime = MimeMessage()
+        mime["From"] = message.from_email or settings.FROM_EMAIL
+        mime["To"] = message.to
+        mime["Subject"] = message.subject
+        mime.set_content(message.body)
+        self._connection.send_message(mime)
+
+    def send_many(self, messages: Sequence[EmailMessage]) -> List[bool]:
+        if not messages:
+            return []
+        if not self._connection_alive():
+            self.close()
+            self._connection = self._connect()
+
+        results = []
+        for index, message in enumerate(messages):
+            try:
+                self._send(message)
+                results.append(True)
+                continue
+            except smtplib.SMTPServerDisconnected:
+                pass
+            except smtplib.SMTPException as e:
+                logger.warning("Email to %s failed: %s", message.to, e)
+                results.append(False)
+                continue
+
+            # Dropped mid-batch: reconnect and retry this message
+            try:
+                self._connection = self._connect()
+            except OSError as e:  # SMTPException is an OSError too
+                logger.warning("Reconnecting to %s failed: %s", self.host, e)
+                self._connection = None
+                results.extend([False] * (len(messages) - index))
+                break
+            try:
+                self._send(message)
+                results.append(True)
+            except smtplib.SMTPException as e:
+                logger.warning("Email to %s failed: %s", message.to, e)
+                results.append(False)
+        return results
+
+    def close(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.quit()
+            except smtplib.SMTPException:
+                pass
+            self._connection = None
+
+
+class SendGridEmailBackend(EmailBackend):
+    """
+    SendGrid v3 mail API over a pooled keep-alive HTTP client.
+
+    Messages with the same sender, subject and body go out in one API
+    call, one personalization per recipient (so recipients don't see
+    each other).
+    """
+
+    API_URL = "https://api.sendgrid.com/v3/mail/send"
+    MAX_PERSONALIZATIONS = 1000
+
+    def __init__(self, api_key: str, timeout: float = 30):
+        # Imported here so only processes that send through SendGrid load it
+        import httpx
+
+        self._client = httpx.Client(
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=timeout,
+        )
+
+    def send_many(self, messages: Sequence[EmailMessage]) -> List[bool]:
+        import httpx
+
+        groups: Dict[Tuple[str, str, str], List[int]] = {}
+        for position, message in enumerate(messages):
+            sender = message.from_email or settings.FROM_EMAIL
+            groups.setdefault((sender, message.subject, message.body), []).append(position)
+
+        results = [False] * len(messages)
+        for (sender, subject, body), positions in groups.items():
+            for start in range(0, len(positions), self.MAX_PERSONALIZATIONS):
+                chunk = positions[start:start + self.MAX_PERSONALIZATIONS]
+                payload = {
+                    "personalizations": [{"to": [{"email": messages[i].to}]} for i in chunk],
+                    "from": {"email": sender},
+                    "subject": subject,
+                    "content": [{"type": "text/plain", "value": body}],
+                }
+                try:
+                    response = self._client.post(self.API_URL, json=payload)
+                except httpx.HTTPError as e:
+                    logger.warning("SendGrid request failed: %s", e)
+                    continue
+                if response.status_code == 202:
+                    for i in chunk:
+                        results[i] = True
+                else:
+                    logger.warning("SendGrid rejected %d emails: %s %s", len(chunk), response.status_code, response.text[:200])
+        return results
+
+    def close(self) -> None:
+        self._client.close()
+
+
+@lru_cache
+def get_email_backend() -> EmailBackend:
+    """Configured email backend (one instance, and connection, per process)."""
+    if settings.EMAIL_BACKEND == "local":
+        return LocalEmailBackend()
+    if settings.EMAIL_BACKEND == "smtp":
+        return SmtpEmailBackend(
+            settings.SMTP_HOST,
+            settings.SMTP_PORT,
+            settings.SMTP_USERNAME,
+            settings.SMTP_PASSWORD,
+            settings.SMTP_USE_TLS,
+        )
+    if settings.EMAIL_BACKEND == "sendgrid":
+        return SendGridEmailBackend(settings.SENDGRID_API_KEY)
+    raise ValueError(f"Unsupported email backend: {settings.EMAIL_BACKEND}")
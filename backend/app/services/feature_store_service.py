@@ -0,0 +1,330 @@
+"""
+Earnings feature store service.
+
+Keeps one feature vector per creator per day in earning_features,
+appending the days since the last run. Each run only reads the earnings
+inside the longest rolling window (90 days) before the first new day,
+so its cost follows the new data, not the size of each creator's
+history. A creator's full history is read once, when they first get
+features.
+
+Earnings created since the last run that fall on already computed days
+(late payouts, imports) cause that creator's features to be recomputed
+from the earliest such day, as long as it is within RESTATE_DAYS.
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select, insert, delete, bindparam, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.feature import EarningFeature, EarningFeatureState
+from app.models.platform import ConnectedPlatform, Earning
+
+logger = logging.getLogger(__name__)
+
+
+def _as_date(value) -> date:
+    """func.date() result as a date (SQLite returns text)."""
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _rolling_sum(values: np.ndarray, days: int) -> np.ndarray:
+    """Sum over each day and the days - 1 before it, per row."""
+    totals = np.cumsum(np.pad(values, ((0, 0), (1, 0))), axis=1)
+    end = np.arange(1, values.shape[1] + 1)
+    return totals[:, end] - totals[:, np.maximum(end - days, 0)]
+
+
+def compute_features(daily: np.ndarray, by_platform: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Rolling features for every day of many creators at once.
+
+    Args:
+        daily: (creators, days) earnings per day
+        by_platform: platform type -> (creators, days) earnings per day
+
+    Returns:
+        Feature name -> (creators, days) values; platform_mix maps each
+        platform type to its (creators, days) share
+    """
+    mean_7d = _rolling_sum(daily, 7) / 7
+    mean_30d = _rolling_sum(daily, 30) / 30
+    mean_90d = _rolling_sum(daily, 90) / 90
+    variance = _rolling_sum(daily ** 2, 30) / 30 - mean_30d ** 2
+
+    # Same weekday over the last 13 weeks
+    weeks = FeatureStoreService.WEEKDAY_WEEKS
+    same_weekday = np.zeros_like(daily)
+    for week in range(weeks):
+        shift = 7 * week
+        same_weekday[:, shift:] += daily[:, :daily.shape[1] - shift]
+    weekday_mean = same_weekday / weeks
+
+    total_30d = _rolling_sum(daily, 30)
+    return {
+        "mean_7d": mean_7d,
+        "mean_30d": mean_30d,
+        "mean_90d": mean_90d,
+        "volatility_30d": np.sqrt(np.maximum(variance, 0)),
+        "active_days_30d": _rolling_sum((daily > 0).astype(float), 30),
+        "weekday_factor": np.divide(weekday_mean, mean_90d, out=np.ones_like(daily), where=mean_90d > 0),
+        "platform_mix": {
+            platform: np.divide(_rolling_sum(values, 30), total_30d, out=np.zeros_like(daily), where=total_30d > 0)
+            for platform, values in by_platform.items()
+        },
+    }
+
+
+class FeatureStoreService:
+    """Service for the incremental earnings feature store."""
+
+    # Longest rolling window; earnings this far back are read as context
+    WINDOW_DAYS = 90
+    WEEKDAY_WEEKS = 13
+
+    # Oldest history read when a creator first gets features
+    BACKFILL_DAYS = 730
+
+    # Late earnings older than this don't trigger a recompute
+    RESTATE_DAYS = 60
+
+    USERS_PER_BATCH = 1000
+
+    @staticmethod
+    async def _start_days(
+        db: AsyncSession,
+        user_ids: List[int],
+        today: date,
+    ) -> Tuple[Dict[int, date], Dict[int, date], Dict[int, datetime]]:
+        """
+        First day to (re)compute per creator.
+
+        Returns:
+            (start day for creators without features, start day for
+            creators with features, newest earning created_at seen)
+        """
+        result = await db.execute(
+            select(EarningFeatureState).where(EarningFeatureState.user_id.in_(user_ids))
+        )
+        states = {state.user_id: state for state in result.scalars()}
+        new_ids = [user_id for user_id in user_ids if user_id not in states]
+        watermarks = {user_id: state.watermark for user_id, state in states.items()}
+
+        new_starts: Dict[int, date] = {}
+        if new_ids:
+            result = await db.execute(
+                select(Earning.user_id, func.min(func.date(Earning.earning_date)), func.max(Earning.created_at))
+                .where(Earning.user_id.in_(new_ids))
+                .where(Earning.earning_date >= today - timedelta(days=FeatureStoreService.BACKFILL_DAYS))
+                .where(Earning.earning_date < today)
+                .group_by(Earning.user_id)
+            )
+            for user_id, first_day, newest in result:
+                new_starts[user_id] = _as_date(first_day)
+                watermarks[user_id] = newest
+
+        starts = {user_id: state.computed_through + timedelta(days=1) for user_id, state in states.items()}
+        if states:
+            # Earnings added since the last run, on days already computed
+            result = await db.execute(
+                select(Earning.user_id, func.min(func.date(Earning.earning_date)), func.max(Earning.created_at))
+                .join(EarningFeatureState, EarningFeatureState.user_id == Earning.user_id)
+                .where(Earning.user_id.in_(list(states)))
+                .where(Earning.earning_date >= today - timedelta(days=FeatureStoreService.RESTATE_DAYS))
+                .where(Earning.earning_date < today)
+                # >=: rows sharing the watermark's timestamp may have
+                # committed after the last run read them
+                .where(Earning.created_at >= EarningFeatureState.watermark)
+                .group_by(Earning.user_id)
+            )
+            for user_id, first_day, newest in result:
+                starts[user_id] = min(starts[user_id], _as_date(first_day))
+                watermarks[user_id] = max(watermarks[user_id], newest)
+
+        return new_starts, starts, watermarks
+
+    @staticmethod
+    async def _daily_matrix(
+        db: AsyncSession,
+        user_ids: List[int],
+        start: date,
+        end: date,
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Earnings per day from start to end (exclusive), total and per platform type."""
+        day = func.date(Earning.earning_date)
+        result = await db.execute(
+            select(Earning.user_id, day, ConnectedPlatform.platform_type, func.sum(Earning.amount))
+            .join(ConnectedPlatform, ConnectedPlatform.id == Earning.platform_id)
+            .where(Earning.user_id.in_(user_ids))
+            .where(Earning.earning_date >= start)
+            .where(Earning.earning_date < end)
+            .group_by(Earning.user_id, day, ConnectedPlatform.platform_type)
+        )
+
+        rows = {user_id: row for row, user_id in enumerate(user_ids)}
+        shape = (len(user_ids), (end - start).days)
+        daily = np.zeros(shape)
+        by_platform: Dict[str, np.ndarray] = defaultdict(lambda: np.zeros(shape))
+        for user_id, earned_on, platform_type, amount in result:
+            column = (_as_date(earned_on) - start).days
+            daily[rows[user_id], column] += float(amount)
+            by_platform[platform_type.value][rows[user_id], column] += float(amount)
+        return daily, dict(by_platform)
+
+    @staticmethod
+    async def _write(
+        db: AsyncSession,
+        starts: Dict[int, date],
+        end: date,
+        replace: bool,
+    ) -> int:
+        """
+        Compute and store features from each creator's start day up to
+        end (exclusive), first deleting any rows from the start day on
+        if replace is set.
+        """
+        user_ids = list(starts)
+        window_start = min(starts.values()) - timedelta(days=FeatureStoreService.WINDOW_DAYS - 1)
+        daily, by_platform = await FeatureStoreService._daily_matrix(db, user_ids, window_start, end)
+        features = compute_features(daily, by_platform)
+
+        rows = []
+        for row, user_id in enumerate(user_ids):
+            for column in range((starts[user_id] - window_start).days, daily.shape[1]):
+                rows.append({
+                    "user_id": user_id,
+                    "feature_date": window_start + timedelta(days=column),
+                    "amount": Decimal(str(round(daily[row, column], 2))),
+                    "mean_7d": float(features["mean_7d"][row, column]),
+                    "mean_30d": float(features["mean_30d"][row, column]),
+                    "mean_90d": float(features["mean_90d"][row, column]),
+                    "volatility_30d": float(features["volatility_30d"][row, column]),
+                    "active_days_30d": int(round(features["active_days_30d"][row, column])),
+                    "weekday_factor": float(features["weekday_factor"][row, column]),
+                    "platform_mix": {
+                        platform: round(float(share[row, column]), 4)
+                        for platform, share in features["platform_mix"].items()
+                        if share[row, column] > 0
+                    },
+                })
+
+        if replace:
+            await db.execute(
+                delete(EarningFeature.__table__).where(and_(
+                    EarningFeature.__table__.c.user_id == bindparam("restated_user_id"),
+                    EarningFeature.__table__.c.feature_date >= bindparam("restated_from"),
+                )),
+                [{"restated_user_id": user_id, "restated_from": day} for user_id, day in starts.items()],
+            )
+        if rows:
+            await db.execute(insert(EarningFeature.__table__), rows)
+        return len(rows)
+
+    @staticmethod
+    async def refresh(db: AsyncSession, today: Optional[date] = None) -> int:
+        """
+        Append features for every creator up to yesterday.
+
+        Covers creators with earnings in the last WINDOW_DAYS; older
+        creators' features would be all zeros. Each batch is committed
+        with its state, so an interrupted run resumes where it stopped.
+
+        Args:
+            db: Database session
+            today: First day not to compute (still incomplete), defaults to today (UTC)
+
+        Returns:
+            Number of feature rows written
+        """
+        today = today or datetime.utcnow().date()
+        written = 0
+        last_user_id = 0
+
+        while True:
+            result = await db.execute(
+                select(Earning.user_id)
+                .where(Earning.user_id > last_user_id)
+                .where(Earning.earning_date >= today - timedelta(days=FeatureStoreService.WINDOW_DAYS))
+                .distinct()
+                .order_by(Earning.user_id)
+                .limit(FeatureStoreService.USERS_PER_BATCH)
+            )
+            user_ids = result.scalars().all()
+            if not user_ids:
+                break
+            last_user_id = user_ids[-1]
+
+            new_starts, starts, watermarks = await FeatureStoreService._start_days(db, user_ids, today)
+            new_starts = {user_id: day for user_id, day in new_starts.items() if day < today}
+            starts = {user_id: day for user_id, day in starts.items() if day < today}
+            if not new_starts and not starts:
+                continue
+
+            # New creators need their whole history; keep them apart so
+            # the others only read the last window
+            if new_starts:
+                written += await FeatureStoreService._write(db, new_starts, today, replace=False)
+            if starts:
+                written += await FeatureStoreService._write(db, starts, today, replace=True)
+
+            done = list(new_starts) + list(starts)
+            await db.execute(delete(EarningFeatureState).where(EarningFeatureState.user_id.in_(done)))
+            await db.execute(insert(EarningFeatureState.__table__), [
+                {
+                    "user_id": user_id,
+                    "computed_through": today - timedelta(days=1),
+                    "watermark": watermarks[user_id],
+                }
+                for user_id in done
+            ])
+            await db.commit()
+            logger.info("Feature store: %d rows for %d creators", written, len(done))
+
+        return written
+
+    @staticmethod
+    async def daily_amounts(
+        db: AsyncSession,
+        user_ids: List[int],
+        start: date,
+        end: date,
+    ) -> Dict[int, Tuple[date, np.ndarray]]:
+        """
+        Daily earnings per creator from the feature store.
+
+        Each series runs from the creator's first feature day (or start)
+        up to the day before end; days past the creator's last feature
+        row are zero.
+
+        Returns:
+            user_id -> (first day, daily totals)
+        """
+        result = await db.execute(
+            select(EarningFeature.user_id, EarningFeature.feature_date, EarningFeature.amount)
+            .where(EarningFeature.user_id.in_(user_ids))
+            .where(EarningFeature.feature_date >= start)
+            .where(EarningFeature.feature_date < end)
+            .order_by(EarningFeature.user_id, EarningFeature.feature_date)
+        )
+
+        by_user: Dict[int, List[Tuple[date, float]]] = defaultdict(list)
+        for user_id, feature_date, amount in result:
+            by_user[user_id].append((feature_date, float(amount)))
+
+        series = {}
+        for user_id, days in by_user.items():
+            first = days[0][0]
+            history = np.zeros((end - first).days)
+            for feature_date, amount in days:
+                history[(feature_date - first).days] = amount
+            series[user_id] = (first, history)
+        return series
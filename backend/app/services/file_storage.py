@@ -0,0 +1,159 @@
+"""
+Content-addressed file storage.
+
+Files are stored under the SHA-256 of their content, so identical
+uploads share one copy. Only a local-filesystem backend exists today;
+an S3-compatible backend can implement the same interface.
+"""
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+
+class FileTooLargeError(ValueError):
+    """Raised when a streamed file exceeds the allowed size."""
+
+
+@dataclass
+class StoredFile:
+    """Result of storing a file."""
+    key: str
+    sha256: str
+    size: int
+    created: bool  # False when identical content was already stored
+
+
+class FileStorage(ABC):
+    """Interface for content-addressed storage backends."""
+
+    URL_SCHEME: str
+
+    @staticmethod
+    def content_key(namespace: str, sha256: str) -> str:
+        """Storage key for content with the given hash."""
+        return f"{namespace}/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+    def url(self, key: str) -> str:
+        """URL recorded on models, e.g. local://receipts/ab/cd/abcd..."""
+        return f"{self.URL_SCHEME}://{key}"
+
+    def key_from_url(self, url: Optional[str]) -> Optional[str]:
+        """Inverse of url(); None for URLs from another backend."""
+        prefix = f"{self.URL_SCHEME}://"
+        if not url or not url.startswith(prefix):
+            return None
+        return url[len(prefix):]
+
+    @abstractmethod
+    async def save_stream(
+        self,
+        namespace: str,
+        chunks: AsyncIterator[bytes],
+        max_size: Optional[int] = None,
+    ) -> StoredFile:
+        """Store a stream of chunks, hashing it on the way through."""
+
+    @abstractmethod
+    async def write_bytes(self, key: str, data: bytes) -> None:
+        """Store small derived content (thumbnails) under an explicit key."""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Whether content is stored under key."""
+
+    @abstractmethod
+    def local_path(self, key: str) -> str:
+        """Filesystem path of key, for serving and processing."""
+
+
+class LocalFileStorage(FileStorage):
+    """Content-addressed storage on the local filesystem."""
+
+    URL_SCHEME = "local"
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def local_path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid storage key: {key!r}")
+        return path
+
+    async def exists(self, key: str) -> bool:
+        return await run_in_threadpool(os.path.exists, self.local_path(key))
+
+    async def save_stream(
+        self,
+        namespace: str,
+        chunks: AsyncIterator[bytes],
+        max_size: Optional[int] = None,
+    ) -> StoredFile:
+        """
+        Write chunks to a temp file while hashing, then move it into place.
+
+        Only one chunk is held in memory at a time. If the content is
+        already stored, the temp file is discarded and the existing key
+        is returned.
+
+        Raises:
+            FileTooLargeError: The stream exceeded max_size bytes
+        """
+        staging = os.path.join(self.root, "tmp")
+        await run_in_threadpool(os.makedirs, staging, exist_ok=True)
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=staging)
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise FileTooLargeError(f"File exceeds {max_size} bytes")
+                    digest.update(chunk)
+                    await run_in_threadpool(temp_file.write, chunk)
+
+            sha256 = digest.hexdigest()
+            key = self.content_key(namespace, sha256)
+            path = self.local_path(key)
+
+            if await run_in_threadpool(os.path.exists, path):
+                return StoredFile(key=key, sha256=sha256, size=size, created=False)
+
+            await run_in_threadpool(os.makedirs, os.path.dirname(path), exist_ok=True)
+            await run_in_threadpool(os.replace, temp_path, path)
+            return StoredFile(key=key, sha256=sha256, size=size, created=True)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    async def write_bytes(self, key: str, data: bytes) -> None:
+        path = self.local_path(key)
+
+        def write():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(data)
+            os.replace(temp_path, path)
+
+        await run_in_threadpool(write)
+
+
+@lru_cache
+def get_storage() -> FileStorage:
+    """Configured storage backend (one instance per process)."""
+    if settings.STORAGE_BACKEND == "local":
+        return LocalFileStorage(settings.STORAGE_LOCAL_ROOT)
+    raise ValueError(f"Unsupported storage backend: {settings.STORAGE_BACKEND}")
@@ -0,0 +1,184 @@
+"""
+Forecast evaluation service.
+
+Fills in what creators actually earned on each forecast day once the day
+has settled, then scores the forecasts per model. Both steps are single
+set-based statements over a date window, never one prediction at a time.
+"""
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, update, func, case, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.platform import Earning
+from app.models.prediction import Prediction
+
+logger = logging.getLogger(__name__)
+
+
+class ForecastEvaluationService:
+    """Service for prediction actuals and model accuracy."""
+
+    # Days after a forecast day before its earnings are taken as final
+    # (platforms report some earnings late)
+    SETTLE_DAYS = 7
+
+    # Forecast days backfilled per UPDATE
+    WINDOW_DAYS = 31
+
+    @staticmethod
+    async def backfill_actuals(db: AsyncSession, today: Optional[date] = None) -> int:
+        """
+        Record actual earnings on every matured prediction.
+
+        Per window of forecast days: one UPDATE ... FROM a per-user, per-day
+        earnings aggregate, then one UPDATE setting zero for days without
+        earnings, committed together.
+
+        Args:
+            db: Database session
+            today: Reference day, defaults to today (UTC)
+
+        Returns:
+            Number of predictions filled in
+        """
+        today = today or datetime.utcnow().date()
+        settled = datetime.combine(today - timedelta(days=ForecastEvaluationService.SETTLE_DAYS), datetime.min.time())
+
+        result = await db.execute(
+            select(func.min(Prediction.forecast_date))
+            .where(Prediction.actual_amount.is_(None))
+            .where(Prediction.forecast_date < settled)
+        )
+        start = result.scalar()
+        if start is None:
+            return 0
+        start = datetime.combine(start.date(), datetime.min.time())
+
+        filled = 0
+        while start < settled:
+            end = min(start + timedelta(days=ForecastEvaluationService.WINDOW_DAYS), settled)
+            pending = and_(
+                Prediction.actual_amount.is_(None),
+                Prediction.forecast_date >= start,
+                Prediction.forecast_date < end,
+            )
+
+            day = func.date(Earning.earning_date)
+            daily = (
+                select(
+                    Earning.user_id.label("user_id"),
+                    day.label("day"),
+                    func.sum(Earning.amount).label("amount"),
+                )
+                .where(Earning.earning_date >= start)
+                .where(Earning.earning_date < end)
+                .group_by(Earning.user_id, day)
+                .subquery()
+            )
+            result = await db.execute(
+                update(Prediction)
+                .where(pending)
+                .where(Prediction.user_id == daily.c.user_id)
+                .where(func.date(Prediction.forecast_date) == daily.c.day)
+                .values(
+                    actual_amount=daily.c.amount,
+                    prediction_error=daily.c.amount - Prediction.predicted_amount,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            filled += result.rowcount
+
+            # No earnings that day
+            result = await db.execute(
+                update(Prediction)
+                .where(pending)
+                .values(actual_amount=0, prediction_error=-Prediction.predicted_amount)
+                .execution_options(synchronize_session=False)
+            )
+            filled += result.rowcount
+
+            await db.commit()
+            start = end
+
+        logger.info("Backfilled actuals on %d predictions", filled)
+        return filled
+
+    @staticmethod
+    async def accuracy_report(
+        db: AsyncSession,
+        start: datetime,
+        end: datetime,
+    ) -> List[Dict[str, Any]]:
+        """
+        Accuracy per model type and version over settled forecast days.
+
+        Args:
+            db: Database session
+            start: First forecast day included
+            end: End of the forecast days included (exclusive)
+
+        Returns:
+            Per model: prediction count, MAPE (days with earnings only),
+            WAPE, mean error (bias) and the share of actuals inside the
+            confidence interval
+        """
+        actual = Prediction.actual_amount
+        error = Prediction.prediction_error
+        result = await db.execute(
+            select(
+                Prediction.model_type,
+                Prediction.model_version,
+                func.count(),
+                func.avg(case((actual > 0, func.abs(error) / actual))),
+                func.sum(func.abs(error)),
+                func.sum(actual),
+                func.avg(error),
+                func.avg(case(
+                    (and_(
+                        actual >= Prediction.confidence_interval_lower,
+                        actual <= Prediction.confidence_interval_upper,
+                    ), 1.0),
+                    else_=0.0,
+                )),
+            )
+            .where(actual.is_not(None))
+            .where(Prediction.forecast_date >= start)
+            .where(Prediction.forecast_date < end)
+            .group_by(Prediction.model_type, Prediction.model_version)
+            .order_by(Prediction.model_type, Prediction.model_version)
+        )
+
+        return [
+            {
+                "model_type": model_type,
+                "model_version": model_version,
+                "predictions": count,
+                "mape": round(float(mape), 4) if mape is not None else None,
+                "wape": round(float(absolute_error) / float(total), 4) if total else None,
+                "bias": round(float(bias), 2),
+                "interval_coverage": round(float(coverage), 4),
+            }
+            for model_type, model_version, count, mape, absolute_error, total, bias, coverage in result
+        ]
+
+    @staticmethod
+    async def evaluate(db: AsyncSession, days: int = 90) -> List[Dict[str, Any]]:
+        """
+        Backfill actuals, then report accuracy over the last days.
+
+        Args:
+            db: Database session
+            days: Forecast days covered by the report
+
+        Returns:
+            accuracy_report rows
+        """
+        await ForecastEvaluationService.backfill_actuals(db)
+        end = datetime.utcnow()
+        report = await ForecastEvaluationService.accuracy_report(db, end - timedelta(days=days), end)
+        for row in report:
+            logger.info("Forecast accuracy: %s", row)
+        return report
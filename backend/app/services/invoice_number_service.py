@@ -0,0 +1,234 @@
+"""
+Invoice number allocation service.
+
+Each user has their own sequence (InvoiceSequence). Instead of touching
+that row for every invoice, a process reserves a block of numbers with
+one UPDATE ... RETURNING in its own short transaction and hands them out
+from memory, so bursts of invoice creation neither queue up on the
+sequence row lock nor retry on unique violations.
+
+Numbering is gap-tolerant by design:
+- Numbers are unique per user and increase within a process.
+- Numbers left in a block when a process exits, or when the user
+  changes their format, are never used, which leaves gaps.
+- With several API processes, invoices created at about the same time
+  may get numbers out of creation order.
+
+A sequence starts after the highest number the user already has in its
+format (invoices numbered by hand, or before sequences existed), and
+changing the format moves it past the numbers taken in the new one.
+"""
+import re
+from collections import deque
+from datetime import datetime
+from string import Formatter
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, update, insert, case
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.invoice import Invoice, InvoiceSequence
+
+
+class InvoiceNumberFormatError(ValueError):
+    """Raised for an unusable invoice number format."""
+
+
+# Reserved, not yet used numbers in this process:
+# user_id -> [next number, end of block (exclusive), format] per block
+_blocks: Dict[int, Deque[list]] = {}
+
+
+class InvoiceNumberService:
+    """Service for per-user invoice number sequences."""
+
+    MAX_NUMBER_LENGTH = 50
+
+    FIELDS = {"seq", "year", "month"}
+
+    @staticmethod
+    def format_number(number_format: str, seq: int, when: Optional[datetime] = None) -> str:
+        """
+        Apply a number format.
+
+        Formats use str.format fields: {seq} (required), {year}, {month},
+        e.g. "INV-{year}-{seq:04d}" gives "INV-2026-0042".
+        """
+        when = when or datetime.utcnow()
+        return number_format.format(seq=seq, year=when.year, month=when.month)
+
+    @staticmethod
+    def validate_format(number_format: str) -> None:
+        """
+        Check a format can produce valid, distinct invoice numbers.
+
+        Raises:
+            InvoiceNumberFormatError: The format is unusable
+        """
+        try:
+            fields = {field for _, field, _, _ in Formatter().parse(number_format) if field is not None}
+        except ValueError as e:
+            raise InvoiceNumberFormatError(f"Invalid format: {e}") from e
+        if "seq" not in fields:
+            raise InvoiceNumberFormatError("Format must include {seq}")
+        if not fields <= InvoiceNumberService.FIELDS:
+            raise InvoiceNumberFormatError(
+                f"Unknown fields: {', '.join(sorted(fields - InvoiceNumberService.FIELDS))}"
+            )
+        try:
+            first = InvoiceNumberService.format_number(number_format, 1)
+            large = InvoiceNumberService.format_number(number_format, 10 ** 9)
+        except (KeyError, IndexError, ValueError) as e:
+            raise InvoiceNumberFormatError(f"Invalid format: {e}") from e
+        if first == InvoiceNumberService.format_number(number_format, 2):
+            raise InvoiceNumberFormatError("Format must change with {seq}")
+        if len(large) > InvoiceNumberService.MAX_NUMBER_LENGTH:
+            raise InvoiceNumberFormatError(
+                f"Numbers must fit in {InvoiceNumberService.MAX_NUMBER_LENGTH} characters"
+            )
+
+    @staticmethod
+    def parse_seq(number_format: str, number: str) -> Optional[int]:
+        """
+        Read {seq} back out of an invoice number.
+
+        Returns:
+            The sequence number, or None if number doesn't fit the format
+        """
+        # Fields are numbers, maybe padded by their format spec
+        pattern, seen_seq = "", False
+        for literal, field, _, _ in Formatter().parse(number_format):
+            pattern += re.escape(literal)
+            if field == "seq":
+                pattern += r"\s*(?P=seq)" if seen_seq else r"\s*(?P<seq>\d+)"
+                seen_seq = True
+            elif field is not None:
+                pattern += r"\s*\d+"
+        match = re.fullmatch(pattern, number)
+        return int(match.group("seq")) if match else None
+
+    @staticmethod
+    async def first_free(db: AsyncSession, user_id: int, number_format: str) -> int:
+        """First sequence number after all of the user's invoices in number_format."""
+        result = await db.execute(select(Invoice.invoice_number).where(Invoice.user_id == user_id))
+        taken = [InvoiceNumberService.parse_seq(number_format, number) for number in result.scalars()]
+        return max((seq for seq in taken if seq is not None), default=0) + 1
+
+    @staticmethod
+    async def reserve_block(db: AsyncSession, user_id: int, size: int) -> Tuple[int, int, str]:
+        """
+        Reserve the next `size` numbers of a user's sequence.
+
+        Runs in its own session and commits at once, so the sequence
+        row is only locked for a single statement.
+
+        Returns:
+            (first number, end of block exclusive, number format)
+        """
+        async with AsyncSession(db.bind) as session:
+            while True:
+                result = await session.execute(
+                    update(InvoiceSequence)
+                    .where(InvoiceSequence.user_id == user_id)
+                    .values(next_value=InvoiceSequence.next_value + size)
+                    .returning(InvoiceSequence.next_value, InvoiceSequence.number_format)
+                )
+                row = result.one_or_none()
+                if row is not None:
+                    await session.commit()
+                    end, number_format = row
+                    return end - size, end, number_format
+
+                # First numbered invoice for this user: create the sequence
+                number_format = settings.INVOICE_NUMBER_FORMAT
+                first = await InvoiceNumberService.first_free(session, user_id, number_format)
+                try:
+                    await session.execute(
+                        insert(InvoiceSequence).values(
+                            user_id=user_id,
+                            next_value=first + size,
+                            number_format=number_format,
+                        )
+                    )
+                    await session.commit()
+                    return first, first + size, number_format
+                except IntegrityError:
+                    # Another process created it first; reserve from it
+                    await session.rollback()
+
+    @staticmethod
+    async def allocate(
+        db: AsyncSession,
+        user_id: int,
+        dates: Sequence[Optional[datetime]],
+    ) -> List[str]:
+        """
+        Get the next invoice numbers for a user.
+
+        Args:
+            db: Database session (its engine is used for reservations)
+            user_id: Invoice owner
+            dates: Invoice date for each number wanted, used for {year}
+                and {month}; None means now
+
+        Returns:
+            Formatted invoice numbers, in sequence order
+        """
+        blocks = _blocks.setdefault(user_id, deque())
+        numbers = []
+        while len(numbers) < len(dates):
+            if not blocks:
+                size = max(settings.INVOICE_NUMBER_BLOCK_SIZE, len(dates) - len(numbers))
+                blocks.append(list(await InvoiceNumberService.reserve_block(db, user_id, size)))
+                continue
+
+            block = blocks[0]
+            numbers.append(InvoiceNumberService.format_number(block[2], block[0], dates[len(numbers)]))
+            block[0] += 1
+            if block[0] >= block[1]:
+                blocks.popleft()
+
+        return numbers
+
+    @staticmethod
+    async def get_format(db: AsyncSession, user_id: int) -> str:
+        """The user's invoice number format."""
+        result = await db.execute(
+            select(InvoiceSequence.number_format).where(InvoiceSequence.user_id == user_id)
+        )
+        return result.scalar() or settings.INVOICE_NUMBER_FORMAT
+
+    @staticmethod
+    async def set_format(db: AsyncSession, user_id: int, number_format: str) -> None:
+        """
+        Change the user's invoice number format.
+
+        The sequence carries on from where it was, or from after the
+        user's highest invoice number in the new format. This process
+        drops its reserved numbers so the new format applies at once;
+        other processes switch when their current block runs out.
+
+        Raises:
+            InvoiceNumberFormatError: The format is unusable
+        """
+        InvoiceNumberService.validate_format(number_format)
+        first = await InvoiceNumberService.first_free(db, user_id, number_format)
+
+        result = await db.execute(
+            update(InvoiceSequence)
+            .where(InvoiceSequence.user_id == user_id)
+            .values(
+                number_format=number_format,
+                next_value=case(
+                    (InvoiceSequence.next_value < first, first),
+                    else_=InvoiceSequence.next_value,
+                ),
+            )
+        )
+        if result.rowcount == 0:
+            db.add(InvoiceSequence(user_id=user_id, next_value=first, number_format=number_format))
+        await db.commit()
+
+        _blocks.pop(user_id, None)
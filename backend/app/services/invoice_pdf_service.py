@@ -0,0 +1,346 @@
+"""
+Invoice PDF rendering service.
+
+Renders invoices to PDF in Celery workers, never in the API process.
+Output is stored under a hash of everything that appears on the page,
+so an invoice is only re-rendered when its content actually changed.
+
+The PDF is written directly (PDF 1.4 with the standard Helvetica fonts,
+which viewers provide, so nothing is embedded). The layout template and
+font metrics are compiled once per worker process.
+"""
+import hashlib
+import json
+import logging
+import textwrap
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+from string import Template
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.models.invoice import Invoice, InvoicePdfStatus, InvoiceStatus
+from app.models.user import User
+from app.services.file_storage import FileStorage, get_storage
+
+logger = logging.getLogger(__name__)
+
+
+class PdfRenderUnavailableError(RuntimeError):
+    """Raised when a render job can't be queued (e.g. the broker is down)."""
+
+
+# Helvetica advance widths (1/1000 em) for printable ASCII 32-126.
+# Helvetica-Bold is slightly wider, but digits (used for right-aligned
+# amounts) are 556 in both.
+HELVETICA_WIDTHS = (
+    "278 278 355 556 556 889 667 191 333 333 389 584 278 333 278 278 "
+    "556 556 556 556 556 556 556 556 556 556 278 278 584 584 584 556 "
+    "1015 667 667 722 722 667 611 778 722 278 500 667 556 833 722 778 "
+    "667 778 722 667 611 722 667 944 667 667 611 278 278 278 469 556 "
+    "333 556 556 500 556 556 278 556 556 222 222 500 222 833 556 556 "
+    "556 556 333 500 278 556 500 722 500 500 500 334 260 334 584"
+)
+
+FONTS = {"regular": ("F1", "Helvetica"), "bold": ("F2", "Helvetica-Bold")}
+
+# (font, size, align, x, y, text, wrap width in points, max lines)
+INVOICE_TEMPLATE = (
+    ("bold", 24, "left", 50, 770, "INVOICE", None, 1),
+    ("bold", 24, "right", 545, 770, "${paid_stamp}", None, 1),
+    ("regular", 10, "right", 545, 745, "Invoice ${invoice_number}", None, 1),
+    ("regular", 10, "right", 545, 731, "Issued ${invoice_date}", None, 1),
+    ("regular", 10, "right", 545, 717, "Due ${due_date}", None, 1),
+    ("bold", 11, "left", 50, 690, "From", None, 1),
+    ("regular", 10, "left", 50, 675, "${from_name}", None, 1),
+    ("regular", 10, "left", 50, 661, "${from_email}", None, 1),
+    ("bold", 11, "left", 300, 690, "Bill to", None, 1),
+    ("regular", 10, "left", 300, 675, "${client_name}", 245, 1),
+    ("regular", 10, "left", 300, 661, "${client_email}", 245, 1),
+    ("regular", 10, "left", 300, 647, "${client_address}", 245, 3),
+    ("bold", 11, "left", 50, 590, "Description", None, 1),
+    ("bold", 11, "right", 545, 590, "Amount", None, 1),
+    ("regular", 10, "left", 50, 570, "${description}", 380, 14),
+    ("regular", 10, "right", 545, 570, "${amount}", None, 1),
+    ("bold", 12, "left", 330, 350, "Total due", None, 1),
+    ("bold", 12, "right", 545, 350, "${amount}", None, 1),
+    ("bold", 11, "left", 50, 300, "${notes_heading}", None, 1),
+    ("regular", 10, "left", 50, 285, "${notes}", 495, 10),
+)
+
+
+class TemplateElement(NamedTuple):
+    font: str
+    size: int
+    align: str
+    x: float
+    y: float
+    text: Template
+    wrap_width: Optional[float]
+    max_lines: int
+
+
+@lru_cache(maxsize=None)
+def font_widths() -> Dict[str, int]:
+    """Helvetica character widths, parsed once per process."""
+    return {chr(32 + i): int(width) for i, width in enumerate(HELVETICA_WIDTHS.split())}
+
+
+@lru_cache(maxsize=None)
+def compiled_template() -> List[TemplateElement]:
+    """The invoice layout with its text templates compiled, once per process."""
+    return [
+        TemplateElement(font, size, align, x, y, Template(text), wrap_width, max_lines)
+        for font, size, align, x, y, text, wrap_width, max_lines in INVOICE_TEMPLATE
+    ]
+
+
+def text_width(text: str, size: float) -> float:
+    """Width of text in points at a font size."""
+    widths = font_widths()
+    return sum(widths.get(char, 556) for char in text) * size / 1000
+
+
+def wrap_text(text: str, size: float, width: float, max_lines: int) -> List[str]:
+    """Break text into lines no wider than width, truncating past max_lines."""
+    lines = []
+    for paragraph in text.splitlines() or [""]:
+        words = paragraph.split()
+        line = ""
+        for word in words:
+            candidate = f"{line} {word}".strip()
+            if line and text_width(candidate, size) > width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+
+    if len(lines) > max_lines:
+        lines = lines[:max_lines]
+        lines[-1] = lines[-1].rstrip() + " ..."
+    return lines
+
+
+def _pdf_string(text: str) -> bytes:
+    encoded = text.encode("cp1252", errors="replace")
+    return b"(" + encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def build_pdf(content: bytes) -> bytes:
+    """Wrap a page content stream into a one-page A4 PDF document."""
+    fonts = b" ".join(
+        b"/%s %d 0 R" % (name.encode(), 5 + index)
+        for index, (name, _) in enumerate(FONTS.values())
+    )
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+        b"/Resources << /Font << " + fonts + b" >> >> /Contents 4 0 R >>",
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+    ] + [
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % base.encode()
+        for _, base in FONTS.values()
+    ]
+
+    output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(output)
+
+
+class InvoicePdfService:
+    """Service for rendering and tracking invoice PDFs."""
+
+    NAMESPACE = "invoices"
+
+    # Bump when the layout changes so existing PDFs are re-rendered
+    TEMPLATE_VERSION = 1
+
+    @staticmethod
+    def render_context(invoice: Invoice, user: User) -> Dict[str, str]:
+        """Every value that appears on the invoice, as display strings."""
+        def day(value: Optional[datetime]) -> str:
+            return value.strftime("%B %d, %Y") if value else ""
+
+        return {
+            "invoice_number": invoice.invoice_number,
+            "invoice_date": day(invoice.invoice_date),
+            "due_date": day(invoice.due_date),
+            "paid_stamp": "PAID" if invoice.status == InvoiceStatus.PAID else "",
+            "from_name": user.full_name or "",
+            "from_email": user.email or "",
+            "client_name": invoice.client_name,
+            "client_email": invoice.client_email or "",
+            "client_address": invoice.client_address or "",
+            "description": invoice.description,
+            "amount": f"{invoice.currency or 'USD'} {Decimal(invoice.amount):,.2f}",
+            "notes_heading": "Notes" if invoice.notes else "",
+            "notes": invoice.notes or "",
+        }
+
+    @staticmethod
+    def content_hash(context: Dict[str, str]) -> str:
+        """Hash identifying a rendered PDF: page content plus template version."""
+        payload = json.dumps(
+            {"template": InvoicePdfService.TEMPLATE_VERSION, "content": context},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def storage_key(content_hash: str) -> str:
+        return FileStorage.content_key(InvoicePdfService.NAMESPACE, content_hash) + ".pdf"
+
+    @staticmethod
+    def render(context: Dict[str, str]) -> bytes:
+        """Render an invoice context to PDF bytes (CPU-bound, worker only)."""
+        commands = []
+        for element in compiled_template():
+            text = element.text.safe_substitute(context)
+            if not text.strip():
+                continue
+
+            lines = (
+                wrap_text(text, element.size, element.wrap_width, element.max_lines)
+                if element.wrap_width else [" ".join(text.split())]
+            )
+            font = FONTS[element.font][0]
+            for number, line in enumerate(lines):
+                x = element.x
+                if element.align == "right":
+                    x -= text_width(line, element.size)
+                y = element.y - number * element.size * 1.4
+                commands.append(
+                    b"BT /%s %d Tf %.2f %.2f Td %s Tj ET"
+                    % (font.encode(), element.size, x, y, _pdf_string(line))
+                )
+
+        # Rule under the column headings and above the total
+        commands.append(b"0.5 w 50 582 m 545 582 l S 330 368 m 545 368 l S")
+        return build_pdf(b"\n".join(commands))
+
+    @staticmethod
+    def is_current(invoice: Invoice, user: User) -> bool:
+        """Whether the stored PDF matches the invoice as it is now."""
+        return (
+            invoice.pdf_status == InvoicePdfStatus.READY
+            and invoice.pdf_url is not None
+            and invoice.pdf_content_hash
+            == InvoicePdfService.content_hash(InvoicePdfService.render_context(invoice, user))
+        )
+
+    @staticmethod
+    async def request_render(
+        db: AsyncSession,
+        invoice: Invoice,
+        user: User,
+        enqueue: Callable[[int], Any],
+    ) -> bool:
+        """
+        Mark an invoice's PDF as pending and queue a render job, unless
+        the PDF is already up to date.
+
+        PENDING is committed before the job is queued, so the worker
+        can't read the old status. If queueing fails, the previous status
+        is restored (unless a worker has moved it on meanwhile), so the
+        invoice isn't left PENDING with no job behind it.
+
+        Args:
+            db: Database session
+            invoice: Invoice to render
+            user: Invoice owner (shown as the sender)
+            enqueue: Queues the render job for an invoice id
+
+        Returns:
+            True if a render job was queued
+
+        Raises:
+            PdfRenderUnavailableError: The job couldn't be queued
+        """
+        if InvoicePdfService.is_current(invoice, user):
+            return False
+
+        previous_status = invoice.pdf_status
+        invoice.pdf_status = InvoicePdfStatus.PENDING
+        await db.commit()
+
+        try:
+            # Publishing blocks, for several seconds of retries if the broker is down
+            await run_in_threadpool(enqueue, invoice.id)
+        except Exception as e:
+            logger.warning("Could not queue PDF render of invoice %s: %s", invoice.id, e)
+            await db.execute(
+                update(Invoice)
+                .where(Invoice.id == invoice.id)
+                .where(Invoice.pdf_status == InvoicePdfStatus.PENDING)
+                .values(pdf_status=previous_status)
+            )
+            await db.commit()
+            raise PdfRenderUnavailableError("PDF rendering is unavailable, try again later") from e
+        return True
+
+    @staticmethod
+    async def render_invoice(
+        db: AsyncSession,
+        invoice_id: int,
+        storage: Optional[FileStorage] = None,
+    ) -> Optional[str]:
+        """
+        Render an invoice to storage and record it on the invoice.
+
+        Skips rendering when a PDF for identical content is already
+        stored. Marks the invoice FAILED if rendering raises.
+
+        Args:
+            db: Database session
+            invoice_id: Invoice to render
+            storage: Storage backend, defaults to the configured one
+
+        Returns:
+            The invoice's pdf_url, or None if the invoice was deleted
+            after the job was queued
+        """
+        storage = storage or get_storage()
+        result = await db.execute(
+            select(Invoice, User)
+            .join(User, User.id == Invoice.user_id)
+            .where(Invoice.id == invoice_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            logger.info("Invoice %s no longer exists, not rendering its PDF", invoice_id)
+            return None
+        invoice, user = row
+
+        try:
+            context = InvoicePdfService.render_context(invoice, user)
+            content_hash = InvoicePdfService.content_hash(context)
+            key = InvoicePdfService.storage_key(content_hash)
+
+            if not await storage.exists(key):
+                await storage.write_bytes(key, InvoicePdfService.render(context))
+        except Exception:
+            invoice.pdf_status = InvoicePdfStatus.FAILED
+            await db.commit()
+            raise
+
+        invoice.pdf_url = storage.url(key)
+        invoice.pdf_content_hash = content_hash
+        invoice.pdf_status = InvoicePdfStatus.READY
+        invoice.pdf_rendered_at = datetime.utcnow()
+        await db.commit()
+        return invoice.pdf_url
@@ -0,0 +1,209 @@
+"""
+Overdue invoice sweeper.
+
+Moves unpaid invoices past their due date to OVERDUE and queues each
+creator one reminder digest of their overdue invoices in the email
+outbox. Both steps work on batches of rows with set-based statements,
+never one invoice and one commit at a time.
+"""
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import groupby
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, update, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.user import User
+from app.services.email_outbox_service import EmailOutboxService
+from app.services.email_service import EmailMessage
+
+logger = logging.getLogger(__name__)
+
+
+class InvoiceReminderService:
+    """Service for overdue detection and payment reminders."""
+
+    OPEN_STATUSES = (InvoiceStatus.SENT, InvoiceStatus.VIEWED)
+
+    # Creators handled per reminder batch (each gets one email)
+    USERS_PER_BATCH = 200
+
+    @staticmethod
+    async def mark_overdue(
+        db: AsyncSession,
+        now: Optional[datetime] = None,
+        batch_size: Optional[int] = None,
+    ) -> int:
+        """
+        Mark sent invoices past their due date as OVERDUE.
+
+        Each batch is a single UPDATE ... WHERE id IN (SELECT ... LIMIT n
+        FOR UPDATE SKIP LOCKED) RETURNING id, committed on its own, so
+        locks stay short and concurrent sweepers split the work.
+
+        Args:
+            db: Database session
+            now: Reference time, defaults to now (UTC)
+            batch_size: Invoices per UPDATE, defaults to INVOICE_SWEEP_BATCH_SIZE
+
+        Returns:
+            Number of invoices marked overdue
+        """
+        now = now or datetime.utcnow()
+        batch_size = batch_size or settings.INVOICE_SWEEP_BATCH_SIZE
+
+        marked = 0
+        while True:
+            batch = (
+                select(Invoice.id)
+                .where(Invoice.status.in_(InvoiceReminderService.OPEN_STATUSES))
+                .where(Invoice.due_date < now)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            result = await db.execute(
+                update(Invoice)
+                .where(Invoice.id.in_(batch))
+                .values(status=InvoiceStatus.OVERDUE)
+                .returning(Invoice.id)
+                .execution_options(synchronize_session=False)
+            )
+            count = len(result.all())
+            await db.commit()
+
+            marked += count
+            if count < batch_size:
+                break
+
+        if marked:
+            logger.info("Marked %d invoices overdue", marked)
+        return marked
+
+    @staticmethod
+    def reminder_digest(user: User, invoices: List[Invoice], now: datetime) -> EmailMessage:
+        """One email listing all of a creator's overdue invoices."""
+        totals: Dict[str, Decimal] = {}
+        lines = []
+        for invoice in invoices:
+            currency = invoice.currency or "USD"
+            totals[currency] = totals.get(currency, Decimal(0)) + Decimal(invoice.amount)
+            days = (now - invoice.due_date.replace(tzinfo=None)).days
+            lines.append(
+                f"- {invoice.invoice_number}: {invoice.client_name}, "
+                f"{currency} {Decimal(invoice.amount):,.2f}, {days} day{'s' if days != 1 else ''} overdue"
+            )
+
+        outstanding = ", ".join(f"{currency} {total:,.2f}" for currency, total in sorted(totals.items()))
+        count = len(invoices)
+        return EmailMessage(
+            to=user.email,
+            subject=f"{count} overdue invoice{'s' if count != 1 else ''} ({outstanding})",
+            body=(
+                f"Hi {user.full_name or 'there'},\n\n"
+                f"These invoices are past their due date:\n\n"
+                + "\n".join(lines)
+                + "\n\nYou may want to follow up with these clients.\n\n- CreatorBank\n"
+            ),
+        )
+
+    @staticmethod
+    async def send_reminders(db: AsyncSession, now: Optional[datetime] = None) -> int:
+        """
+        Queue each creator a digest of overdue invoices that need a reminder.
+
+        An invoice needs one if it has had fewer than INVOICE_MAX_REMINDERS
+        and none in the last INVOICE_REMINDER_INTERVAL_DAYS. Creators are
+        processed in batches: one query for their invoices, one insert
+        into the email outbox and one UPDATE of the reminder counters,
+        committed together. Digests are keyed by creator, day and the
+        invoices they list, so a rerun the same day queues nothing twice
+        while a later digest with other invoices still goes out. Reminder
+        counters only move for invoices whose digest was queued.
+
+        Args:
+            db: Database session
+            now: Reference time, defaults to now (UTC)
+
+        Returns:
+            Number of invoices reminded about
+        """
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(days=settings.INVOICE_REMINDER_INTERVAL_DAYS)
+
+        due = (
+            select(Invoice.user_id)
+            .where(Invoice.status == InvoiceStatus.OVERDUE)
+            .where(func.coalesce(Invoice.reminder_sent_count, 0) < settings.INVOICE_MAX_REMINDERS)
+            .where(or_(Invoice.last_reminder_sent_at.is_(None), Invoice.last_reminder_sent_at < cutoff))
+        )
+
+        reminded = 0
+        last_user_id = 0
+        while True:
+            result = await db.execute(
+                due.where(Invoice.user_id > last_user_id)
+                .distinct()
+                .order_by(Invoice.user_id)
+                .limit(InvoiceReminderService.USERS_PER_BATCH)
+            )
+            user_ids = result.scalars().all()
+            if not user_ids:
+                break
+            last_user_id = user_ids[-1]
+
+            result = await db.execute(
+                select(Invoice, User)
+                .join(User, User.id == Invoice.user_id)
+                .where(Invoice.id.in_(due.with_only_columns(Invoice.id).where(Invoice.user_id.in_(user_ids))))
+                .where(User.is_active == True)
+                .order_by(Invoice.user_id, Invoice.due_date)
+            )
+            emails = []
+            digest_invoice_ids: Dict[str, List[int]] = {}
+            for user_id, rows in groupby(result.all(), key=lambda row: row.User.id):
+                rows = list(rows)
+                invoices = [row.Invoice for row in rows]
+                message = InvoiceReminderService.reminder_digest(rows[0].User, invoices, now)
+                ids = sorted(invoice.id for invoice in invoices)
+                listed = hashlib.sha1(",".join(map(str, ids)).encode()).hexdigest()[:16]
+                key = f"invoice-reminders:{user_id}:{now:%Y-%m-%d}:{listed}"
+                emails.append({
+                    "idempotency_key": key,
+                    "user_id": user_id,
+                    "to_email": message.to,
+                    "subject": message.subject,
+                    "body": message.body,
+                })
+                digest_invoice_ids[key] = ids
+
+            queued = await EmailOutboxService.enqueue_many(db, emails)
+            invoice_ids = [invoice_id for key in queued for invoice_id in digest_invoice_ids[key]]
+            if invoice_ids:
+                await db.execute(
+                    update(Invoice)
+                    .where(Invoice.id.in_(invoice_ids))
+                    .values(
+                        reminder_sent_count=func.coalesce(Invoice.reminder_sent_count, 0) + 1,
+                        last_reminder_sent_at=now,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            await db.commit()
+            reminded += len(invoice_ids)
+
+        return reminded
+
+    @staticmethod
+    async def sweep(db: AsyncSession, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Mark overdue invoices, then queue the reminders that are due."""
+        now = now or datetime.utcnow()
+        return {
+            "marked_overdue": await InvoiceReminderService.mark_overdue(db, now),
+            "reminded": await InvoiceReminderService.send_reminders(db, now),
+        }
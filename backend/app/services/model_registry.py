@@ -0,0 +1,255 @@
+"""
+On-disk model registry.
+
+Trained models are stored as uncompressed joblib files, one per
+published version:
+
+    {MODEL_REGISTRY_ROOT}/{model_type}/{key}/{version}.joblib
+    {MODEL_REGISTRY_ROOT}/{model_type}/{key}/CURRENT
+
+model_type and version are the values recorded on the rows a model
+produces (Prediction.model_type / model_version); key picks one model of
+that type, e.g. per segment or per creator, "default" for a single
+global model. CURRENT names the live version and is swapped atomically
+on publish.
+
+Nothing is loaded at startup. Each process memory-maps a model the first
+time it is asked for, keeps at most MODEL_REGISTRY_MAX_LOADED of them
+(least recently used are dropped), and picks up a newly published
+version on its next lookup with a single stat of CURRENT.
+"""
+import logging
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_KEY = "default"
+
+_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def _check_name(kind: str, value: str) -> str:
+    if not _NAME.match(value) or value in (".", ".."):
+        raise ValueError(f"Invalid model {kind}: {value!r}")
+    return value
+
+
+def _dump(artifact: Any, path: str) -> None:
+    import joblib
+
+    joblib.dump(artifact, path)
+
+
+def _load(path: str) -> Any:
+    import joblib
+
+    return joblib.load(path, mmap_mode="r")
+
+
+class ModelRegistry:
+    """Versioned model files with lazy, memory-mapped, LRU-bounded loading."""
+
+    POINTER = "CURRENT"
+    SUFFIX = ".joblib"
+
+    def __init__(self, root: str, max_loaded: int, keep_versions: int = 3):
+        self.root = root
+        self.max_loaded = max_loaded
+        self.keep_versions = keep_versions
+        self._lock = threading.Lock()
+        # (model_type, key, version) -> loaded model, least recently used first
+        self._loaded: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+        # (model_type, key) -> (CURRENT's inode, mtime, version)
+        self._current: Dict[Tuple[str, str], Tuple[int, int, str]] = {}
+
+    def _directory(self, model_type: str, key: str) -> str:
+        return os.path.join(self.root, _check_name("type", model_type), _check_name("key", key))
+
+    def path(self, model_type: str, version: str, key: str = DEFAULT_KEY) -> str:
+        """File of one model version."""
+        return os.path.join(self._directory(model_type, key), _check_name("version", version) + self.SUFFIX)
+
+    def versions(self, model_type: str, key: str = DEFAULT_KEY) -> List[str]:
+        """
+        Published versions, oldest first.
+
+        Ordered by when they were written, not by name: version names
+        are free-form ("v9" comes after "v10" as a string).
+        """
+        directory = self._directory(model_type, key)
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+
+        published = []
+        for name in names:
+            if not name.endswith(self.SUFFIX):
+                continue
+            try:
+                written = os.stat(os.path.join(directory, name)).st_mtime_ns
+            except FileNotFoundError:  # Pruned by another process meanwhile
+                continue
+            published.append((written, name[:-len(self.SUFFIX)]))
+        return [version for _, version in sorted(published)]
+
+    def current_version(self, model_type: str, key: str = DEFAULT_KEY) -> Optional[str]:
+        """
+        Live version, None if nothing was published.
+
+        CURRENT is only read again when its inode or mtime changed.
+        """
+        pointer = os.path.join(self._directory(model_type, key), self.POINTER)
+        try:
+            stat = os.stat(pointer)
+        except FileNotFoundError:
+            return None
+
+        cached = self._current.get((model_type, key))
+        if cached is not None and cached[:2] == (stat.st_ino, stat.st_mtime_ns):
+            return cached[2]
+        with open(pointer, encoding="utf-8") as stream:
+            version = stream.read().strip()
+        self._current[(model_type, key)] = (stat.st_ino, stat.st_mtime_ns, version)
+        return version
+
+    def activate(self, model_type: str, version: str, key: str = DEFAULT_KEY) -> None:
+        """Make a published version live (also used to roll back)."""
+        if not os.path.exists(self.path(model_type, version, key)):
+            raise FileNotFoundError(f"Model {model_type}/{key} has no version {version}")
+        directory = self._directory(model_type, key)
+        fd, temp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as stream:
+                stream.write(version)
+            os.replace(temp_path, os.path.join(directory, self.POINTER))
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def publish(
+        self,
+        model_type: str,
+        artifact: Any,
+        key: str = DEFAULT_KEY,
+        version: Optional[str] = None,
+        dump: Callable[[Any, str], None] = _dump,
+    ) -> str:
+        """
+        Store a model and make it the live version.
+
+        The file is written under a temporary name and renamed, so readers
+        never map a partial file. The oldest versions beyond keep_versions
+        are deleted, except the one CURRENT names (another process may
+        have activated it meanwhile); processes that still map them keep
+        working, as the data stays around until they unmap it.
+
+        Args:
+            model_type: Model type
+            artifact: Model to store
+            key: Model of this type, defaults to the global one
+            version: Version name, defaults to a UTC timestamp
+            dump: Writes artifact to a path; must write it uncompressed
+                for memory-mapping (default: joblib.dump)
+
+        Returns:
+            The published version
+        """
+        version = version or datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        path = self.path(model_type, version, key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            dump(artifact, temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        self.activate(model_type, version, key)
+
+        live = self.current_version(model_type, key)
+        for old in self.versions(model_type, key)[:-self.keep_versions]:
+            if old not in (version, live):
+                try:
+                    os.remove(self.path(model_type, old, key))
+                except FileNotFoundError:  # Pruned by a concurrent publish
+                    pass
+
+        logger.info("Published model %s/%s version %s", model_type, key, version)
+        return version
+
+    def get(
+        self,
+        model_type: str,
+        key: str = DEFAULT_KEY,
+        version: Optional[str] = None,
+        load: Callable[[str], Any] = _load,
+    ) -> Optional[Any]:
+        """
+        Model for this process, loaded on first use.
+
+        Args:
+            model_type: Model type
+            key: Model of this type, defaults to the global one
+            version: Specific version, defaults to the live one
+            load: Reads a model file (default: joblib, memory-mapped)
+
+        Returns:
+            The model, None if nothing was published
+        """
+        live = version is None
+        # The live version can be pruned between reading CURRENT and
+        # loading it, if other publishes made it old; CURRENT has moved
+        # on by then, so read it again and retry once
+        for attempt in range(2):
+            if live:
+                version = self.current_version(model_type, key)
+            if version is None:
+                return None
+
+            cache_key = (model_type, key, version)
+            with self._lock:
+                model = self._loaded.get(cache_key)
+                if model is not None:
+                    self._loaded.move_to_end(cache_key)
+                    return model
+
+                try:
+                    model = load(self.path(model_type, version, key))
+                except FileNotFoundError:
+                    if not live or attempt:
+                        raise
+                    self._current.pop((model_type, key), None)
+                    continue
+                if live:
+                    # Hot swap: earlier live versions of this model are done with
+                    for stale in [k for k in self._loaded if k[:2] == (model_type, key)]:
+                        del self._loaded[stale]
+                self._loaded[cache_key] = model
+                while len(self._loaded) > self.max_loaded:
+                    self._loaded.popitem(last=False)
+                return model
+
+    def loaded(self) -> List[Tuple[str, str, str]]:
+        """(model_type, key, version) of the models held by this process, least recently used first."""
+        with self._lock:
+            return list(self._loaded)
+
+
+@lru_cache
+def get_model_registry() -> ModelRegistry:
+    """Model registry for this process, at MODEL_REGISTRY_ROOT."""
+    return ModelRegistry(settings.MODEL_REGISTRY_ROOT, settings.MODEL_REGISTRY_MAX_LOADED)
@@ -0,0 +1,335 @@
+"""
+Receipt OCR service.
+
+Extracts amount, date and vendor from uploaded receipts. Extraction is
+CPU-heavy, so it only ever runs in a background worker, spread over a
+process pool, and never in the request path.
+"""
+import asyncio
+import logging
+import os
+import re
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional
+
+from dateutil import parser as date_parser
+from sqlalchemy import select, update, bindparam, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.expense import Expense
+from app.services.deduction_service import DeductionService
+from app.services.file_storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OcrResult:
+    """Fields read from a receipt."""
+    amount: Optional[str] = None  # Decimal as string, JSON friendly
+    date: Optional[str] = None  # ISO date
+    vendor: Optional[str] = None
+    confidence: float = 0.0  # 0-100
+
+
+TOTAL_PATTERN = re.compile(
+    r"(?:grand\s+total|total\s+due|amount\s+due|total|balance\s+due)\s*[:\-]?\s*"
+    r"[A-Z]{0,3}\s*[$€£]?\s*(\d{1,3}(?:[,\s]\d{3})*(?:[.,]\d{2})|\d+(?:[.,]\d{2}))",
+    re.IGNORECASE,
+)
+AMOUNT_PATTERN = re.compile(r"[$€£]\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})|\d+\.\d{2})")
+DATE_PATTERN = re.compile(
+    r"\b(\d{4}-\d{2}-\d{2}|\d{1,2}[/.]\d{1,2}[/.]\d{2,4}|"
+    r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{1,2},?\s+\d{4})\b",
+    re.IGNORECASE,
+)
+
+
+def _parse_money(value: str) -> Optional[Decimal]:
+    value = value.replace(" ", "")
+    if re.search(r",\d{2}$", value) and "." not in value:
+        value = value.replace(",", ".")
+    try:
+        return Decimal(value.replace(",", ""))
+    except InvalidOperation:
+        return None
+
+
+def parse_receipt_text(text: str) -> OcrResult:
+    """
+    Pull amount, date and vendor out of OCR'd receipt text.
+
+    The total is the amount on a "total" line, else the largest currency
+    amount. The vendor is the first line with letters in it. Confidence
+    is the share of the three fields that were found.
+    """
+    amount = None
+    totals = [_parse_money(match) for match in TOTAL_PATTERN.findall(text)]
+    totals = [value for value in totals if value is not None]
+    if totals:
+        amount = totals[-1]
+    else:
+        amounts = [_parse_money(match) for match in AMOUNT_PATTERN.findall(text)]
+        amounts = [value for value in amounts if value is not None]
+        amount = max(amounts) if amounts else None
+
+    receipt_date: Optional[date] = None
+    for match in DATE_PATTERN.findall(text):
+        try:
+            receipt_date = date_parser.parse(match, fuzzy=True).date()
+            break
+        except (ValueError, OverflowError):
+            continue
+
+    vendor = None
+    for line in text.splitlines():
+        line = line.strip()
+        if re.search(r"[A-Za-z]{2,}", line):
+            vendor = line[:255]
+            break
+
+    found = sum(value is not None for value in (amount, receipt_date, vendor))
+    return OcrResult(
+        amount=str(amount) if amount is not None else None,
+        date=receipt_date.isoformat() if receipt_date else None,
+        vendor=vendor,
+        confidence=round(100.0 * found / 3, 2),
+    )
+
+
+class OcrBackend(ABC):
+    """Interface for OCR engines."""
+
+    @abstractmethod
+    def extract(self, path: str) -> OcrResult:
+        """Read a receipt file and return the extracted fields."""
+
+
+class StubOcrBackend(OcrBackend):
+    """
+    Deterministic OCR stand-in for tests and local development.
+
+    Text files (and PDFs with an uncompressed text layer) are "read" as
+    their raw text; anything else yields an empty result.
+    """
+
+    def extract(self, path: str) -> OcrResult:
+        with open(path, "rb") as receipt:
+            raw = receipt.read(1024 * 1024)
+
+        text = raw.decode("utf-8", errors="ignore")
+        printable = sum(char.isprintable() or char.isspace() for char in text)
+        if not text or printable / len(text) < 0.9:
+            return OcrResult()
+        return parse_receipt_text(text)
+
+
+class TesseractOcrBackend(OcrBackend):
+    """OCR with Tesseract via pytesseract (optional dependency)."""
+
+    def __init__(self):
+        try:
+            import pytesseract
+        except ImportError as e:
+            raise RuntimeError("OCR_BACKEND=tesseract requires the pytesseract package") from e
+        self._pytesseract = pytesseract
+
+    def extract(self, path: str) -> OcrResult:
+        from PIL import Image
+
+        with Image.open(path) as image:
+            data = self._pytesseract.image_to_data(image, output_type=self._pytesseract.Output.DICT)
+
+        words = [word for word in data["text"] if word.strip()]
+        confidences = [float(c) for c, word in zip(data["conf"], data["text"]) if word.strip() and float(c) >= 0]
+        text = "\n".join(
+            " ".join(word for word, line_no in zip(data["text"], data["line_num"]) if line_no == line and word.strip())
+            for line in sorted(set(data["line_num"]))
+        )
+
+        result = parse_receipt_text(text)
+        if words and confidences:
+            # Scale field coverage by how sure tesseract was about the words
+            result.confidence = round(result.confidence * (sum(confidences) / len(confidences)) / 100, 2)
+        return result
+
+
+OCR_BACKENDS = {
+    "stub": StubOcrBackend,
+    "tesseract": TesseractOcrBackend,
+}
+
+# One backend per worker process, created on first use
+_process_backend: Optional[OcrBackend] = None
+
+
+def _extract_in_worker(backend_name: str, path: str) -> Dict:
+    """Process pool entry point; returns a plain dict so it pickles cheaply."""
+    global _process_backend
+    if _process_backend is None:
+        _process_backend = OCR_BACKENDS[backend_name]()
+
+    try:
+        return asdict(_process_backend.extract(path))
+    except Exception as e:  # A bad file must not take down the batch
+        logger.warning("OCR failed for %s: %s", path, e)
+        return asdict(OcrResult())
+
+
+class OcrService:
+    """Service for the background receipt OCR pipeline."""
+
+    # A claimed batch not written back within this time (worker died)
+    # is claimed again
+    LEASE_SECONDS = 900
+
+    @staticmethod
+    def pool_size() -> int:
+        """Worker processes to use, from OCR_WORKERS or the core count."""
+        return settings.OCR_WORKERS or os.cpu_count() or 1
+
+    @staticmethod
+    def create_executor() -> Executor:
+        return ProcessPoolExecutor(max_workers=OcrService.pool_size())
+
+    @staticmethod
+    async def claim_batch(db: AsyncSession, limit: int, now: datetime) -> List[Expense]:
+        """
+        Claim the next expenses waiting for OCR.
+
+        A single UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED)
+        stamps ocr_claimed_at and commits, so no row lock is held while OCR
+        runs and concurrent workers never take the same receipt. A claim
+        older than LEASE_SECONDS (worker died) is taken again.
+        """
+        pending = (
+            select(Expense.id)
+            .where(Expense.receipt_url.is_not(None))
+            .where(Expense.ocr_processed_at.is_(None))
+            .where(or_(
+                Expense.ocr_claimed_at.is_(None),
+                Expense.ocr_claimed_at <= now - timedelta(seconds=OcrService.LEASE_SECONDS),
+            ))
+            .order_by(Expense.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            update(Expense)
+            .where(Expense.id.in_(pending))
+            # Machine-written: keep updated_at for user edits (see retrain)
+            .values(ocr_claimed_at=now, updated_at=Expense.updated_at)
+            .returning(Expense)
+            .execution_options(synchronize_session=False)
+        )
+        expenses = result.scalars().all()
+        await db.commit()
+        return expenses
+
+    @staticmethod
+    async def process_pending(
+        db: AsyncSession,
+        executor: Optional[Executor] = None,
+        backend: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_batches: Optional[int] = None,
+    ) -> int:
+        """
+        Run OCR on queued receipts until the queue is empty.
+
+        Each batch is claimed in one short transaction, extracted in
+        parallel on the executor with no transaction open, then written
+        back with one executemany UPDATE in a second one. Receipts shared
+        by several expenses (same content hash) are read once. A result is
+        dropped if its claim was lost meanwhile (a new receipt was
+        uploaded, or the lease ran out and another worker took it).
+
+        Args:
+            db: Database session
+            executor: Executor to run OCR on, defaults to a process pool
+            backend: OCR backend name, defaults to OCR_BACKEND
+            batch_size: Receipts per batch, defaults to OCR_BATCH_SIZE
+            max_batches: Stop after this many batches
+
+        Returns:
+            Number of expenses processed
+        """
+        backend = backend or settings.OCR_BACKEND
+        if backend not in OCR_BACKENDS:
+            raise ValueError(f"Unknown OCR backend: {backend}")
+        batch_size = batch_size or settings.OCR_BATCH_SIZE
+        storage = get_storage()
+        loop = asyncio.get_running_loop()
+
+        owns_executor = executor is None
+        executor = executor or OcrService.create_executor()
+        processed = 0
+        batches = 0
+
+        statement = (
+            update(Expense.__table__)
+            .where(Expense.__table__.c.id == bindparam("expense_id"))
+            .where(Expense.__table__.c.ocr_claimed_at == bindparam("claimed_at"))
+            .values(
+                ocr_confidence=bindparam("confidence"),
+                ocr_extracted=bindparam("extracted"),
+                ocr_processed_at=bindparam("processed_at"),
+                vendor=func.coalesce(Expense.__table__.c.vendor, bindparam("ocr_vendor")),
+                # Machine-written: keep updated_at for user edits (see retrain)
+                updated_at=Expense.__table__.c.updated_at,
+            )
+        )
+
+        try:
+            while max_batches is None or batches < max_batches:
+                claimed_at = datetime.utcnow()
+                expenses = await OcrService.claim_batch(db, batch_size, claimed_at)
+                if not expenses:
+                    break
+
+                # Deduplicated uploads share a key; read each file once
+                keys = list(dict.fromkeys(
+                    key for key in (storage.key_from_url(e.receipt_url) for e in expenses) if key
+                ))
+                extracted = await asyncio.gather(*(
+                    loop.run_in_executor(executor, _extract_in_worker, backend, storage.local_path(key))
+                    for key in keys
+                ))
+                results = dict(zip(keys, extracted))
+
+                now = datetime.utcnow()
+                rows = []
+                # Users whose deductions report changes (a vendor gets filled in)
+                vendors_filled = set()
+                for expense in expenses:
+                    key = storage.key_from_url(expense.receipt_url)
+                    result = results.get(key, asdict(OcrResult()))
+                    if expense.vendor is None and result["vendor"] is not None:
+                        vendors_filled.add(expense.user_id)
+                    rows.append({
+                        "expense_id": expense.id,
+                        "claimed_at": claimed_at,
+                        "confidence": result["confidence"],
+                        "extracted": result,
+                        "processed_at": now,
+                        "ocr_vendor": result["vendor"],
+                    })
+
+                await db.execute(statement, rows)
+                await db.commit()
+                await DeductionService.expenses_changed(vendors_filled)
+
+                processed += len(rows)
+                batches += 1
+                logger.info("OCR processed %d receipts (%d total)", len(rows), processed)
+        finally:
+            if owns_executor:
+                executor.shutdown()
+
+        return processed
@@ -0,0 +1,173 @@
+"""
+Ledger partition maintenance service.
+
+Creates upcoming monthly partitions for the earnings and transactions
+tables and detaches expired ones into the archive schema.
+"""
+import re
+from datetime import date, datetime
+from typing import Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+
+class PartitionService:
+    """Service for managing monthly range partitions on ledger tables."""
+
+    # Partitioned table -> partition key column
+    PARTITIONED_TABLES = {
+        "earnings": "earning_date",
+        "transactions": "transaction_date",
+    }
+
+    ARCHIVE_SCHEMA = "archive"
+
+    PARTITION_NAME_PATTERN = re.compile(r"^(?P<table>\w+)_y(?P<year>\d{4})m(?P<month>\d{2})$")
+
+    @staticmethod
+    def month_start(value: date) -> date:
+        """Return the first day of the month containing value."""
+        return date(value.year, value.month, 1)
+
+    @staticmethod
+    def add_months(month: date, months: int) -> date:
+        """Shift a first-of-month date by a number of months."""
+        index = month.year * 12 + month.month - 1 + months
+        return date(index // 12, index % 12 + 1, 1)
+
+    @staticmethod
+    def partition_name(table: str, month: date) -> str:
+        """Name of the partition of table holding the given month."""
+        return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+    @staticmethod
+    def parse_partition_month(name: str) -> Optional[date]:
+        """Return the month a partition covers, or None for foreign names."""
+        match = PartitionService.PARTITION_NAME_PATTERN.match(name)
+        if not match:
+            return None
+        return date(int(match.group("year")), int(match.group("month")), 1)
+
+    @staticmethod
+    def partition_ddl(table: str, month: date) -> str:
+        """CREATE TABLE statement for the partition of table holding month."""
+        next_month = PartitionService.add_months(month, 1)
+        return (
+            f"CREATE TABLE IF NOT EXISTS {PartitionService.partition_name(table, month)} "
+            f"PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+            f"TO ('{next_month.isoformat()} 00:00:00+00')"
+        )
+
+    @staticmethod
+    async def is_partitioned(db: AsyncSession, table: str) -> bool:
+        """Whether table is partitioned (schemas from create_all are not)."""
+        result = await db.execute(
+            text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": table},
+        )
+        return bool(result.scalar())
+
+    @staticmethod
+    async def create_partitions(
+        db: AsyncSession,
+        first: date,
+        last: date,
+        tables: Optional[Iterable[str]] = None,
+    ) -> List[str]:
+        """
+        Create the partitions of the partitioned tables (all by default)
+        for the months from first through last. Does not commit.
+
+        Returns:
+            Names of the partitions that are guaranteed to exist
+        """
+        ensured = []
+        for table in tables or PartitionService.PARTITIONED_TABLES:
+            month = PartitionService.month_start(first)
+            while month <= last:
+                await db.execute(text(PartitionService.partition_ddl(table, month)))
+                ensured.append(PartitionService.partition_name(table, month))
+                month = PartitionService.add_months(month, 1)
+        return ensured
+
+    @staticmethod
+    async def ensure_future_partitions(
+        db: AsyncSession,
+        months_ahead: Optional[int] = None,
+        today: Optional[date] = None,
+    ) -> List[str]:
+        """
+        Create partitions for the current month and the next few months.
+
+        Args:
+            db: Database session
+            months_ahead: Months to create beyond the current one
+            today: Reference date, defaults to today (UTC)
+
+        Returns:
+            Names of the partitions that are guaranteed to exist
+        """
+        if months_ahead is None:
+            months_ahead = settings.PARTITION_PRECREATE_MONTHS
+        current = PartitionService.month_start(today or datetime.utcnow().date())
+
+        ensured = await PartitionService.create_partitions(
+            db, current, PartitionService.add_months(current, months_ahead),
+        )
+        await db.commit()
+        return ensured
+
+    @staticmethod
+    async def detach_expired_partitions(
+        db: AsyncSession,
+        retain_months: Optional[int] = None,
+        today: Optional[date] = None,
+    ) -> List[str]:
+        """
+        Detach partitions older than the retention window.
+
+        Detached partitions are moved to the archive schema rather than
+        dropped, so they can still be exported or reattached.
+
+        Args:
+            db: Database session
+            retain_months: Months of history to keep attached
+            today: Reference date, defaults to today (UTC)
+
+        Returns:
+            Names of the partitions that were archived
+        """
+        if retain_months is None:
+            retain_months = settings.PARTITION_RETENTION_MONTHS
+        current = PartitionService.month_start(today or datetime.utcnow().date())
+        cutoff = PartitionService.add_months(current, -retain_months)
+
+        archived = []
+        for table in PartitionService.PARTITIONED_TABLES:
+            result = await db.execute(
+                text(
+                    "SELECT child.relname FROM pg_inherits "
+                    "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                    "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                    "WHERE parent.relname = :table"
+                ),
+                {"table": table},
+            )
+
+            for name in sorted(row[0] for row in result):
+                month = PartitionService.parse_partition_month(name)
+                if month is None or month >= cutoff:
+                    continue
+
+                await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                await db.execute(text(
+                    f"ALTER TABLE {name} SET SCHEMA {PartitionService.ARCHIVE_SCHEMA}"
+                ))
+                archived.append(name)
+
+        await db.commit()
+        return archived
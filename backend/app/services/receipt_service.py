@@ -0,0 +1,239 @@
+"""
+Receipt storage service.
+
+Streams receipt uploads into content-addressed storage and generates
+thumbnails lazily.
+"""
+import io
+import logging
+import mimetypes
+import os
+from typing import AsyncIterator, List, Optional
+
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.models.expense import Expense
+from app.services.file_storage import FileStorage, FileTooLargeError, StoredFile, get_storage
+
+logger = logging.getLogger(__name__)
+
+
+class ReceiptUploadError(ValueError):
+    """Raised when a receipt upload isn't a multipart form with a file."""
+
+
+class MultipartFileReader:
+    """
+    Pulls one file field out of a streamed multipart/form-data body.
+
+    Request chunks are fed to python-multipart's push parser as they
+    arrive and the file's bytes are passed straight on, so an upload is
+    never spooled to a temporary file first. Other fields are skipped.
+    """
+
+    def __init__(self, content_type: Optional[str], field_name: str):
+        media_type, params = parse_options_header(content_type or "")
+        if media_type != b"multipart/form-data" or b"boundary" not in params:
+            raise ReceiptUploadError("Expected a multipart/form-data upload")
+
+        self.field_name = field_name
+        self.filename: Optional[str] = None
+        self.found = False
+        self._header_field = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._in_file = False
+        self._pending: List[bytes] = []
+        self._parser = MultipartParser(params[b"boundary"], callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self) -> None:
+        self._disposition = b""
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if self._header_field.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_field = self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        # Only the first file in the field is read
+        self._in_file = not self.found and name == self.field_name and b"filename" in options
+        if self._in_file:
+            self.found = True
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self._pending.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        self._in_file = False
+
+    async def chunks(self, stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """
+        File bytes from a request body stream.
+
+        Raises:
+            ReceiptUploadError: The body is malformed or has no such file field
+        """
+        async for body in stream:
+            try:
+                self._parser.write(body)
+            except MultipartParseError as e:
+                raise ReceiptUploadError(f"Malformed multipart body: {e}")
+            for data in self._pending:
+                yield data
+            self._pending.clear()
+
+        if not self.found:
+            raise ReceiptUploadError(f"No file uploaded in field '{self.field_name}'")
+
+
+class ReceiptService:
+    """Service for storing and serving expense receipts."""
+
+    NAMESPACE = "receipts"
+    THUMBNAIL_NAMESPACE = "thumbnails"
+
+    # Formats Pillow can thumbnail; PDFs are served without a thumbnail
+    IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff"}
+
+    # Allowance for multipart boundaries and part headers in Content-Length
+    MULTIPART_OVERHEAD = 64 * 1024
+
+    @staticmethod
+    async def attach_upload(
+        request: Request,
+        expense: Expense,
+        db: AsyncSession,
+        storage: Optional[FileStorage] = None,
+        field_name: str = "file",
+    ) -> StoredFile:
+        """
+        Store a receipt uploaded as multipart form data and attach it to
+        an expense.
+
+        The request body is streamed straight into storage and hashed on
+        the way; a receipt identical to one already stored (by anyone)
+        reuses the existing file. A Content-Length over the limit is
+        rejected before anything is read.
+
+        Args:
+            request: Request with a multipart/form-data body
+            expense: Expense the receipt belongs to
+            db: Database session
+            storage: Storage backend, defaults to the configured one
+            field_name: Form field holding the file
+
+        Returns:
+            The stored file
+
+        Raises:
+            FileTooLargeError: Upload exceeds RECEIPT_MAX_UPLOAD_MB
+            ReceiptUploadError: The body isn't a multipart form with the file
+        """
+        max_size = settings.RECEIPT_MAX_UPLOAD_MB * 1024 * 1024
+        content_length = request.headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > max_size + ReceiptService.MULTIPART_OVERHEAD:
+            raise FileTooLargeError(f"File exceeds {max_size} bytes")
+
+        reader = MultipartFileReader(request.headers.get("content-type"), field_name)
+        storage = storage or get_storage()
+        stored = await storage.save_stream(
+            ReceiptService.NAMESPACE,
+            reader.chunks(request.stream()),
+            max_size=max_size,
+        )
+
+        expense.receipt_url = storage.url(stored.key)
+        expense.receipt_filename = os.path.basename(reader.filename or stored.sha256)[:255]
+        # Queue the new receipt for the OCR pipeline
+        expense.ocr_processed_at = None
+        expense.ocr_claimed_at = None
+        expense.ocr_confidence = None
+        await db.commit()
+
+        return stored
+
+    @staticmethod
+    def media_type(filename: Optional[str]) -> str:
+        """Content type to serve a receipt with."""
+        media_type, _ = mimetypes.guess_type(filename or "")
+        return media_type or "application/octet-stream"
+
+    @staticmethod
+    def is_image(filename: Optional[str]) -> bool:
+        return os.path.splitext(filename or "")[1].lower() in ReceiptService.IMAGE_EXTENSIONS
+
+    @staticmethod
+    def _render_thumbnail(source_path: str, size: int) -> Optional[bytes]:
+        """JPEG thumbnail bytes, or None if the file isn't a readable image."""
+        from PIL import Image, ImageOps
+
+        try:
+            with Image.open(source_path) as image:
+                image = ImageOps.exif_transpose(image)
+                image.thumbnail((size, size))
+                output = io.BytesIO()
+                image.convert("RGB").save(output, format="JPEG", quality=80)
+                return output.getvalue()
+        except FileNotFoundError:
+            raise
+        except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+            # Corrupt, truncated or mislabelled (UnidentifiedImageError is an OSError)
+            logger.warning("Cannot thumbnail receipt %s: %s", source_path, e)
+            return None
+
+    @staticmethod
+    async def thumbnail_path(
+        key: str,
+        filename: Optional[str],
+        size: Optional[int] = None,
+        storage: Optional[FileStorage] = None,
+    ) -> Optional[str]:
+        """
+        Path of a JPEG thumbnail for a stored receipt image.
+
+        Thumbnails are rendered on first request and cached under the
+        content hash, so duplicate receipts share them too.
+
+        Returns:
+            Thumbnail path, or None if the receipt isn't a readable image
+        """
+        if not ReceiptService.is_image(filename):
+            return None
+
+        storage = storage or get_storage()
+        size = size or settings.RECEIPT_THUMBNAIL_SIZE
+        sha256 = key.rsplit("/", 1)[-1]
+        thumbnail_key = FileStorage.content_key(ReceiptService.THUMBNAIL_NAMESPACE, f"{sha256}-{size}.jpg")
+
+        if not await storage.exists(thumbnail_key):
+            data = await run_in_threadpool(
+                ReceiptService._render_thumbnail, storage.local_path(key), size,
+            )
+            if data is None:
+                return None
+            await storage.write_bytes(thumbnail_key, data)
+
+        return storage.local_path(thumbnail_key)
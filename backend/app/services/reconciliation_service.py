@@ -0,0 +1,374 @@
+"""
+Transaction reconciliation service.
+
+Links bank transactions to the earnings and expenses they settle:
+deposits to platform payouts, card payments to recorded expenses.
+"""
+import bisect
+import difflib
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import DateTime, Integer, Numeric, and_, bindparam, column, exists, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.expense import Expense
+from app.models.platform import Earning
+from app.models.transaction import Transaction, TransactionType
+from app.services.statement_import_service import StatementImportService
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _day_number(value: datetime) -> float:
+    """Days since the epoch, in UTC, as a float."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH).total_seconds() / 86400
+
+
+def _cents(amount: Decimal) -> int:
+    return int((abs(Decimal(amount)) * 100).to_integral_value())
+
+
+class CandidateIndex:
+    """
+    Hash buckets of match candidates keyed by (currency, amount in cents).
+
+    Each bucket is kept sorted by date, so finding the candidates for a
+    transaction is a dict lookup plus a bisect over the date window
+    instead of a scan of every earning or expense.
+    """
+
+    def __init__(self, amount_tolerance_cents: int = 0):
+        self.amount_tolerance_cents = amount_tolerance_cents
+        self._buckets: Dict[Tuple[str, int], List[Tuple[float, int, Any]]] = defaultdict(list)
+        self._unsorted = set()
+        self._used = set()
+
+    def add(self, currency: str, amount: Decimal, when: datetime, candidate: Any) -> None:
+        key = (currency, _cents(amount))
+        bucket = self._buckets[key]
+        bucket.append((_day_number(when), len(bucket), candidate))
+        self._unsorted.add(key)
+
+    def _bucket(self, key: Tuple[str, int]) -> Optional[List[Tuple[float, int, Any]]]:
+        bucket = self._buckets.get(key)
+        if bucket is not None and key in self._unsorted:
+            bucket.sort(key=lambda entry: entry[:2])
+            self._unsorted.discard(key)
+        return bucket
+
+    def candidates(
+        self,
+        currency: str,
+        amount: Decimal,
+        when: datetime,
+        before: int,
+        after: int,
+    ) -> Iterator[Tuple[float, int, Any]]:
+        """
+        Yield unused candidates within the amount and date window.
+
+        Yields:
+            (day offset from when, cents difference, candidate) tuples
+        """
+        cents = _cents(amount)
+        day = _day_number(when)
+        for key_cents in range(cents - self.amount_tolerance_cents, cents + self.amount_tolerance_cents + 1):
+            bucket = self._bucket((currency, key_cents))
+            if not bucket:
+                continue
+            start = bisect.bisect_left(bucket, (day - before,))
+            end = bisect.bisect_right(bucket, (day + after, len(bucket)))
+            for candidate_day, _, candidate in bucket[start:end]:
+                if id(candidate) not in self._used:
+                    yield candidate_day - day, abs(key_cents - cents), candidate
+
+    def consume(self, candidate: Any) -> None:
+        self._used.add(id(candidate))
+
+
+class ReconciliationService:
+    """Service for matching bank transactions to earnings and expenses."""
+
+    DEPOSIT_TYPES = (TransactionType.DEPOSIT, TransactionType.ACH_IN, TransactionType.TRANSFER)
+    PAYMENT_TYPES = (TransactionType.CARD_PAYMENT, TransactionType.WITHDRAWAL, TransactionType.ACH_OUT)
+
+    # Deposits land up to a few days after the payout date (rarely a day early)
+    PAYOUT_SETTLEMENT_DAYS = 5
+    PAYOUT_EARLY_DAYS = 1
+
+    # Card payments post a few days either side of the receipt date
+    EXPENSE_DAYS_TOLERANCE = 3
+
+    AMOUNT_TOLERANCE_CENTS = 1
+
+    MIN_CONFIDENCE = 0.5
+
+    @staticmethod
+    def vendor_similarity(merchant: Optional[str], vendor: Optional[str]) -> float:
+        """Similarity of two merchant/vendor names in [0, 1]."""
+        left = StatementImportService.normalize_merchant(merchant)
+        right = StatementImportService.normalize_merchant(vendor)
+        if not left or not right:
+            return 0.0
+
+        left, right = left.lower(), right.lower()
+        left_tokens, right_tokens = set(left.split()), set(right.split())
+        jaccard = len(left_tokens & right_tokens) / len(left_tokens | right_tokens)
+        return max(jaccard, difflib.SequenceMatcher(None, left, right).ratio())
+
+    @staticmethod
+    def _score(day_offset: float, cents_off: int, window: int, vendor_score: Optional[float] = None) -> float:
+        amount_score = 1.0 if cents_off == 0 else 0.9
+        date_score = max(0.0, 1.0 - abs(day_offset) / (window + 1))
+        if vendor_score is None:
+            return 0.6 * amount_score + 0.4 * date_score
+        return 0.5 * amount_score + 0.25 * date_score + 0.25 * vendor_score
+
+    @staticmethod
+    def match_deposits(
+        deposits: Sequence[Transaction],
+        earnings: Sequence[Earning],
+    ) -> List[Tuple[Transaction, Earning, float]]:
+        """
+        Pair deposits with the earnings whose payout they are.
+
+        Both inputs are only iterated once; matching is greedy in date
+        order and every earning is used at most once.
+
+        Returns:
+            (transaction, earning, confidence) triples
+        """
+        index = CandidateIndex(ReconciliationService.AMOUNT_TOLERANCE_CENTS)
+        for earning in earnings:
+            index.add(earning.currency or "USD", earning.amount, earning.payout_date, earning)
+
+        matches = []
+        for transaction in sorted(deposits, key=lambda t: _day_number(t.transaction_date)):
+            best = None
+            for offset, cents_off, earning in index.candidates(
+                transaction.currency or "USD",
+                transaction.amount,
+                transaction.transaction_date,
+                before=ReconciliationService.PAYOUT_SETTLEMENT_DAYS,
+                after=ReconciliationService.PAYOUT_EARLY_DAYS,
+            ):
+                score = ReconciliationService._score(
+                    offset, cents_off, ReconciliationService.PAYOUT_SETTLEMENT_DAYS,
+                )
+                if best is None or score > best[0]:
+                    best = (score, earning)
+
+            if best is not None and best[0] >= ReconciliationService.MIN_CONFIDENCE:
+                index.consume(best[1])
+                matches.append((transaction, best[1], best[0]))
+
+        return matches
+
+    @staticmethod
+    def match_payments(
+        payments: Sequence[Transaction],
+        expenses: Sequence[Expense],
+    ) -> List[Tuple[Transaction, Expense, float]]:
+        """
+        Pair card payments with the expenses they paid for.
+
+        Returns:
+            (transaction, expense, confidence) triples
+        """
+        tolerance = ReconciliationService.EXPENSE_DAYS_TOLERANCE
+        index = CandidateIndex(ReconciliationService.AMOUNT_TOLERANCE_CENTS)
+        for expense in expenses:
+            index.add(expense.currency or "USD", expense.amount, expense.expense_date, expense)
+
+        matches = []
+        for transaction in sorted(payments, key=lambda t: _day_number(t.transaction_date)):
+            best = None
+            for offset, cents_off, expense in index.candidates(
+                transaction.currency or "USD",
+                transaction.amount,
+                transaction.transaction_date,
+                before=tolerance,
+                after=tolerance,
+            ):
+                vendor_score = ReconciliationService.vendor_similarity(
+                    transaction.merchant or transaction.description,
+                    expense.vendor,
+                )
+                score = ReconciliationService._score(offset, cents_off, tolerance, vendor_score)
+                if best is None or score > best[0]:
+                    best = (score, expense)
+
+            if best is not None and best[0] >= ReconciliationService.MIN_CONFIDENCE:
+                index.consume(best[1])
+                matches.append((transaction, best[1], best[0]))
+
+        return matches
+
+    @staticmethod
+    async def _link(
+        db: AsyncSession,
+        link_column: str,
+        matches: Sequence[Tuple[Transaction, Any, float]],
+        start_date: datetime,
+        end_date: datetime,
+    ) -> None:
+        """
+        Point matched transactions at their earning or expense.
+
+        Rows are addressed by the full primary key (id, transaction_date)
+        within the reconciliation window, so Postgres only touches the
+        partitions of that window.
+        """
+        if not matches:
+            return
+
+        table = Transaction.__table__
+        rows = [
+            (t.id, t.transaction_date, target.id, round(c * 100, 2))
+            for t, target, c in matches
+        ]
+        in_window = and_(table.c.transaction_date >= start_date, table.c.transaction_date < end_date)
+
+        if db.get_bind().dialect.name == "postgresql":
+            # One UPDATE ... FROM (VALUES ...) for the whole batch
+            matched = values(
+                column("id", Integer),
+                column("transaction_date", DateTime(timezone=True)),
+                column("target_id", Integer),
+                column("confidence", Numeric(5, 2)),
+                name="matched",
+            ).data(rows)
+            await db.execute(
+                update(table)
+                .where(in_window)
+                .where(table.c.id == matched.c.id)
+                .where(table.c.transaction_date == matched.c.transaction_date)
+                .values({link_column: matched.c.target_id, "match_confidence": matched.c.confidence})
+            )
+            return
+
+        await db.execute(
+            update(table)
+            .where(in_window)
+            .where(table.c.id == bindparam("match_id"))
+            .where(table.c.transaction_date == bindparam("match_date"))
+            .values({link_column: bindparam("target_id"), "match_confidence": bindparam("confidence")}),
+            [
+                {"match_id": transaction_id, "match_date": when, "target_id": target_id, "confidence": confidence}
+                for transaction_id, when, target_id, confidence in rows
+            ],
+        )
+
+    @staticmethod
+    async def reconcile_user(
+        db: AsyncSession,
+        user_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """
+        Reconcile a user's unmatched transactions in a date range.
+
+        Only transactions without a link, and earnings/expenses no
+        transaction points at yet, are loaded, so repeated runs only
+        do work for new rows.
+
+        Args:
+            db: Database session
+            user_id: User to reconcile
+            start_date: Range start, defaults to one year ago
+            end_date: Range end, defaults to now
+
+        Returns:
+            Report with counts and the individual matches
+        """
+        end_date = end_date or datetime.utcnow()
+        start_date = start_date or end_date - timedelta(days=365)
+        slack = timedelta(days=max(
+            ReconciliationService.PAYOUT_SETTLEMENT_DAYS,
+            ReconciliationService.EXPENSE_DAYS_TOLERANCE,
+        ))
+        # Candidates lie within slack of the range, and a transaction
+        # linked to one within slack of the candidate
+        linked_from, linked_to = start_date - 2 * slack, end_date + 2 * slack
+
+        result = await db.execute(
+            select(Transaction)
+            .where(Transaction.user_id == user_id)
+            .where(Transaction.transaction_date >= start_date)
+            .where(Transaction.transaction_date < end_date)
+            .where(Transaction.related_earning_id.is_(None))
+            .where(Transaction.related_expense_id.is_(None))
+            .where(Transaction.transaction_type.in_(
+                ReconciliationService.DEPOSIT_TYPES + ReconciliationService.PAYMENT_TYPES
+            ))
+        )
+        transactions = result.scalars().all()
+        deposits = [
+            t for t in transactions
+            if t.transaction_type in ReconciliationService.DEPOSIT_TYPES and t.amount > 0
+        ]
+        payments = [t for t in transactions if t.transaction_type in ReconciliationService.PAYMENT_TYPES]
+
+        earnings = []
+        if deposits:
+            payout_lookback = timedelta(days=settings.MAX_PAYOUT_DELAY_DAYS)
+            result = await db.execute(
+                select(Earning)
+                .where(Earning.user_id == user_id)
+                .where(Earning.earning_date >= start_date - slack - payout_lookback)
+                .where(Earning.earning_date < end_date + slack)
+                .where(Earning.payout_date >= start_date - slack)
+                .where(Earning.payout_date < end_date + slack)
+                .where(~exists().where(and_(
+                    Transaction.user_id == user_id,
+                    Transaction.transaction_date >= linked_from,
+                    Transaction.transaction_date < linked_to,
+                    Transaction.related_earning_id == Earning.id,
+                )))
+            )
+            earnings = result.scalars().all()
+
+        expenses = []
+        if payments:
+            result = await db.execute(
+                select(Expense)
+                .where(Expense.user_id == user_id)
+                .where(Expense.expense_date >= start_date - slack)
+                .where(Expense.expense_date < end_date + slack)
+                .where(~exists().where(and_(
+                    Transaction.user_id == user_id,
+                    Transaction.transaction_date >= linked_from,
+                    Transaction.transaction_date < linked_to,
+                    Transaction.related_expense_id == Expense.id,
+                )))
+            )
+            expenses = result.scalars().all()
+
+        earning_matches = ReconciliationService.match_deposits(deposits, earnings)
+        expense_matches = ReconciliationService.match_payments(payments, expenses)
+
+        await ReconciliationService._link(db, "related_earning_id", earning_matches, start_date, end_date)
+        await ReconciliationService._link(db, "related_expense_id", expense_matches, start_date, end_date)
+        await db.commit()
+
+        return {
+            "transactions_checked": len(transactions),
+            "matched_earnings": len(earning_matches),
+            "matched_expenses": len(expense_matches),
+            "unmatched": len(transactions) - len(earning_matches) - len(expense_matches),
+            "matches": [
+                {"transaction_id": t.id, "earning_id": e.id, "expense_id": None, "confidence": round(c * 100, 2)}
+                for t, e, c in earning_matches
+            ] + [
+                {"transaction_id": t.id, "earning_id": None, "expense_id": e.id, "confidence": round(c * 100, 2)}
+                for t, e, c in expense_matches
+            ],
+        }
@@ -0,0 +1,268 @@
+"""
+Vendor search service.
+
+Fuzzy vendor/merchant typeahead and duplicate expense detection. On
+PostgreSQL the typeahead runs on pg_trgm GIN indexes; other databases
+(SQLite in tests) use an in-process trigram inverted index with the
+same similarity measure.
+"""
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select, union_all, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.expense import Expense
+from app.models.transaction import Transaction
+from app.services.reconciliation_service import CandidateIndex
+
+
+def trigrams(text: Optional[str]) -> Set[str]:
+    """
+    Trigrams of a string, computed the way pg_trgm does.
+
+    Each lowercased alphanumeric word is padded with two leading and one
+    trailing space, so "Adobe" gives "  a", " ad", "ado", "dob", "obe", "be ".
+    """
+    grams = set()
+    for word in re.findall(r"[^\W_]+", (text or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(left: Optional[str], right: Optional[str]) -> float:
+    """Trigram similarity in [0, 1], equivalent to pg_trgm similarity()."""
+    left_grams, right_grams = trigrams(left), trigrams(right)
+    if not left_grams or not right_grams:
+        return 0.0
+    shared = len(left_grams & right_grams)
+    return shared / (len(left_grams) + len(right_grams) - shared)
+
+
+def word_similarity(query: Optional[str], text: Optional[str]) -> float:
+    """
+    Share of the query's trigrams found in text, in [0, 1].
+
+    An upper bound of pg_trgm word_similarity(): it scores how well the
+    query matches some part of text, so "adbe" still finds "Adobe Inc.".
+    """
+    query_grams = trigrams(query)
+    if not query_grams:
+        return 0.0
+    return len(query_grams & trigrams(text)) / len(query_grams)
+
+
+class TrigramIndex:
+    """
+    Inverted index from trigram to names.
+
+    Looking a query up only touches names that share at least one
+    trigram with it, instead of comparing against every name.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._names: List[str] = []
+        self._sizes: List[int] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for name in names:
+            self.add(name)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, name: str) -> None:
+        grams = trigrams(name)
+        position = len(self._names)
+        self._names.append(name)
+        self._sizes.append(len(grams))
+        for gram in grams:
+            self._postings[gram].append(position)
+
+    def search(self, query: str, limit: int = 10, threshold: float = 0.6) -> List[Tuple[str, float]]:
+        """
+        Names containing something like query, best first.
+
+        Names are scored with word_similarity() and ties broken by
+        whole-string similarity().
+
+        Returns:
+            (name, word similarity) pairs
+        """
+        query_grams = trigrams(query)
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for position in self._postings.get(gram, ()):
+                shared[position] += 1
+
+        matches = []
+        for position, count in shared.items():
+            score = count / len(query_grams)
+            if score >= threshold:
+                overall = count / (len(query_grams) + self._sizes[position] - count)
+                matches.append((score, overall, self._names[position]))
+
+        matches.sort(key=lambda match: (-match[0], -match[1], match[2]))
+        return [(name, score) for score, _, name in matches[:limit]]
+
+
+class SearchService:
+    """Service for fuzzy vendor search and duplicate detection."""
+
+    # pg_trgm's default word_similarity_threshold, used by the %> operator
+    SIMILARITY_THRESHOLD = 0.6
+
+    # Expenses for the same amount this close together may be duplicates
+    DUPLICATE_DAYS = 3
+    DUPLICATE_MIN_SIMILARITY = 0.5
+
+    # Free-text name columns searched by the typeahead
+    NAME_COLUMNS = (
+        (Expense.vendor, Expense.user_id),
+        (Transaction.merchant, Transaction.user_id),
+    )
+
+    @staticmethod
+    async def suggest_vendors(
+        db: AsyncSession,
+        user_id: int,
+        query: str,
+        limit: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """
+        Vendor and merchant names matching a (possibly misspelt) query.
+
+        Args:
+            db: Database session
+            user_id: Owner of the expenses and transactions searched
+            query: Text typed so far
+            limit: Maximum suggestions
+
+        Returns:
+            Suggestions with name and similarity score, best first
+        """
+        query = query.strip()
+        if not query:
+            return []
+
+        if db.get_bind().dialect.name != "postgresql":
+            return await SearchService._suggest_vendors_in_process(db, user_id, query, limit)
+
+        needle = query.lower()
+        branches = []
+        for column, owner in SearchService.NAME_COLUMNS:
+            lowered = func.lower(column)
+            branches.append(
+                select(
+                    column.label("name"),
+                    func.word_similarity(needle, lowered).label("score"),
+                    func.similarity(needle, lowered).label("overall"),
+                )
+                .where(owner == user_id)
+                .where(lowered.op("%>")(needle))
+            )
+        candidates = union_all(*branches).subquery()
+
+        score = func.max(candidates.c.score)
+        result = await db.execute(
+            select(candidates.c.name, score)
+            .group_by(candidates.c.name)
+            .order_by(score.desc(), func.max(candidates.c.overall).desc(), candidates.c.name)
+            .limit(limit)
+        )
+        return [{"name": name, "score": round(float(score), 4)} for name, score in result]
+
+    @staticmethod
+    async def _suggest_vendors_in_process(
+        db: AsyncSession,
+        user_id: int,
+        query: str,
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        names = union_all(*(
+            select(column.label("name")).where(owner == user_id).where(column.is_not(None))
+            for column, owner in SearchService.NAME_COLUMNS
+        )).subquery()
+        result = await db.execute(select(names.c.name).distinct())
+        index = TrigramIndex(result.scalars())
+
+        return [
+            {"name": name, "score": round(score, 4)}
+            for name, score in index.search(query, limit, SearchService.SIMILARITY_THRESHOLD)
+        ]
+
+    @staticmethod
+    async def find_duplicate_expenses(
+        db: AsyncSession,
+        user_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find pairs of expenses that look like the same purchase twice.
+
+        Expenses are blocked by exact amount and a date window (the
+        reconciliation CandidateIndex), and only pairs inside a block are
+        compared on vendor similarity, so the cost grows with the number
+        of near-identical amounts, not with all pairs.
+
+        Args:
+            db: Database session
+            user_id: Expense owner
+            start_date: Range start, defaults to one year ago
+            end_date: Range end, defaults to now
+
+        Returns:
+            Candidate pairs, most similar first
+        """
+        end_date = end_date or datetime.utcnow()
+        start_date = start_date or end_date - timedelta(days=365)
+
+        result = await db.execute(
+            select(
+                Expense.id, Expense.amount, Expense.currency,
+                Expense.expense_date, Expense.vendor, Expense.description,
+            )
+            .where(Expense.user_id == user_id)
+            .where(Expense.expense_date >= start_date)
+            .where(Expense.expense_date < end_date)
+        )
+        expenses = result.all()
+
+        index = CandidateIndex()
+        for expense in expenses:
+            index.add(expense.currency or "USD", expense.amount, expense.expense_date, expense)
+
+        pairs = []
+        for expense in expenses:
+            for offset, _, other in index.candidates(
+                expense.currency or "USD",
+                expense.amount,
+                expense.expense_date,
+                before=SearchService.DUPLICATE_DAYS,
+                after=SearchService.DUPLICATE_DAYS,
+            ):
+                # Each pair is seen from both sides; report it once
+                if other.id <= expense.id:
+                    continue
+
+                # Bank-style names carry extra words ("ADOBE *CREATIVE CLD"),
+                # so score how much of either name the other contains
+                left = expense.vendor or expense.description
+                right = other.vendor or other.description
+                score = 1.0
+                if left or right:
+                    score = max(word_similarity(left, right), word_similarity(right, left))
+                if score >= SearchService.DUPLICATE_MIN_SIMILARITY:
+                    pairs.append({
+                        "expense_id": expense.id,
+                        "duplicate_id": other.id,
+                        "amount": float(expense.amount),
+                        "days_apart": round(abs(offset), 2),
+                        "vendor_similarity": round(score, 4),
+                    })
+
+        pairs.sort(key=lambda pair: (-pair["vendor_similarity"], pair["days_apart"]))
+        return pairs
@@ -0,0 +1,474 @@
+"""
+Bank statement import service.
+
+Stream-parses CSV and OFX bank statements into transactions. Files are
+read line by line and inserted in fixed-size batches, so multi-year
+statements never have to fit in memory.
+"""
+import csv
+import hashlib
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+
+from dateutil import parser as date_parser
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.models.transaction import Transaction, TransactionType
+from app.services.balance_service import BalanceService
+from app.services.partition_service import PartitionService
+
+logger = logging.getLogger(__name__)
+
+
+class StatementFormatError(ValueError):
+    """
+    Raised when a statement file can't be parsed.
+
+    From import_rows, totals holds what earlier batches had already
+    imported; those stay committed.
+    """
+
+    totals: Optional[Dict[str, int]] = None
+
+
+class StatementImportService:
+    """Service for importing bank statement files into transactions."""
+
+    BATCH_SIZE = 1000
+
+    # pg_advisory_xact_lock(ADVISORY_LOCK_ID, user_id) serializes one
+    # user's import batches
+    ADVISORY_LOCK_ID = 27
+
+    SUPPORTED_FORMATS = ("csv", "ofx")
+
+    # Accepted CSV header names (lowercased) for each field
+    CSV_COLUMNS = {
+        "date": ("date", "transaction date", "posted date", "posting date", "booking date"),
+        "amount": ("amount", "transaction amount", "value"),
+        "debit": ("debit", "withdrawal", "money out"),
+        "credit": ("credit", "deposit", "money in"),
+        "description": ("description", "details", "memo", "payee", "name", "narrative"),
+        "external_id": ("id", "transaction id", "reference", "fitid", "reference number"),
+        "currency": ("currency",),
+    }
+
+    # OFX TRNTYPE -> TransactionType
+    OFX_TYPES = {
+        "CREDIT": TransactionType.DEPOSIT,
+        "DEP": TransactionType.DEPOSIT,
+        "INT": TransactionType.DEPOSIT,
+        "DIV": TransactionType.DEPOSIT,
+        "DIRECTDEP": TransactionType.ACH_IN,
+        "DEBIT": TransactionType.WITHDRAWAL,
+        "ATM": TransactionType.WITHDRAWAL,
+        "CASH": TransactionType.WITHDRAWAL,
+        "FEE": TransactionType.WITHDRAWAL,
+        "SRVCHG": TransactionType.WITHDRAWAL,
+        "CHECK": TransactionType.WITHDRAWAL,
+        "PAYMENT": TransactionType.WITHDRAWAL,
+        "DIRECTDEBIT": TransactionType.ACH_OUT,
+        "POS": TransactionType.CARD_PAYMENT,
+        "XFER": TransactionType.TRANSFER,
+    }
+
+    # Noise stripped from bank descriptions to get a merchant name
+    MERCHANT_PREFIXES = re.compile(
+        r"^(?:(?:POS|ACH|DEBIT|CREDIT|CARD|PURCHASE|RECURRING|CHECKCARD|VISA|MC)\s+)+"
+        r"|^(?:SQ|TST|PAYPAL|PP|SP|GOOGLE)\s*\*\s*",
+        re.IGNORECASE,
+    )
+    MERCHANT_NOISE = re.compile(
+        r"#\s*\d+"                          # store numbers
+        r"|\b(?:X{2,}|\*{2,})\d{2,}\b"      # masked card numbers
+        r"|\b\d{2}/\d{2}(?:/\d{2,4})?\b"    # embedded dates
+        r"|\b\d{5,}\b"                      # reference numbers
+        r"|\s+[A-Z]{2}$",                   # trailing state code
+    )
+
+    OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)")
+
+    @staticmethod
+    def normalize_merchant(description: Optional[str]) -> Optional[str]:
+        """
+        Derive a clean merchant name from a raw bank description.
+
+        Args:
+            description: Raw description, e.g. "SQ *BLUE BOTTLE #123 SF CA"
+
+        Returns:
+            Normalized merchant name, e.g. "Blue Bottle Sf", or None
+        """
+        if not description:
+            return None
+
+        name = description.strip()
+        name = StatementImportService.MERCHANT_PREFIXES.sub("", name)
+        name = StatementImportService.MERCHANT_NOISE.sub(" ", name)
+        name = re.sub(r"[^\w&'.\- ]", " ", name)
+        name = re.sub(r"\s+", " ", name).strip(" .-")
+
+        if not name:
+            return None
+        return name.title()[:255]
+
+    @staticmethod
+    def parse_amount(value: Optional[str]) -> Optional[Decimal]:
+        """Parse a bank amount such as "-1,234.50", "$12.00" or "(3.10)"."""
+        if value is None:
+            return None
+
+        cleaned = value.strip()
+        if not cleaned:
+            return None
+
+        negative = cleaned.startswith("(") and cleaned.endswith(")")
+        cleaned = re.sub(r"[^\d.\-+]", "", cleaned)
+        try:
+            amount = Decimal(cleaned)
+        except InvalidOperation:
+            return None
+
+        return -abs(amount) if negative else amount
+
+    @staticmethod
+    def parse_ofx_date(value: str) -> datetime:
+        """Parse an OFX date such as 20240131120000.000[-5:EST]."""
+        match = re.match(r"(\d{8})(\d{6})?(?:\.\d+)?(?:\[([+-]?\d+(?:\.\d+)?)(?::\w+)?\])?", value.strip())
+        if not match:
+            raise StatementFormatError(f"Invalid OFX date: {value!r}")
+
+        parsed = datetime.strptime(match.group(1) + (match.group(2) or "000000"), "%Y%m%d%H%M%S")
+        offset = timezone(timedelta(hours=float(match.group(3) or 0)))
+        return parsed.replace(tzinfo=offset).astimezone(timezone.utc)
+
+    @staticmethod
+    def _make_external_id(*parts: Any) -> str:
+        """Build a stable id for rows whose bank export has none."""
+        digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8"))
+        return f"stmt-{digest.hexdigest()[:32]}"
+
+    @staticmethod
+    def _type_for_amount(amount: Decimal) -> TransactionType:
+        return TransactionType.DEPOSIT if amount >= 0 else TransactionType.WITHDRAWAL
+
+    @staticmethod
+    def iter_csv(stream: TextIO, currency: str = "USD") -> Iterator[Dict[str, Any]]:
+        """
+        Lazily parse a CSV statement.
+
+        Rows without an id column get a content-derived external_id, with
+        an occurrence counter so identical same-day rows stay distinct.
+        Statements are ordered by date, so the counter only tracks the
+        current day and memory stays flat regardless of file size.
+
+        Args:
+            stream: Text stream positioned at the header row
+            currency: Currency to use when the file has no currency column
+
+        Yields:
+            Transaction field dictionaries
+        """
+        reader = csv.DictReader(stream)
+        if not reader.fieldnames:
+            raise StatementFormatError("CSV statement has no header row")
+
+        headers = {name.strip().lower(): name for name in reader.fieldnames if name}
+        columns = {
+            field: next((headers[alias] for alias in aliases if alias in headers), None)
+            for field, aliases in StatementImportService.CSV_COLUMNS.items()
+        }
+
+        if columns["date"] is None:
+            raise StatementFormatError("CSV statement has no date column")
+        if columns["amount"] is None and columns["debit"] is None and columns["credit"] is None:
+            raise StatementFormatError("CSV statement has no amount column")
+
+        occurrences: Dict[tuple, int] = {}
+        occurrences_day = None
+
+        for row in reader:
+            raw_date = (row.get(columns["date"]) or "").strip()
+            if not raw_date:
+                continue
+
+            if columns["amount"] is not None:
+                amount = StatementImportService.parse_amount(row.get(columns["amount"]))
+            else:
+                credit = StatementImportService.parse_amount(row.get(columns["credit"])) or Decimal(0)
+                debit = StatementImportService.parse_amount(row.get(columns["debit"])) or Decimal(0)
+                amount = credit - abs(debit)
+            if amount is None:
+                continue
+
+            try:
+                transaction_date = date_parser.parse(raw_date)
+            except (ValueError, OverflowError):
+                continue
+            if transaction_date.tzinfo is None:
+                transaction_date = transaction_date.replace(tzinfo=timezone.utc)
+
+            description = (row.get(columns["description"]) or "").strip() if columns["description"] else ""
+            external_id = (row.get(columns["external_id"]) or "").strip() if columns["external_id"] else ""
+
+            if not external_id:
+                if transaction_date.date() != occurrences_day:
+                    occurrences, occurrences_day = {}, transaction_date.date()
+                key = (transaction_date.isoformat(), str(amount), description)
+                occurrences[key] = occurrences.get(key, 0) + 1
+                external_id = StatementImportService._make_external_id(*key, occurrences[key])
+
+            row_currency = (row.get(columns["currency"]) or "").strip() if columns["currency"] else ""
+
+            yield {
+                "amount": amount,
+                "currency": (row_currency or currency).upper()[:3],
+                "transaction_type": StatementImportService._type_for_amount(amount),
+                "transaction_date": transaction_date,
+                "description": description or None,
+                "merchant": StatementImportService.normalize_merchant(description),
+                "external_id": external_id[:255],
+            }
+
+    @staticmethod
+    def iter_ofx(stream: TextIO, currency: str = "USD") -> Iterator[Dict[str, Any]]:
+        """
+        Lazily parse an OFX statement (SGML 1.x or XML 2.x).
+
+        Only the tags of the current <STMTTRN> block are held in memory.
+
+        Args:
+            stream: Text stream of the OFX file
+            currency: Fallback when the file has no CURDEF
+
+        Yields:
+            Transaction field dictionaries
+        """
+        current: Optional[Dict[str, str]] = None
+        default_currency = currency
+
+        for line in stream:
+            for closing, tag, value in StatementImportService.OFX_TAG.findall(line):
+                tag = tag.upper()
+                value = value.strip()
+
+                if tag == "CURDEF" and not closing and value:
+                    default_currency = value
+                elif tag == "STMTTRN":
+                    if closing:
+                        if current is not None:
+                            parsed = StatementImportService._ofx_transaction(current, default_currency)
+                            if parsed is not None:
+                                yield parsed
+                        current = None
+                    else:
+                        current = {}
+                elif current is not None and not closing and value:
+                    current[tag] = value
+
+    @staticmethod
+    def _ofx_transaction(fields: Dict[str, str], currency: str) -> Optional[Dict[str, Any]]:
+        amount = StatementImportService.parse_amount(fields.get("TRNAMT"))
+        posted = fields.get("DTPOSTED")
+        if amount is None or not posted:
+            return None
+
+        transaction_date = StatementImportService.parse_ofx_date(posted)
+        name = fields.get("NAME") or fields.get("PAYEE") or ""
+        memo = fields.get("MEMO") or ""
+        description = " ".join(part for part in (name, memo) if part)
+
+        external_id = fields.get("FITID") or StatementImportService._make_external_id(
+            transaction_date.isoformat(), amount, description,
+        )
+        transaction_type = StatementImportService.OFX_TYPES.get(
+            fields.get("TRNTYPE", "").upper(),
+            StatementImportService._type_for_amount(amount),
+        )
+
+        return {
+            "amount": amount,
+            "currency": (fields.get("CURRENCY") or currency).upper()[:3],
+            "transaction_type": transaction_type,
+            "transaction_date": transaction_date,
+            "description": description or None,
+            "merchant": StatementImportService.normalize_merchant(name or memo),
+            "external_id": external_id[:255],
+        }
+
+    @staticmethod
+    def iter_statement(stream: TextIO, fmt: str, currency: str = "USD") -> Iterator[Dict[str, Any]]:
+        """Dispatch to the parser for the given format ("csv" or "ofx")."""
+        fmt = fmt.lower()
+        if fmt == "csv":
+            return StatementImportService.iter_csv(stream, currency)
+        if fmt in ("ofx", "qfx"):
+            return StatementImportService.iter_ofx(stream, currency)
+        raise StatementFormatError(f"Unsupported statement format: {fmt}")
+
+    @staticmethod
+    def detect_format(filename: Optional[str]) -> Optional[str]:
+        """Guess the statement format from a file name."""
+        if not filename or "." not in filename:
+            return None
+        extension = filename.rsplit(".", 1)[1].lower()
+        if extension == "qfx":
+            return "ofx"
+        return extension if extension in StatementImportService.SUPPORTED_FORMATS else None
+
+    @staticmethod
+    def _batches(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    async def import_rows(
+        db: AsyncSession,
+        user_id: int,
+        rows: Iterable[Dict[str, Any]],
+        batch_size: Optional[int] = None,
+        progress: Optional[Callable[[Dict[str, int]], None]] = None,
+    ) -> Dict[str, int]:
+        """
+        Insert parsed statement rows, skipping ones already imported.
+
+        Each batch costs one lookup of existing external_ids and one
+        multi-row INSERT, and is committed on its own so a failure midway
+        keeps earlier batches. Re-running the same file is a no-op, so the
+        fixed file can simply be imported again. Balance checkpoints after
+        the oldest inserted row are dropped.
+
+        On PostgreSQL each batch holds a per-user advisory lock from its
+        lookup to its commit, so concurrent imports of overlapping
+        statements can't both insert the same rows.
+
+        Rows are parsed in a worker thread, since reading the statement
+        is blocking file I/O. Statements reach back further than the
+        pre-created partitions, so the monthly partitions a batch needs
+        are created before it is inserted.
+
+        Args:
+            db: Database session
+            user_id: Owner of the transactions
+            rows: Parsed rows from iter_statement
+            batch_size: Rows per INSERT
+            progress: Called with the running totals after every batch
+
+        Returns:
+            Totals: rows read, inserted and skipped as duplicates
+
+        Raises:
+            StatementFormatError: A row can't be parsed; its totals are
+                those of the batches already committed
+        """
+        batch_size = batch_size or StatementImportService.BATCH_SIZE
+        totals = {"read": 0, "inserted": 0, "duplicates": 0}
+
+        postgres = db.get_bind().dialect.name == "postgresql"
+        partitioned = postgres and await PartitionService.is_partitioned(db, "transactions")
+        partitioned_months = set()
+
+        batches = StatementImportService._batches(rows, batch_size)
+        while True:
+            try:
+                batch = await run_in_threadpool(next, batches, None)
+            except StatementFormatError as e:
+                e.totals = dict(totals)
+                raise
+            if batch is None:
+                break
+            totals["read"] += len(batch)
+
+            # Dedupe within the batch first, then against the database
+            unique: Dict[str, Dict[str, Any]] = {}
+            for row in batch:
+                unique.setdefault(row["external_id"], row)
+
+            if postgres:
+                await db.execute(select(func.pg_advisory_xact_lock(
+                    StatementImportService.ADVISORY_LOCK_ID, user_id,
+                )))
+            result = await db.execute(
+                select(Transaction.external_id)
+                .where(Transaction.user_id == user_id)
+                .where(Transaction.external_id.in_(list(unique)))
+            )
+            existing = set(result.scalars().all())
+
+            new_rows = [
+                {**row, "user_id": user_id}
+                for external_id, row in unique.items()
+                if external_id not in existing
+            ]
+
+            if new_rows:
+                if partitioned:
+                    # Partition bounds are UTC month starts
+                    months = {
+                        PartitionService.month_start(row["transaction_date"].astimezone(timezone.utc).date())
+                        for row in new_rows
+                    } - partitioned_months
+                    if months:
+                        await PartitionService.create_partitions(
+                            db, min(months), max(months), tables=["transactions"],
+                        )
+                        partitioned_months |= months
+                await db.execute(insert(Transaction), new_rows)
+                await BalanceService.invalidate_from(
+                    db, user_id, min(row["transaction_date"] for row in new_rows),
+                )
+            # Also releases the advisory lock
+            await db.commit()
+
+            totals["inserted"] += len(new_rows)
+            totals["duplicates"] += len(batch) - len(new_rows)
+
+            logger.info(
+                "Statement import for user %s: %d read, %d inserted, %d duplicates",
+                user_id, totals["read"], totals["inserted"], totals["duplicates"],
+            )
+            if progress is not None:
+                progress(dict(totals))
+
+        return totals
+
+    @staticmethod
+    async def import_statement(
+        db: AsyncSession,
+        user_id: int,
+        stream: TextIO,
+        fmt: str,
+        currency: str = "USD",
+        batch_size: Optional[int] = None,
+        progress: Optional[Callable[[Dict[str, int]], None]] = None,
+    ) -> Dict[str, int]:
+        """
+        Parse and import a whole statement file.
+
+        Args:
+            db: Database session
+            user_id: Owner of the transactions
+            stream: Text stream of the statement
+            fmt: "csv" or "ofx"
+            currency: Default currency for rows without one
+            batch_size: Rows per INSERT
+            progress: Progress callback, see import_rows
+
+        Returns:
+            Import totals
+        """
+        rows = StatementImportService.iter_statement(stream, fmt, currency)
+        return await StatementImportService.import_rows(
+            db, user_id, rows, batch_size=batch_size, progress=progress,
+        )
@@ -0,0 +1,452 @@
+"""
+Synthetic creator dataset generator.
+
+Produces realistic volumes of creators for benchmarks and index work:
+users with one to four connected platforms, years of daily earnings
+(growth, weekly and yearly seasonality, sponsorship spikes), expenses,
+bank transactions for payouts, tax savings and card payments, brand
+deal invoices and weekly forecast runs.
+
+The output is deterministic: the same arguments give the same rows,
+except for the random salt of the (shared) password hash.
+Creators are generated in fixed-size chunks, each with its own random
+stream derived from the seed, so memory stays bounded at any scale.
+
+Rows can be bulk-loaded into PostgreSQL with COPY (or inserted into
+SQLite), or written as CSV files with a psql script that loads them.
+Derived tables (earning_features) are left to their refresh job.
+"""
+import csv
+import logging
+import os
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.db.base import Base
+from app.services.deduction_service import DeductionService
+from app.services.forecast_evaluation_service import ForecastEvaluationService
+from app.services.forecast_service import ForecastService, synthetic_series
+from app.services.invoice_number_service import InvoiceNumberService
+from app.services.partition_service import PartitionService
+
+logger = logging.getLogger(__name__)
+
+# (table, columns, rows) for one chunk of creators
+Batch = Tuple[str, Sequence[str], List[tuple]]
+
+# Load order (foreign keys first) and the columns generated per table.
+# Enum columns hold member names, as SQLAlchemy stores them.
+COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "users": (
+        "id", "email", "hashed_password", "full_name", "is_active", "is_verified", "tier",
+        "tax_withholding_rate", "tax_savings_balance", "country", "currency", "created_at",
+    ),
+    "connected_platforms": (
+        "id", "user_id", "platform_type", "access_token", "platform_username", "is_active",
+        "last_synced_at", "created_at",
+    ),
+    "earnings": (
+        "id", "user_id", "platform_id", "amount", "currency", "earning_date", "payout_date",
+        "earning_type", "tax_withheld", "is_taxable",
+    ),
+    "expenses": (
+        "id", "user_id", "amount", "currency", "expense_date", "category", "vendor",
+        "is_deductible", "deduction_percentage",
+    ),
+    "transactions": (
+        "id", "user_id", "amount", "currency", "transaction_type", "transaction_date",
+        "description", "merchant", "related_expense_id",
+    ),
+    "invoices": (
+        "id", "user_id", "invoice_number", "status", "amount", "currency", "client_name",
+        "client_email", "description", "invoice_date", "due_date", "paid_date", "reminder_sent_count",
+    ),
+    "invoice_sequences": ("user_id", "next_value", "number_format"),
+    "predictions": (
+        "id", "user_id", "prediction_date", "forecast_date", "predicted_amount",
+        "confidence_interval_lower", "confidence_interval_upper", "model_version", "model_type",
+        "actual_amount", "prediction_error",
+    ),
+}
+
+# Tables whose ids come from a sequence
+SERIAL_TABLES = tuple(table for table, columns in COLUMNS.items() if columns[0] == "id")
+
+TIERS = (("FREE", 0.6), ("CREATOR", 0.25), ("PRO", 0.12), ("BUSINESS", 0.03))
+COUNTRIES = ("US", "US", "US", "US", "GB", "CA", "DE", "AU", "FR", "BR")
+PLATFORMS = (
+    ("YOUTUBE", 0.3), ("TIKTOK", 0.2), ("INSTAGRAM", 0.15), ("TWITCH", 0.1), ("PATREON", 0.1),
+    ("SUBSTACK", 0.05), ("SHOPIFY", 0.05), ("ONLYFANS", 0.03), ("OTHER", 0.02),
+)
+PLATFORM_EARNING_TYPES = {
+    "TWITCH": "tips", "PATREON": "membership", "SUBSTACK": "membership",
+    "ONLYFANS": "membership", "SHOPIFY": "sales",
+}
+
+# category -> (share of expenses, median amount, vendors)
+EXPENSES = {
+    "SOFTWARE": (0.25, 30, ("Adobe", "Canva", "Epidemic Sound", "Notion", "Dropbox")),
+    "EQUIPMENT": (0.1, 250, ("B&H Photo", "Amazon", "Apple", "Best Buy")),
+    "MEALS": (0.15, 40, ("Starbucks", "Chipotle", "Sweetgreen", "Local Cafe")),
+    "TRAVEL": (0.08, 300, ("Delta", "Uber", "Airbnb", "Marriott")),
+    "MARKETING": (0.1, 120, ("Meta Ads", "Google Ads", "Fiverr")),
+    "EDUCATION": (0.05, 150, ("Skillshare", "Udemy", "MasterClass")),
+    "OFFICE": (0.1, 80, ("WeWork", "Staples", "ConEd", "Comcast")),
+    "PROFESSIONAL_SERVICES": (0.05, 400, ("H&R Block", "LegalZoom", "Local CPA")),
+    "INSURANCE": (0.02, 150, ("Hiscox", "State Farm")),
+    "TEAM": (0.07, 500, ("Upwork", "Gusto", "Freelance Editor")),
+    "OTHER": (0.03, 50, (None,)),
+}
+BRANDS = ("Squarespace", "NordVPN", "Raid Shadow Legends", "HelloFresh", "Skillshare", "Audible",
+          "Manscaped", "Honey", "Athletic Greens", "Grammarly", "Ridge Wallet", "ExpressVPN")
+
+MONEY = "{:.2f}".format
+
+
+def _money(values) -> List[Decimal]:
+    return [Decimal(MONEY(value)) for value in values]
+
+
+class SyntheticDataService:
+    """Service generating and bulk-loading synthetic creator data."""
+
+    PASSWORD = "synthetic-password"
+
+    # Creators generated per random stream; changing it changes the data
+    USERS_PER_CHUNK = 100
+
+    FORECAST_RUNS = 4  # Weekly forecast runs kept per creator
+    FORECAST_HORIZON = 30
+
+    @staticmethod
+    def email(user_id: int) -> str:
+        return f"creator{user_id}@synthetic.example.com"
+
+    @staticmethod
+    def _yearly_seasonality(days: Sequence[date]) -> np.ndarray:
+        """Ad-rate cycle: high in Q4, a dip in January and the summer."""
+        day_of_year = np.array([day.timetuple().tm_yday for day in days])
+        return 1 + 0.2 * np.cos(2 * np.pi * (day_of_year - 350) / 365.25)
+
+    @staticmethod
+    def generate(
+        users: int,
+        days: int,
+        seed: int = 0,
+        end: Optional[date] = None,
+        first_ids: Optional[Dict[str, int]] = None,
+    ) -> Iterator[List[Batch]]:
+        """
+        Generate creators chunk by chunk.
+
+        Args:
+            users: Creators to generate
+            days: Days of history, ending the day before end
+            seed: Random seed
+            end: First day not covered, defaults to today (UTC)
+            first_ids: Table -> id of its first generated row, defaults to 1
+
+        Yields:
+            The (table, columns, rows) batches of one chunk, in load order
+        """
+        end = end or datetime.utcnow().date()
+        start = end - timedelta(days=days)
+        calendar = [start + timedelta(days=offset) for offset in range(days)]
+        times = [datetime(day.year, day.month, day.day, tzinfo=timezone.utc) for day in calendar]
+        seasonality = SyntheticDataService._yearly_seasonality(calendar)
+        # Platforms pay a month's earnings on the 21st of the next month
+        month_index = [(day.year - start.year) * 12 + day.month - start.month for day in calendar]
+        month_starts = np.flatnonzero(np.diff(month_index, prepend=-1))
+        payout_times = []
+        for first in month_starts:
+            month = PartitionService.add_months(PartitionService.month_start(calendar[first]), 1)
+            payout_times.append(datetime(month.year, month.month, 21, tzinfo=timezone.utc))
+        end_time = datetime(end.year, end.month, end.day, tzinfo=timezone.utc)
+        hashed_password = get_password_hash(SyntheticDataService.PASSWORD)
+
+        next_id = {table: 1 for table in SERIAL_TABLES}
+        next_id.update(first_ids or {})
+
+        def take(table: str, count: int) -> range:
+            ids = range(next_id[table], next_id[table] + count)
+            next_id[table] += count
+            return ids
+
+        platform_names = [name for name, _ in PLATFORMS]
+        platform_weights = np.array([weight for _, weight in PLATFORMS])
+        categories = list(EXPENSES)
+        category_weights = np.array([EXPENSES[name][0] for name in categories])
+        category_weights /= category_weights.sum()
+        model_type = "prophet" if days >= ForecastService.PROPHET_MIN_HISTORY_DAYS else "holt_winters"
+        settled_before = end - timedelta(days=ForecastEvaluationService.SETTLE_DAYS)
+
+        for chunk, chunk_start in enumerate(range(0, users, SyntheticDataService.USERS_PER_CHUNK)):
+            count = min(SyntheticDataService.USERS_PER_CHUNK, users - chunk_start)
+            chunk_seed = int(np.random.SeedSequence([seed, chunk]).generate_state(1)[0])
+            rng = np.random.default_rng(chunk_seed)
+            rows: Dict[str, List[tuple]] = {table: [] for table in COLUMNS}
+
+            user_ids = take("users", count)
+            rates = rng.choice([25, 30, 35], count)
+            tiers = rng.choice([name for name, _ in TIERS], count, p=[weight for _, weight in TIERS])
+
+            # Platforms: one to four per creator, some connected partway through
+            platform_counts = rng.choice([1, 2, 3, 4], count, p=[0.35, 0.35, 0.2, 0.1])
+            platform_owner = np.repeat(np.arange(count), platform_counts)
+            platform_ids = take("connected_platforms", len(platform_owner))
+            platform_types = []
+            for owned in platform_counts:
+                platform_types.extend(rng.choice(platform_names, owned, replace=False, p=platform_weights))
+            first_day = np.where(rng.random(len(platform_owner)) < 0.3, rng.integers(0, max(days // 2, 1), len(platform_owner)), 0)
+
+            amounts = synthetic_series(len(platform_owner), days, chunk_seed) * seasonality
+            amounts[np.arange(days) < first_day[:, None]] = 0
+            amounts = np.round(amounts, 2)
+            medians = np.median(amounts, axis=1, keepdims=True)
+            sponsored = amounts > 4 * np.maximum(medians, 1)
+            user_rate = rates[platform_owner][:, None] / 100
+            withheld = np.round(amounts * user_rate, 2)
+            monthly = np.add.reduceat(amounts, month_starts, axis=1)
+
+            for row, platform_id in enumerate(platform_ids):
+                owner = platform_owner[row]
+                user_id = user_ids[owner]
+                kind = platform_types[row]
+                default_type = PLATFORM_EARNING_TYPES.get(kind, "ad_revenue")
+                connected = times[first_day[row]]
+                rows["connected_platforms"].append((
+                    platform_id, user_id, kind, "synthetic", f"creator{user_id}_{kind.lower()}", True,
+                    end_time - timedelta(hours=int(rng.integers(1, 48))), connected,
+                ))
+
+                live = range(first_day[row], days)
+                earning_ids = take("earnings", len(live))
+                amount_values = _money(amounts[row, first_day[row]:])
+                withheld_values = _money(withheld[row, first_day[row]:])
+                spikes = sponsored[row].tolist()
+                for earning_id, day, amount, tax in zip(earning_ids, live, amount_values, withheld_values):
+                    rows["earnings"].append((
+                        earning_id, user_id, platform_id, amount, "USD", times[day],
+                        payout_times[month_index[day]], "sponsorship" if spikes[day] else default_type,
+                        tax, True,
+                    ))
+
+                # Monthly payout and the automatic tax savings transfer
+                for month, total in enumerate(monthly[row].tolist()):
+                    paid = payout_times[month]
+                    if total <= 0 or paid >= end_time:
+                        continue
+                    tax = total * rates[owner] / 100
+                    deposit_id, savings_id = take("transactions", 2)
+                    rows["transactions"].append((
+                        deposit_id, user_id, Decimal(MONEY(total)), "USD", "ACH_IN", paid,
+                        f"{kind.title()} payout", kind.title(), None,
+                    ))
+                    rows["transactions"].append((
+                        savings_id, user_id, -Decimal(MONEY(tax)), "USD", "TAX_SAVINGS", paid,
+                        "Tax savings", None, None,
+                    ))
+
+            creator_daily = np.zeros((count, days))
+            np.add.at(creator_daily, platform_owner, amounts)
+            creator_withheld = np.zeros(count)
+            np.add.at(creator_withheld, platform_owner, withheld.sum(axis=1))
+
+            for index, user_id in enumerate(user_ids):
+                rows["users"].append((
+                    user_id, SyntheticDataService.email(user_id), hashed_password, f"Creator {user_id}",
+                    True, bool(rng.random() < 0.8), tiers[index], Decimal(int(rates[index])),
+                    Decimal(MONEY(creator_withheld[index])), COUNTRIES[rng.integers(len(COUNTRIES))], "USD",
+                    times[0] - timedelta(days=int(rng.integers(0, 365))),
+                ))
+
+                # Expenses, each paid by card
+                spend_days = np.sort(rng.integers(0, days, rng.poisson(days / (4 if tiers[index] != "FREE" else 8))))
+                expense_categories = rng.choice(categories, len(spend_days), p=category_weights)
+                for day, category in zip(spend_days.tolist(), expense_categories):
+                    share, median, vendors = EXPENSES[category]
+                    amount = Decimal(MONEY(median * rng.lognormal(0, 0.6)))
+                    vendor = vendors[rng.integers(len(vendors))]
+                    expense_id, = take("expenses", 1)
+                    payment_id, = take("transactions", 1)
+                    rows["expenses"].append((
+                        expense_id, user_id, amount, "USD", times[day], category, vendor,
+                        bool(rng.random() < 0.9), Decimal(50 if category == "MEALS" else 100),
+                    ))
+                    rows["transactions"].append((
+                        payment_id, user_id, -amount, "USD", "CARD_PAYMENT", times[day],
+                        vendor, vendor, expense_id,
+                    ))
+
+                # Brand deals: a minority of creators invoice sponsors
+                if rng.random() < 0.3:
+                    invoice_days = np.sort(rng.integers(0, days, rng.poisson(days / 45)))
+                    for seq, day in enumerate(invoice_days.tolist(), 1):
+                        issued = times[day]
+                        due = issued + timedelta(days=30)
+                        paid = issued + timedelta(days=int(rng.integers(5, 50)))
+                        roll = rng.random()
+                        if paid < end_time and roll < 0.85:
+                            status, paid_date = "PAID", paid
+                        elif due >= end_time:
+                            status, paid_date = ("SENT", "VIEWED", "DRAFT")[int(roll * 3)], None
+                        else:
+                            status, paid_date = ("OVERDUE" if roll < 0.95 else "CANCELLED"), None
+                        brand = BRANDS[rng.integers(len(BRANDS))]
+                        invoice_id, = take("invoices", 1)
+                        rows["invoices"].append((
+                            invoice_id, user_id,
+                            InvoiceNumberService.format_number(settings.INVOICE_NUMBER_FORMAT, seq, issued),
+                            status, Decimal(MONEY(rng.lognormal(7, 0.8))), "USD", brand,
+                            f"partnerships@{brand.lower().replace(' ', '')}.example.com",
+                            "Sponsored video integration", issued, due, paid_date,
+                            int(status == "OVERDUE") * int(rng.integers(1, 4)),
+                        ))
+                    if len(invoice_days):
+                        rows["invoice_sequences"].append((user_id, len(invoice_days) + 1, settings.INVOICE_NUMBER_FORMAT))
+
+                # Weekly forecast runs, settled where the actuals are known
+                for run in range(SyntheticDataService.FORECAST_RUNS):
+                    run_day = days - 1 - 7 * run
+                    if run_day < 28:
+                        break
+                    level = creator_daily[index, run_day - 28:run_day].mean()
+                    predicted = Decimal(MONEY(level))
+                    lower, upper = Decimal(MONEY(level * 0.6)), Decimal(MONEY(level * 1.4))
+                    prediction_ids = take("predictions", SyntheticDataService.FORECAST_HORIZON)
+                    for offset, prediction_id in enumerate(prediction_ids):
+                        day = run_day + offset
+                        forecast_day = start + timedelta(days=day)
+                        actual = error = None
+                        if forecast_day < settled_before:
+                            actual = Decimal(MONEY(creator_daily[index, day]))
+                            error = actual - predicted
+                        rows["predictions"].append((
+                            prediction_id, user_id, times[run_day] + timedelta(hours=3),
+                            datetime(forecast_day.year, forecast_day.month, forecast_day.day, tzinfo=timezone.utc),
+                            predicted, lower, upper, ForecastService.MODEL_VERSION, model_type, actual, error,
+                        ))
+
+            yield [(table, columns, rows[table]) for table, columns in COLUMNS.items() if rows[table]]
+
+    @staticmethod
+    async def _first_ids(db: AsyncSession) -> Dict[str, int]:
+        """Next free id per table, so generated rows don't collide with existing ones."""
+        first_ids = {}
+        for table in SERIAL_TABLES:
+            last = (await db.execute(text(f"SELECT coalesce(max(id), 0) FROM {table}"))).scalar_one()
+            first_ids[table] = last + 1
+        return first_ids
+
+    @staticmethod
+    async def load(
+        db: AsyncSession,
+        users: int,
+        days: int,
+        seed: int = 0,
+        end: Optional[date] = None,
+    ) -> Dict[str, int]:
+        """
+        Generate creators into the database, committing per chunk.
+
+        PostgreSQL gets the rows through COPY, with the ledger partitions
+        for the covered months created first and the id sequences moved
+        past the new rows afterwards; other databases get bulk INSERTs.
+
+        Args:
+            db: Database session
+            users: Creators to add
+            days: Days of history per creator
+            seed: Random seed
+            end: First day not covered, defaults to today (UTC)
+
+        Returns:
+            Rows added per table
+        """
+        end = end or datetime.utcnow().date()
+        postgres = db.bind.dialect.name == "postgresql"
+        if postgres and await PartitionService.is_partitioned(db, "earnings"):
+            await PartitionService.create_partitions(db, end - timedelta(days=days), end)
+            await db.commit()
+
+        counts = {table: 0 for table in COLUMNS}
+        first_ids = await SyntheticDataService._first_ids(db)
+        for chunk in SyntheticDataService.generate(users, days, seed, end, first_ids):
+            for table, columns, rows in chunk:
+                if postgres:
+                    connection = await (await db.connection()).get_raw_connection()
+                    await connection.driver_connection.copy_records_to_table(table, records=rows, columns=list(columns))
+                else:
+                    await db.execute(insert(Base.metadata.tables[table]), [dict(zip(columns, row)) for row in rows])
+                counts[table] += len(rows)
+            await db.commit()
+            logger.info("Loaded %d of %d creators", counts["users"], users)
+
+        if postgres:
+            for table in SERIAL_TABLES:
+                await db.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT coalesce(max(id), 1) FROM {table}))"
+                ))
+            await db.commit()
+
+        # A recreated database reuses user ids that may have cached reports
+        await DeductionService.expenses_changed(
+            range(first_ids["users"], first_ids["users"] + counts["users"])
+        )
+        return counts
+
+    @staticmethod
+    def write_files(
+        directory: str,
+        users: int,
+        days: int,
+        seed: int = 0,
+        end: Optional[date] = None,
+    ) -> Dict[str, int]:
+        """
+        Write generated creators as CSV files, one per table, plus
+        load.sql, a psql script that creates the ledger partitions,
+        loads the files with \\copy and moves the id sequences on.
+
+        The files assume an empty, migrated database (ids start at 1).
+
+        Returns:
+            Rows written per table
+        """
+        end = end or datetime.utcnow().date()
+        os.makedirs(directory, exist_ok=True)
+        counts = {table: 0 for table in COLUMNS}
+        files = {table: open(os.path.join(directory, f"{table}.csv"), "w", newline="", encoding="utf-8") for table in COLUMNS}
+        try:
+            writers = {table: csv.writer(stream) for table, stream in files.items()}
+            for table, columns in COLUMNS.items():
+                writers[table].writerow(columns)
+            for chunk in SyntheticDataService.generate(users, days, seed, end):
+                for table, columns, rows in chunk:
+                    writers[table].writerows(rows)
+                    counts[table] += len(rows)
+        finally:
+            for stream in files.values():
+                stream.close()
+
+        script = ["\\set ON_ERROR_STOP on", "BEGIN;"]
+        month = PartitionService.month_start(end - timedelta(days=days))
+        while month <= end:
+            script.extend(f"{PartitionService.partition_ddl(table, month)};" for table in PartitionService.PARTITIONED_TABLES)
+            month = PartitionService.add_months(month, 1)
+        for table, columns in COLUMNS.items():
+            script.append(f"\\copy {table} ({', '.join(columns)}) FROM '{table}.csv' WITH (FORMAT csv, HEADER true)")
+        for table in SERIAL_TABLES:
+            script.append(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT coalesce(max(id), 1) FROM {table}));")
+        script.append("COMMIT;")
+        with open(os.path.join(directory, "load.sql"), "w", encoding="utf-8") as stream:
+            stream.write("\n".join(script) + "\n")
+        return counts
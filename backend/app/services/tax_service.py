@@ -11,6 +11,7 @@ from datetime import datetime
 from app.models.user import User
 from app.models.platform import Earning
 from app.models.transaction import Transaction, TransactionType
+from app.services.deduction_service import DeductionService
 
 
 class TaxService:
@@ -93,7 +94,7 @@ class TaxService:
         year: int = None,
     ) -> dict:
         """
-        Calculate quarterly tax estimate based on earnings.
+        Calculate quarterly tax estimate based on earnings less deductible expenses.
 
         Args:
             user: The user
@@ -133,31 +134,39 @@ class TaxService:
         total_earnings = sum(e.amount for e in earnings)
         total_withheld = sum(e.tax_withheld for e in earnings)
 
+        # Business expenses reduce the income that is taxed
+        deductible_expenses = await DeductionService.deductible_total(
+            db, user.id, quarter_start, quarter_end,
+        )
+        taxable_income = max(total_earnings - deductible_expenses, Decimal(0))
+
         # Simple tax estimate (this is simplified, real tax calc is complex)
         # Assumes self-employment tax (15.3%) + income tax based on bracket
 
-        self_employment_tax = total_earnings * Decimal("0.153")
+        self_employment_tax = taxable_income * Decimal("0.153")
 
         # Simplified income tax brackets (US 2024)
         # This should be customized based on user's country
-        if total_earnings * 4 < 11000:  # Annualized
+        if taxable_income * 4 < 11000:  # Annualized
             income_tax_rate = Decimal("0.10")
-        elif total_earnings * 4 < 44725:
+        elif taxable_income * 4 < 44725:
             income_tax_rate = Decimal("0.12")
-        elif total_earnings * 4 < 95375:
+        elif taxable_income * 4 < 95375:
             income_tax_rate = Decimal("0.22")
-        elif total_earnings * 4 < 182100:
+        elif taxable_income * 4 < 182100:
             income_tax_rate = Decimal("0.24")
         else:
             income_tax_rate = Decimal("0.32")
 
-        income_tax = total_earnings * income_tax_rate
+        income_tax = taxable_income * income_tax_rate
         total_tax_estimate = self_employment_tax + income_tax
 
         return {
             "quarter": quarter,
             "year": year,
             "total_earnings": float(total_earnings),
+            "deductible_expenses": float(deductible_expenses),
+            "taxable_income": float(taxable_income),
             "self_employment_tax": float(self_employment_tax),
             "income_tax": float(income_tax),
             "total_tax_estimate": float(total_tax_estimate),
@@ -183,6 +192,7 @@ class TaxService:
         """
         year = datetime.utcnow().year
         year_start = datetime(year, 1, 1)
+        year_end = datetime(year + 1, 1, 1)
 
         # Get all taxable earnings for the year
         result = await db.execute(
@@ -190,6 +200,7 @@ class TaxService:
             .where(Earning.user_id == user.id)
             .where(Earning.is_taxable == True)
             .where(Earning.earning_date >= year_start)
+            .where(Earning.earning_date < year_end)
         )
         earnings = result.scalars().all()
 
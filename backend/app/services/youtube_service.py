@@ -3,15 +3,15 @@ YouTube API integration service.
 
 Handles OAuth flow and earnings data fetching from YouTube.
 """
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any
 from decimal import Decimal
 
 from app.core.config import settings
 
+if TYPE_CHECKING:
+    from google_auth_oauthlib.flow import Flow
+
 
 class YouTubeService:
     """Service for YouTube platform integration."""
@@ -23,13 +23,17 @@ class YouTubeService:
     ]
 
     @staticmethod
-    def create_oauth_flow() -> Flow:
+    def create_oauth_flow() -> "Flow":
         """
         Create OAuth flow for YouTube authentication.
 
         Returns:
             Google OAuth Flow object
         """
+        # Google client libraries are imported on first use: they are slow
+        # to import and most processes never talk to YouTube
+        from google_auth_oauthlib.flow import Flow
+
         flow = Flow.from_client_config(
             {
                 "web": {
@@ -98,6 +102,9 @@ class YouTubeService:
         Returns:
             Channel information
         """
+        from google.oauth2.credentials import Credentials
+        from googleapiclient.discovery import build
+
         credentials = Credentials(token=access_token)
         youtube = build("youtube", "v3", credentials=credentials)
 
@@ -140,6 +147,9 @@ class YouTubeService:
         Returns:
             List of revenue data by day
         """
+        from google.oauth2.credentials import Credentials
+        from googleapiclient.discovery import build
+
         credentials = Credentials(token=access_token)
         youtube_analytics = build("youtubeAnalytics", "v2", credentials=credentials)
 
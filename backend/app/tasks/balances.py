@@ -0,0 +1,28 @@
+"""
+Account balance tasks.
+"""
+from sqlalchemy import select
+
+from app.worker import celery_app
+from app.db.base import run_with_session
+from app.models.user import User
+from app.services.balance_service import BalanceService
+
+
+async def refresh_all_checkpoints(db) -> int:
+    """Refresh balance checkpoints for every active user."""
+    result = await db.execute(select(User.id).where(User.is_active == True))
+    user_ids = result.scalars().all()
+
+    written = 0
+    for user_id in user_ids:
+        written += await BalanceService.refresh_checkpoints(db, user_id)
+    return written
+
+
+@celery_app.task
+def refresh_balance_checkpoints() -> int:
+    """
+    Write month-start balance checkpoints for completed months.
+    """
+    return run_with_session(refresh_all_checkpoints)
@@ -0,0 +1,24 @@
+"""
+Expense categorization tasks.
+"""
+from app.worker import celery_app
+from app.db.base import run_with_session
+from app.services.categorization_service import CategorizationService
+
+
+@celery_app.task
+def suggest_expense_categories() -> int:
+    """
+    Suggest categories for expenses added since the last run.
+    """
+    return run_with_session(CategorizationService.suggest_pending)
+
+
+@celery_app.task
+def retrain_expense_categorizer() -> int:
+    """
+    Train the categorizer on new expenses and user corrections.
+
+    Workers pick up the new model file on their next batch.
+    """
+    return run_with_session(CategorizationService.retrain)
@@ -0,0 +1,18 @@
+"""
+Outbound email tasks.
+"""
+from app.worker import celery_app
+from app.db.base import run_with_session
+from app.services.email_outbox_service import EmailOutboxService
+
+
+@celery_app.task
+def deliver_emails() -> int:
+    """
+    Send queued emails that are due, including retries.
+
+    Batches are leased with SKIP LOCKED, so several workers can drain
+    the outbox together. The email backend, and its connection, is kept
+    for the life of the worker process.
+    """
+    return run_with_session(EmailOutboxService.deliver_pending)
@@ -0,0 +1,17 @@
+"""
+Feature store tasks.
+"""
+from app.worker import celery_app
+from app.db.base import run_with_session
+from app.services.feature_store_service import FeatureStoreService
+
+
+@celery_app.task
+def refresh_earning_features() -> int:
+    """
+    Append yesterday's earnings features for every active creator.
+
+    Only the last 90 days of earnings are read per creator (plus any
+    late earnings), so the run stays cheap however long the history.
+    """
+    return run_with_session(FeatureStoreService.refresh)
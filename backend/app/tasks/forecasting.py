@@ -0,0 +1,26 @@
+"""
+Earnings forecasting tasks.
+"""
+from app.worker import celery_app
+from app.db.base import run_with_session
+from app.services.forecast_evaluation_service import ForecastEvaluationService
+from app.services.forecast_service import ForecastService
+
+
+@celery_app.task
+def forecast_earnings() -> int:
+    """
+    Refresh the earnings forecast of every creator that is due one.
+
+    Fits run in parallel on a process pool; creators forecast within
+    ML_MODEL_RETRAIN_INTERVAL_DAYS are skipped.
+    """
+    return run_with_session(ForecastService.run)
+
+
+@celery_app.task
+def evaluate_forecasts() -> list:
+    """
+    Record actual earnings on settled predictions and log per-model accuracy.
+    """
+    return run_with_session(ForecastEvaluationService.evaluate)
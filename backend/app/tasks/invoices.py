@@ -0,0 +1,28 @@
+"""
+Invoice tasks.
+"""
+from typing import Optional
+
+from app.worker import celery_app
+from app.db.base import run_with_session
+from app.services.invoice_pdf_service import InvoicePdfService
+from app.services.invoice_reminder_service import InvoiceReminderService
+
+
+@celery_app.task
+def render_invoice_pdf(invoice_id: int) -> Optional[str]:
+    """
+    Render an invoice PDF and record its URL on the invoice.
+
+    Each prefork worker process keeps its own compiled template and
+    font metrics between tasks.
+    """
+    return run_with_session(InvoicePdfService.render_invoice, invoice_id)
+
+
+@celery_app.task
+def sweep_overdue_invoices() -> dict:
+    """
+    Mark invoices past their due date as overdue and queue reminder digests.
+    """
+    return run_with_session(InvoiceReminderService.sweep)
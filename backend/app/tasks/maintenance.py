@@ -0,0 +1,17 @@
+"""
+Database maintenance tasks.
+"""
+from app.worker import celery_app
+from app.db.base import run_with_session
+from app.services.partition_service import PartitionService
+
+
+@celery_app.task
+def maintain_ledger_partitions() -> dict:
+    """
+    Create upcoming ledger partitions and archive expired ones.
+    """
+    created = run_with_session(PartitionService.ensure_future_partitions)
+    archived = run_with_session(PartitionService.detach_expired_partitions)
+
+    return {"ensured": created, "archived": archived}
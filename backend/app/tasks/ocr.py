@@ -0,0 +1,17 @@
+"""
+Receipt OCR tasks.
+"""
+from app.worker import celery_app
+from app.db.base import run_with_session
+from app.services.ocr_service import OcrService
+
+
+@celery_app.task
+def process_pending_receipts() -> int:
+    """
+    Run OCR on every receipt uploaded since the last run.
+
+    Pending receipts are claimed with SKIP LOCKED, so overlapping runs
+    split the queue instead of repeating work.
+    """
+    return run_with_session(OcrService.process_pending)
@@ -0,0 +1,88 @@
+"""
+Celery application for background and scheduled jobs.
+
+Run a worker with:
+    celery -A app.worker worker --loglevel=info
+and the scheduler with:
+    celery -A app.worker beat --loglevel=info
+
+Receipt OCR and forecasting run on their own queues. Their tasks fan out
+to a process pool, which prefork children (daemonic) cannot own, so use
+the solo pool:
+    celery -A app.worker worker -Q ocr,forecasting -P solo --loglevel=info
+"""
+from celery import Celery
+from celery.schedules import crontab
+
+from app.core.config import settings
+
+
+celery_app = Celery(
+    "creatorbank",
+    broker=settings.REDIS_URL,
+    backend=settings.REDIS_URL,
+    include=[
+        "app.tasks.maintenance",
+        "app.tasks.balances",
+        "app.tasks.ocr",
+        "app.tasks.categorization",
+        "app.tasks.invoices",
+        "app.tasks.email",
+        "app.tasks.forecasting",
+        "app.tasks.features",
+    ],
+)
+
+celery_app.conf.update(
+    timezone="UTC",
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    task_routes={
+        "app.tasks.ocr.*": {"queue": "ocr"},
+        "app.tasks.forecasting.*": {"queue": "forecasting"},
+    },
+)
+
+# Periodic jobs (celery beat)
+celery_app.conf.beat_schedule = {
+    "maintain-ledger-partitions": {
+        "task": "app.tasks.maintenance.maintain_ledger_partitions",
+        "schedule": crontab(hour=2, minute=0),
+    },
+    "refresh-balance-checkpoints": {
+        "task": "app.tasks.balances.refresh_balance_checkpoints",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "process-pending-receipts": {
+        "task": "app.tasks.ocr.process_pending_receipts",
+        "schedule": 60.0,
+    },
+    "refresh-earning-features": {
+        "task": "app.tasks.features.refresh_earning_features",
+        "schedule": crontab(hour=4, minute=30),
+    },
+    "forecast-earnings": {
+        "task": "app.tasks.forecasting.forecast_earnings",
+        "schedule": crontab(hour=5, minute=0),
+    },
+    "evaluate-forecasts": {
+        "task": "app.tasks.forecasting.evaluate_forecasts",
+        "schedule": crontab(hour=6, minute=0),
+    },
+    "deliver-emails": {
+        "task": "app.tasks.email.deliver_emails",
+        "schedule": 15.0,
+    },
+    "sweep-overdue-invoices": {
+        "task": "app.tasks.invoices.sweep_overdue_invoices",
+        "schedule": crontab(minute=15),
+    },
+    "suggest-expense-categories": {
+        "task": "app.tasks.categorization.suggest_expense_categories",
+        "schedule": 300.0,
+    },
+    "retrain-expense-categorizer": {
+        "task": "app.tasks.categorization.retrain_expense_categorizer",
+        "schedule": crontab(hour=4, minute=0),
+    },
+}
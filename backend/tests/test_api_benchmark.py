@@ -0,0 +1,40 @@
+"""
+Tests for the API benchmark's statistics and baseline comparison.
+"""
+import pytest
+
+from app.core.api_benchmark import compare, percentile
+
+
+def scenario(**overrides):
+    result = {"p95_ms": 50.0, "throughput_rps": 100.0, "queries_per_request": 4.0, "errors": 0}
+    result.update(overrides)
+    return {"scenarios": {"dashboard": result}}
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.95) == 95
+    assert percentile(values, 0.99) == 99
+    assert percentile([7.0], 0.99) == 7.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_compare_allows_noise_within_tolerance():
+    assert compare(scenario(p95_ms=54.0, throughput_rps=91.0), scenario(), tolerance=0.10) == []
+
+
+@pytest.mark.parametrize("overrides, metric", [
+    ({"p95_ms": 60.0}, "p95_ms"),
+    ({"throughput_rps": 80.0}, "throughput_rps"),
+    ({"queries_per_request": 5.0}, "queries_per_request"),
+    ({"errors": 1}, "errors"),
+])
+def test_compare_reports_regressions(overrides, metric):
+    regressions = compare(scenario(**overrides), scenario(), tolerance=0.10)
+    assert [(r["scenario"], r["metric"]) for r in regressions] == [("dashboard", metric)]
+
+
+def test_compare_skips_scenarios_missing_from_baseline():
+    assert compare(scenario(p95_ms=500.0), {"scenarios": {}}) == []
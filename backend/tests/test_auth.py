@@ -5,6 +5,7 @@ import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.security import create_access_token
 from app.models.user import User
 
 
@@ -150,3 +151,53 @@ async def test_unauthorized_access(client: AsyncClient):
     response = await client.get("/api/v1/auth/me")
 
     assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_refresh_token(client: AsyncClient):
+    """Test exchanging a refresh token for a working access token."""
+    await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "test@example.com",
+            "password": "password123",
+            "full_name": "Test User",
+        },
+    )
+
+    login_response = await client.post(
+        "/api/v1/auth/login",
+        data={
+            "username": "test@example.com",
+            "password": "password123",
+        },
+    )
+
+    response = await client.post(
+        "/api/v1/auth/refresh",
+        params={"refresh_token": login_response.json()["refresh_token"]},
+    )
+
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+
+    response = await client.get(
+        "/api/v1/auth/me",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["email"] == "test@example.com"
+
+
+@pytest.mark.asyncio
+async def test_non_numeric_subject(client: AsyncClient):
+    """Test that a token whose subject is not a user id is rejected."""
+    token = create_access_token(data={"sub": "not-a-user-id"})
+
+    response = await client.get(
+        "/api/v1/auth/me",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == 401
@@ -0,0 +1,36 @@
+"""
+Tests for the expense categorization model.
+"""
+import numpy as np
+
+from app.models.expense import ExpenseCategory
+from app.services.categorization_service import ExpenseCategorizer
+
+
+def test_seed_model_predicts_known_vendors():
+    """Test that the cold-start model handles common creator vendors."""
+    categorizer = ExpenseCategorizer.bootstrap()
+
+    predictions = categorizer.predict([
+        ExpenseCategorizer.text("ADOBE *CREATIVE CLD", None),
+        ExpenseCategorizer.text("UBER *TRIP", "ride to airport"),
+    ])
+
+    assert [category for category, _ in predictions] == [ExpenseCategory.SOFTWARE, ExpenseCategory.TRAVEL]
+    assert all(0 < probability <= 1 for _, probability in predictions)
+
+
+def test_saved_model_is_memory_mapped(tmp_path):
+    """Test that a saved model loads with file-backed weights and learns corrections."""
+    path = str(tmp_path / "categorizer.joblib")
+    text = ExpenseCategorizer.text("Zyx Studios", "monthly retainer")
+
+    categorizer = ExpenseCategorizer.bootstrap()
+    for _ in range(10):
+        categorizer.partial_fit([text], [ExpenseCategory.TEAM.value], [5.0])
+    categorizer.save(path)
+
+    loaded = ExpenseCategorizer.load(path)
+
+    assert isinstance(loaded.classifier.coef_, np.memmap)
+    assert loaded.predict([text])[0][0] == ExpenseCategory.TEAM
@@ -0,0 +1,49 @@
+"""
+Tests for deductible expense rollups.
+"""
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.expense import Expense, ExpenseCategory
+from app.models.user import User
+from app.services.deduction_service import DeductionService
+
+
+@pytest.mark.asyncio
+async def test_deductions_report_applies_category_caps(db_session: AsyncSession):
+    """Test meals are capped at 50% and non-deductible expenses count for nothing."""
+    user = User(email="creator@example.com", hashed_password="x")
+    db_session.add(user)
+    await db_session.flush()
+
+    db_session.add_all([
+        Expense(user_id=user.id, amount=Decimal("100"), category=ExpenseCategory.MEALS,
+                expense_date=datetime(2025, 2, 3), vendor="Chipotle", deduction_percentage=100),
+        Expense(user_id=user.id, amount=Decimal("200"), category=ExpenseCategory.SOFTWARE,
+                expense_date=datetime(2025, 2, 10), vendor="Adobe"),
+        Expense(user_id=user.id, amount=Decimal("50"), category=ExpenseCategory.OFFICE,
+                expense_date=datetime(2025, 5, 1), vendor="Adobe", deduction_percentage=40),
+        Expense(user_id=user.id, amount=Decimal("70"), category=ExpenseCategory.OTHER,
+                expense_date=datetime(2025, 5, 1), is_deductible=False),
+        Expense(user_id=user.id, amount=Decimal("999"), category=ExpenseCategory.OTHER,
+                expense_date=datetime(2024, 12, 31)),
+    ])
+    await db_session.commit()
+
+    report = await DeductionService.build_report(db_session, user.id, 2025)
+
+    assert report["expense_count"] == 4
+    assert report["total_deductible"] == 270.0
+    assert {row["category"]: row["deductible_amount"] for row in report["by_category"]}["meals"] == 50.0
+    assert [(row["month"], row["deductible_amount"]) for row in report["by_month"]] == [(2, 250.0), (5, 20.0)]
+    assert report["by_vendor"][0] == {
+        "vendor": "Adobe", "expense_count": 2, "total_amount": 250.0, "deductible_amount": 220.0,
+    }
+
+    quarter_total = await DeductionService.deductible_total(
+        db_session, user.id, datetime(2025, 1, 1), datetime(2025, 4, 1),
+    )
+    assert quarter_total == Decimal("250")
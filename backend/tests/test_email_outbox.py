@@ -0,0 +1,99 @@
+"""
+Tests for outbound email delivery.
+"""
+import socketserver
+import threading
+from datetime import timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.services.email_outbox_service import EmailOutboxService
+from app.services.email_service import EmailMessage, SmtpEmailBackend
+
+
+class SmtpSink(socketserver.ThreadingTCPServer):
+    """Minimal local SMTP server that accepts and records every message."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SmtpSinkHandler)
+        self.connections = 0
+        self.messages = []
+        # Hang up after this many messages and refuse later connections
+        self.drop_after = None
+
+
+class SmtpSinkHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str) -> None:
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self.server.connections += 1
+        if self.server.drop_after is not None and len(self.server.messages) >= self.server.drop_after:
+            return
+        self.reply("220 sink")
+        while True:
+            line = self.rfile.readline().decode().strip()
+            command = line.split(" ", 1)[0].upper()
+            if not line or command == "QUIT":
+                self.reply("221 bye")
+                return
+            if command == "DATA":
+                self.reply("354 go ahead")
+                data = []
+                for raw in iter(self.rfile.readline, b""):
+                    if raw == b".\r\n":
+                        break
+                    data.append(raw.decode())
+                self.server.messages.append("".join(data))
+            self.reply("250 ok")
+            if command == "DATA" and len(self.server.messages) == self.server.drop_after:
+                return
+
+
+@pytest.fixture
+def smtp_sink():
+    server = SmtpSink()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_smtp_backend_reuses_connection(smtp_sink):
+    """Test that batches share one SMTP connection."""
+    backend = SmtpEmailBackend("127.0.0.1", smtp_sink.server_address[1], use_tls=False)
+    messages = [EmailMessage(to=f"user{i}@example.com", subject=f"Hello {i}", body="Hi") for i in range(3)]
+
+    assert backend.send_many(messages[:2]) == [True, True]
+    assert backend.send_many(messages[2:]) == [True]
+    backend.close()
+
+    assert smtp_sink.connections == 1
+    assert len(smtp_sink.messages) == 3
+    assert "Subject: Hello 2" in smtp_sink.messages[2]
+
+
+def test_smtp_reconnect_failure_keeps_sent_results(smtp_sink):
+    """Test that a failed reconnect only fails the messages not yet sent."""
+    smtp_sink.drop_after = 1
+    backend = SmtpEmailBackend("127.0.0.1", smtp_sink.server_address[1], use_tls=False)
+    messages = [EmailMessage(to=f"user{i}@example.com", subject=f"Hello {i}", body="Hi") for i in range(3)]
+
+    assert backend.send_many(messages) == [True, False, False]
+    backend.close()
+
+    assert len(smtp_sink.messages) == 1
+
+
+def test_retry_delay_backs_off_exponentially():
+    """Test retries double from the base delay up to the cap."""
+    base = timedelta(seconds=settings.EMAIL_RETRY_BASE_SECONDS)
+
+    assert EmailOutboxService.retry_delay(1) == base
+    assert EmailOutboxService.retry_delay(3) == base * 4
+    assert EmailOutboxService.retry_delay(50) == timedelta(seconds=EmailOutboxService.MAX_RETRY_DELAY_SECONDS)
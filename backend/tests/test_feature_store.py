@@ -0,0 +1,31 @@
+"""
+Tests for earnings feature computation.
+"""
+import numpy as np
+
+from app.services.feature_store_service import compute_features
+
+
+def test_rolling_features():
+    """Test rolling means, activity and volatility over a known series."""
+    daily = np.zeros((1, 120))
+    daily[0, 60:] = 10.0  # Earning 10/day for the last 60 days
+
+    features = compute_features(daily, {"youtube": daily * 0.25, "patreon": daily * 0.75})
+
+    assert features["mean_7d"][0, -1] == 10.0
+    assert features["mean_30d"][0, -1] == 10.0
+    assert np.isclose(features["mean_90d"][0, -1], 600 / 90)
+    assert features["active_days_30d"][0, -1] == 30
+    assert np.isclose(features["volatility_30d"][0, -1], 0.0)
+    assert np.isclose(features["platform_mix"]["patreon"][0, -1], 0.75)
+
+
+def test_weekday_factor_finds_busy_weekday():
+    """Test a weekday that earns more than the others stands out."""
+    daily = np.tile([1.0, 1, 1, 1, 1, 1, 8], (1, 20))
+
+    factor = compute_features(daily, {})["weekday_factor"][0]
+
+    assert 3.5 < factor[-1] < 4.5  # ~8 against a 90-day mean of ~2
+    assert 0.4 < factor[-2] < 0.6
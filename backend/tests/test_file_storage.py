@@ -0,0 +1,165 @@
+"""
+Tests for content-addressed file storage.
+"""
+import hashlib
+import os
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.models.expense import Expense, ExpenseCategory
+from app.models.user import User
+from app.services.file_storage import LocalFileStorage, FileTooLargeError, get_storage
+from app.services.receipt_service import MultipartFileReader, ReceiptService, ReceiptUploadError
+
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+@pytest.mark.asyncio
+async def test_identical_content_is_stored_once(tmp_path):
+    """Test that re-uploading the same bytes reuses the stored file."""
+    storage = LocalFileStorage(str(tmp_path))
+
+    first = await storage.save_stream("receipts", chunks(b"invoice ", b"#42"))
+    second = await storage.save_stream("receipts", chunks(b"invoice #42"))
+
+    assert first.created is True
+    assert second.created is False
+    assert first.key == second.key
+    assert first.sha256 == hashlib.sha256(b"invoice #42").hexdigest()
+    assert open(storage.local_path(first.key), "rb").read() == b"invoice #42"
+    assert storage.key_from_url(storage.url(first.key)) == first.key
+
+
+@pytest.mark.asyncio
+async def test_oversized_stream_is_rejected(tmp_path):
+    """Test that uploads over the limit are aborted and cleaned up."""
+    storage = LocalFileStorage(str(tmp_path))
+
+    with pytest.raises(FileTooLargeError):
+        await storage.save_stream("receipts", chunks(b"x" * 10, b"x" * 10), max_size=15)
+
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+def test_keys_cannot_escape_root(tmp_path):
+    """Test that storage keys are confined to the storage root."""
+    storage = LocalFileStorage(str(tmp_path))
+
+    with pytest.raises(ValueError):
+        storage.local_path("../etc/passwd")
+
+
+@pytest.mark.asyncio
+async def test_multipart_file_is_streamed_from_body(tmp_path):
+    """Test that the file field is read from a multipart body split across chunks."""
+    body = (
+        b"--XyZ\r\n"
+        b'Content-Disposition: form-data; name="note"\r\n\r\n'
+        b"lunch\r\n"
+        b"--XyZ\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="receipt.jpg"\r\n'
+        b"Content-Type: image/jpeg\r\n\r\n"
+        b"\xff\xd8 receipt bytes \xff\xd9\r\n"
+        b"--XyZ--\r\n"
+    )
+    reader = MultipartFileReader("multipart/form-data; boundary=XyZ", "file")
+
+    pieces = [body[i:i + 7] for i in range(0, len(body), 7)]
+
+    data = b"".join([chunk async for chunk in reader.chunks(chunks(*pieces))])
+
+    assert data == b"\xff\xd8 receipt bytes \xff\xd9"
+    assert reader.filename == "receipt.jpg"
+
+
+@pytest.mark.asyncio
+async def test_multipart_without_file_is_rejected():
+    """Test that a form without the file field is an upload error."""
+    reader = MultipartFileReader("multipart/form-data; boundary=XyZ", "file")
+    body = b'--XyZ\r\nContent-Disposition: form-data; name="note"\r\n\r\nlunch\r\n--XyZ--\r\n'
+
+    with pytest.raises(ReceiptUploadError):
+        [chunk async for chunk in reader.chunks(chunks(body))]
+
+    with pytest.raises(ReceiptUploadError):
+        MultipartFileReader("application/json", "file")
+
+
+@pytest.mark.asyncio
+async def test_corrupt_image_has_no_thumbnail(tmp_path):
+    """Test that an unreadable .jpg gets no thumbnail instead of an error."""
+    storage = LocalFileStorage(str(tmp_path))
+    stored = await storage.save_stream("receipts", chunks(b"not really a jpeg"))
+
+    assert await ReceiptService.thumbnail_path(stored.key, "receipt.jpg", storage=storage) is None
+
+
+@pytest.fixture
+async def receipt_expense(db_session, tmp_path, monkeypatch):
+    """An expense with auth headers for its owner, and storage under tmp_path."""
+    monkeypatch.setattr(settings, "STORAGE_LOCAL_ROOT", str(tmp_path))
+    get_storage.cache_clear()
+
+    user = User(email="creator@example.com", hashed_password="x")
+    db_session.add(user)
+    await db_session.flush()
+    expense = Expense(
+        user_id=user.id, amount=Decimal("12.50"), expense_date=datetime(2026, 3, 1),
+        category=ExpenseCategory.MEALS, vendor="Cafe",
+    )
+    db_session.add(expense)
+    await db_session.commit()
+
+    yield expense, {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
+    get_storage.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_upload_holds_no_transaction_while_streaming(client, db_session, receipt_expense):
+    """Test that the session's connection is released while the body streams in."""
+    expense, headers = receipt_expense
+    in_transaction = []
+
+    async def body():
+        for piece in (
+            b"--XyZ\r\n",
+            b'Content-Disposition: form-data; name="file"; filename="receipt.txt"\r\n\r\n',
+            b"coffee 12.50\r\n",
+            b"--XyZ--\r\n",
+        ):
+            in_transaction.append(db_session.in_transaction())
+            yield piece
+
+    response = await client.post(
+        f"/api/v1/expenses/{expense.id}/receipt",
+        content=body(),
+        headers={**headers, "Content-Type": "multipart/form-data; boundary=XyZ"},
+    )
+
+    assert response.status_code == 200
+    assert in_transaction and not any(in_transaction)
+
+    response = await client.get(f"/api/v1/expenses/{expense.id}/receipt", headers=headers)
+    assert response.content == b"coffee 12.50"
+
+
+@pytest.mark.asyncio
+async def test_missing_receipt_file_is_not_found(client, receipt_expense):
+    """Test that a receipt URL whose file is gone gives 404s, not 500s."""
+    expense, headers = receipt_expense
+    files = {"file": ("receipt.jpg", b"\xff\xd8 receipt bytes \xff\xd9", "image/jpeg")}
+    response = await client.post(f"/api/v1/expenses/{expense.id}/receipt", files=files, headers=headers)
+    os.remove(get_storage().local_path(get_storage().key_from_url(response.json()["receipt_url"])))
+
+    response = await client.get(f"/api/v1/expenses/{expense.id}/receipt", headers=headers)
+    assert response.status_code == 404
+
+    response = await client.get(f"/api/v1/expenses/{expense.id}/receipt/thumbnail", headers=headers)
+    assert response.status_code == 404
@@ -0,0 +1,40 @@
+"""
+Tests for earnings forecasting.
+"""
+import numpy as np
+
+from app.services.forecast_service import ForecastService, forecast_holt_winters
+
+
+def test_holt_winters_learns_weekly_pattern():
+    """Test a clean weekly pattern is carried into the forecast."""
+    week = np.array([10.0, 20, 30, 40, 50, 60, 70])
+    series = np.tile(week, (1, 12))
+
+    predicted, lower, upper = forecast_holt_winters(series, np.array([0]), 14)
+
+    assert predicted.shape == (1, 14)
+    assert np.allclose(predicted[0], np.tile(week, 2), atol=1.0)
+    assert np.all(lower <= predicted) and np.all(predicted <= upper)
+
+
+def test_holt_winters_batches_ragged_histories():
+    """Test creators with different history lengths forecast together."""
+    series = np.zeros((3, 60))
+    series[0, :] = 100.0
+    series[1, 50:] = 5.0  # 10 days of history
+    series[2, 57:] = 8.0  # 3 days of history
+    starts = np.array([0, 50, 57])
+
+    predicted, lower, _ = forecast_holt_winters(series, starts, 7)
+
+    assert np.allclose(predicted[0], 100.0, atol=0.5)
+    assert np.allclose(predicted[1], 5.0, atol=0.5)
+    assert np.allclose(predicted[2], 8.0)
+    assert np.all(lower >= 0)
+
+
+def test_short_histories_skip_prophet():
+    """Test creators with little history are not sent to Prophet."""
+    assert ForecastService.choose_model(np.zeros(30)) == "holt_winters"
+    assert ForecastService.choose_model(np.zeros(365)) == "prophet"
@@ -0,0 +1,58 @@
+"""
+Tests for forecast actuals backfill and accuracy.
+"""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.platform import ConnectedPlatform, Earning, PlatformType
+from app.models.prediction import Prediction
+from app.models.user import User
+from app.services.forecast_evaluation_service import ForecastEvaluationService
+
+
+@pytest.mark.asyncio
+async def test_backfill_fills_settled_days_only(db_session: AsyncSession):
+    """Test actuals are summed per day, zero-filled, and recent days left alone."""
+    user = User(email="creator@example.com", hashed_password="x")
+    db_session.add(user)
+    await db_session.flush()
+    platform = ConnectedPlatform(user_id=user.id, platform_type=PlatformType.YOUTUBE, access_token="x")
+    db_session.add(platform)
+    await db_session.flush()
+
+    db_session.add_all([
+        Earning(user_id=user.id, platform_id=platform.id, amount=Decimal("10"), earning_date=datetime(2026, 3, 1, 9)),
+        Earning(user_id=user.id, platform_id=platform.id, amount=Decimal("5"), earning_date=datetime(2026, 3, 1, 18)),
+    ])
+    for day in (datetime(2026, 3, 1), datetime(2026, 3, 2), datetime(2026, 3, 28)):
+        db_session.add(Prediction(
+            user_id=user.id, prediction_date=day - timedelta(days=7), forecast_date=day,
+            predicted_amount=Decimal("12"), confidence_interval_lower=Decimal("0"),
+            confidence_interval_upper=Decimal("20"), model_type="holt_winters", model_version="1",
+        ))
+    await db_session.commit()
+
+    filled = await ForecastEvaluationService.backfill_actuals(db_session, date(2026, 3, 30))
+
+    result = await db_session.execute(
+        select(Prediction.forecast_date, Prediction.actual_amount, Prediction.prediction_error)
+        .order_by(Prediction.forecast_date)
+    )
+    assert filled == 2
+    assert [(row[1], row[2]) for row in result] == [
+        (Decimal("15.00"), Decimal("3.00")),
+        (Decimal("0.00"), Decimal("-12.00")),
+        (None, None),
+    ]
+
+    report = await ForecastEvaluationService.accuracy_report(
+        db_session, datetime(2026, 3, 1), datetime(2026, 4, 1),
+    )
+    assert report == [{
+        "model_type": "holt_winters", "model_version": "1", "predictions": 2,
+        "mape": 0.2, "wape": 1.0, "bias": -4.5, "interval_coverage": 1.0,
+    }]
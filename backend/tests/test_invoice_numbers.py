@@ -0,0 +1,62 @@
+"""
+Tests for invoice number formats.
+"""
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.invoice import Invoice
+from app.models.user import User
+from app.services import invoice_number_service
+from app.services.invoice_number_service import InvoiceNumberService, InvoiceNumberFormatError
+
+
+def test_format_number_fields():
+    """Test {seq}, {year} and {month} are filled in."""
+    when = datetime(2026, 3, 1)
+
+    assert InvoiceNumberService.format_number("INV-{year}-{month:02d}-{seq:04d}", 42, when) == "INV-2026-03-0042"
+
+
+@pytest.mark.parametrize("number_format", [
+    "INV-0001",  # no {seq}
+    "{seq.__class__}",  # attribute access
+    "{client}-{seq}",  # unknown field
+    "INV-{seq",  # malformed
+    "X" * 45 + "{seq}",  # too long once seq grows
+])
+def test_invalid_formats_are_rejected(number_format):
+    """Test formats that can't produce safe, distinct numbers are refused."""
+    with pytest.raises(InvoiceNumberFormatError):
+        InvoiceNumberService.validate_format(number_format)
+
+
+def test_parse_seq_reads_numbers_back():
+    """Test {seq} is read back from numbers in the format, and others are skipped."""
+    assert InvoiceNumberService.parse_seq("INV-{year}-{seq:04d}", "INV-2026-0042") == 42
+    assert InvoiceNumberService.parse_seq("INV-{year}-{seq:04d}", "ACME-7") is None
+    assert InvoiceNumberService.parse_seq("{seq}.{seq}", "3.4") is None
+
+
+@pytest.mark.asyncio
+async def test_sequences_start_after_existing_invoices(db_session: AsyncSession, monkeypatch):
+    """Test a user's first allocation skips the numbers their invoices already use."""
+    monkeypatch.setattr(invoice_number_service, "_blocks", {})
+    user = User(email="creator@example.com", hashed_password="x")
+    db_session.add(user)
+    await db_session.flush()
+    db_session.add_all([
+        Invoice(
+            user_id=user.id, invoice_number=number, amount=Decimal("100"), client_name="Acme",
+            description="Sponsored video", invoice_date=datetime(2026, 3, 1), due_date=datetime(2026, 3, 31),
+        )
+        for number in ("INV-00001", "INV-00007", "ACME-40")
+    ])
+    await db_session.commit()
+
+    assert await InvoiceNumberService.allocate(db_session, user.id, [None, None]) == ["INV-00008", "INV-00009"]
+
+    await InvoiceNumberService.set_format(db_session, user.id, "ACME-{seq}")
+    assert await InvoiceNumberService.allocate(db_session, user.id, [None]) == ["ACME-41"]
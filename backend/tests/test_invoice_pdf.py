@@ -0,0 +1,57 @@
+"""
+Tests for invoice PDF rendering.
+"""
+from datetime import datetime
+from decimal import Decimal
+
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.user import User
+from app.services.invoice_pdf_service import InvoicePdfService, wrap_text
+
+
+def make_invoice(**overrides):
+    fields = dict(
+        invoice_number="INV-0001",
+        status=InvoiceStatus.SENT,
+        amount=Decimal("1500.00"),
+        currency="USD",
+        client_name="Acme Brands",
+        description="Sponsored integration",
+        invoice_date=datetime(2026, 10, 1),
+        due_date=datetime(2026, 10, 31),
+    )
+    fields.update(overrides)
+    return Invoice(**fields)
+
+
+def test_render_produces_pdf():
+    """Test the rendered document is a complete one-page PDF."""
+    user = User(email="creator@example.com", full_name="Creator")
+    pdf = InvoicePdfService.render(InvoicePdfService.render_context(make_invoice(), user))
+
+    assert pdf.startswith(b"%PDF-1.4")
+    assert pdf.rstrip().endswith(b"%%EOF")
+    assert b"(Invoice INV-0001) Tj" in pdf
+    assert b"(USD 1,500.00) Tj" in pdf
+
+
+def test_content_hash_tracks_visible_changes():
+    """Test only changes that show on the page change the hash."""
+    user = User(email="creator@example.com", full_name="Creator")
+
+    def content_hash(invoice):
+        return InvoicePdfService.content_hash(InvoicePdfService.render_context(invoice, user))
+
+    original = content_hash(make_invoice())
+
+    assert content_hash(make_invoice(reminder_sent_count=3)) == original
+    assert content_hash(make_invoice(amount=Decimal("1600.00"))) != original
+    assert content_hash(make_invoice(status=InvoiceStatus.PAID)) != original
+
+
+def test_wrap_text_truncates():
+    """Test long text is wrapped to the width and cut at max_lines."""
+    lines = wrap_text("word " * 200, 10, 100, 3)
+
+    assert len(lines) == 3
+    assert lines[-1].endswith("...")
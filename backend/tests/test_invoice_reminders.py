@@ -0,0 +1,37 @@
+"""
+Tests for overdue invoice reminders.
+"""
+from datetime import datetime
+from decimal import Decimal
+
+from app.models.invoice import Invoice
+from app.models.user import User
+from app.services.email_service import EmailMessage, LocalEmailBackend
+from app.services.invoice_reminder_service import InvoiceReminderService
+
+
+def test_reminder_digest_lists_all_invoices():
+    """Test a creator gets one email covering every overdue invoice."""
+    user = User(email="creator@example.com", full_name="Sam")
+    invoices = [
+        Invoice(invoice_number="INV-00001", client_name="Acme", amount=Decimal("1200"),
+                currency="USD", due_date=datetime(2026, 3, 1)),
+        Invoice(invoice_number="INV-00002", client_name="Globex", amount=Decimal("300.50"),
+                currency="USD", due_date=datetime(2026, 3, 11)),
+    ]
+
+    message = InvoiceReminderService.reminder_digest(user, invoices, datetime(2026, 3, 21))
+
+    assert message.to == "creator@example.com"
+    assert message.subject == "2 overdue invoices (USD 1,500.50)"
+    assert "INV-00001: Acme, USD 1,200.00, 20 days overdue" in message.body
+    assert "INV-00002: Globex, USD 300.50, 10 days overdue" in message.body
+
+
+def test_local_backend_accepts_batches():
+    """Test the local backend records every message in a batch."""
+    backend = LocalEmailBackend()
+    messages = [EmailMessage(to=f"user{i}@example.com", subject="Hi", body="...") for i in range(3)]
+
+    assert backend.send_many(messages) == [True, True, True]
+    assert backend.sent == messages
@@ -0,0 +1,66 @@
+"""
+Tests for the Prometheus metrics endpoint.
+"""
+import re
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.metrics import Histogram, Registry
+
+
+def sample(text: str, line_prefix: str) -> float:
+    """Value of the sample whose line starts with line_prefix, 0 if absent."""
+    match = re.search(rf"^{re.escape(line_prefix)} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_histogram_text_format():
+    """Test that histograms render cumulative buckets, sum and count."""
+    registry = Registry()
+    latency = registry.register(Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1)))
+    latency.observe(0.05, route="/a")
+    latency.observe(0.5, route="/a")
+    latency.observe(3, route='/b"')
+
+    assert registry.render() == (
+        "# HELP latency_seconds Latency.\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{route="/a",le="0.1"} 1\n'
+        'latency_seconds_bucket{route="/a",le="1"} 2\n'
+        'latency_seconds_bucket{route="/a",le="+Inf"} 2\n'
+        'latency_seconds_sum{route="/a"} 0.55\n'
+        'latency_seconds_count{route="/a"} 2\n'
+        'latency_seconds_bucket{route="/b\\"",le="0.1"} 0\n'
+        'latency_seconds_bucket{route="/b\\"",le="1"} 0\n'
+        'latency_seconds_bucket{route="/b\\"",le="+Inf"} 1\n'
+        'latency_seconds_sum{route="/b\\""} 3\n'
+        'latency_seconds_count{route="/b\\""} 1\n'
+    )
+
+
+@pytest.mark.asyncio
+async def test_requests_counted_by_route_with_queries(client: AsyncClient):
+    """Test that a request is counted under its route with the SQL it ran."""
+    route = 'method="POST",route="/api/v1/auth/register"'
+    before = (await client.get("/metrics")).text
+
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={"email": "metrics@example.com", "password": "securepassword123", "full_name": "M"},
+    )
+    assert response.status_code == 201
+
+    metrics = await client.get("/metrics")
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    after = metrics.text
+
+    def delta(line_prefix: str) -> float:
+        return sample(after, line_prefix) - sample(before, line_prefix)
+
+    assert delta(f'http_requests_total{{{route},status="201"}}') == 1
+    assert delta(f"http_request_duration_seconds_count{{{route}}}") == 1
+    assert delta(f"http_request_db_queries_count{{{route}}}") == 1
+    assert delta(f"http_request_db_queries_sum{{{route}}}") >= 2  # Duplicate check, insert
+    assert delta(f"http_request_db_query_seconds_sum{{{route}}}") > 0
+    assert sample(after, "db_pool_size") > 0
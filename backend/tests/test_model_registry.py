@@ -0,0 +1,82 @@
+"""
+Tests for the on-disk model registry.
+"""
+import time
+
+import numpy as np
+
+from app.models.expense import ExpenseCategory
+from app.services.categorization_service import ExpenseCategorizer, get_categorizer
+from app.services.model_registry import ModelRegistry, _load
+
+
+def test_models_load_lazily_and_hot_swap(tmp_path):
+    """Test that models are mapped on first use, bounded, and swapped on publish."""
+    registry = ModelRegistry(str(tmp_path), max_loaded=2)
+    for segment in ("a", "b", "c"):
+        registry.publish("holt_winters", {"weights": np.full(1000, 1.0)}, key=segment, version="1")
+    assert registry.loaded() == []
+
+    model = registry.get("holt_winters", key="a")
+    assert isinstance(model["weights"], np.memmap)
+    registry.get("holt_winters", key="b")
+    registry.get("holt_winters", key="a")
+    registry.get("holt_winters", key="c")
+    assert registry.loaded() == [("holt_winters", "a", "1"), ("holt_winters", "c", "1")]
+
+    registry.publish("holt_winters", {"weights": np.full(1000, 2.0)}, key="a", version="2")
+    assert registry.get("holt_winters", key="a")["weights"][0] == 2.0
+    assert registry.get("holt_winters", key="a", version="1")["weights"][0] == 1.0
+    assert ("holt_winters", "c", "1") not in registry.loaded()
+
+    registry.activate("holt_winters", "1", key="a")
+    assert registry.get("holt_winters", key="a")["weights"][0] == 1.0
+    assert registry.get("prophet") is None
+
+
+def test_categorizer_served_from_registry(tmp_path):
+    """Test that a published categorizer replaces the seed model."""
+    registry = ModelRegistry(str(tmp_path), max_loaded=4)
+    text = ExpenseCategorizer.text("Zyx Studios", "monthly retainer")
+    assert not isinstance(get_categorizer(registry).classifier.coef_, np.memmap)
+
+    categorizer = ExpenseCategorizer.bootstrap()
+    for _ in range(10):
+        categorizer.partial_fit([text], [ExpenseCategory.TEAM.value], [5.0])
+    registry.publish(ExpenseCategorizer.MODEL_TYPE, categorizer, dump=ExpenseCategorizer.save)
+
+    served = get_categorizer(registry)
+    assert isinstance(served.classifier.coef_, np.memmap)
+    assert served.predict([text])[0][0] == ExpenseCategory.TEAM
+
+
+def test_versions_are_pruned_oldest_first(tmp_path):
+    """Test that pruning goes by publish order, not by version name."""
+    registry = ModelRegistry(str(tmp_path), max_loaded=4, keep_versions=2)
+    for version in ("v8", "v9", "v10"):
+        registry.publish("holt_winters", {"version": version}, version=version)
+        time.sleep(0.02)  # Distinct mtimes on coarse filesystem clocks
+
+    assert registry.versions("holt_winters") == ["v9", "v10"]
+    assert registry.current_version("holt_winters") == "v10"
+
+
+def test_get_rereads_current_when_live_version_was_pruned(tmp_path):
+    """Test that a live version deleted under a reader is retried once."""
+    registry = ModelRegistry(str(tmp_path), max_loaded=4, keep_versions=1)
+    registry.publish("holt_winters", {"version": 1}, version="1")
+    assert registry.current_version("holt_winters") == "1"
+
+    loads = []
+
+    def load(path):
+        loads.append(path)
+        if len(loads) == 1:
+            # Another process publishes and prunes version 1 right now
+            ModelRegistry(str(tmp_path), max_loaded=4, keep_versions=1).publish(
+                "holt_winters", {"version": 2}, version="2",
+            )
+        return _load(path)
+
+    assert registry.get("holt_winters", load=load) == {"version": 2}
+    assert len(loads) == 2
@@ -0,0 +1,26 @@
+"""
+Tests for ledger partition helpers.
+"""
+from datetime import date
+
+from app.services.partition_service import PartitionService
+
+
+def test_add_months_rolls_over_year():
+    """Test month arithmetic across year boundaries."""
+    assert PartitionService.add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert PartitionService.add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+    assert PartitionService.add_months(date(2024, 1, 1), -84) == date(2017, 1, 1)
+
+
+def test_partition_name_round_trip():
+    """Test partition names encode and decode their month."""
+    name = PartitionService.partition_name("earnings", date(2024, 3, 1))
+
+    assert name == "earnings_y2024m03"
+    assert PartitionService.parse_partition_month(name) == date(2024, 3, 1)
+
+
+def test_parse_partition_month_ignores_foreign_tables():
+    """Test that non-monthly partitions are never picked for archiving."""
+    assert PartitionService.parse_partition_month("earnings_default") is None
@@ -0,0 +1,64 @@
+"""
+Tests for on-demand request profiling.
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.core.profiler import PROFILES_PATH, WAITING, ProfilerMiddleware, SamplingProfiler
+from app.services.file_storage import get_storage
+
+
+def busy(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_samples_attributed_to_profiled_task():
+    """Test that CPU work in the task is sampled and other tasks count as waiting."""
+    async def other_request():
+        busy(0.05)
+
+    profiler = SamplingProfiler("GET /slow", interval=0.002)
+    profiler.start()
+    busy(0.1)
+    await asyncio.create_task(other_request())
+    profiler.stop()
+
+    folded = profiler.folded().splitlines()
+    ours = sum(int(line.rsplit(" ", 1)[1]) for line in folded if "busy (tests/test_profiler.py" in line)
+    waiting = profiler.stacks[("GET /slow", WAITING)]
+
+    assert all(line.startswith("GET /slow;") for line in folded)
+    assert ours > waiting > 0
+
+
+@pytest.mark.asyncio
+async def test_failed_save_keeps_request_error(monkeypatch, tmp_path):
+    """Test that the request's own exception survives a failing profile save."""
+    blocked = tmp_path / "not-a-directory"
+    blocked.write_text("")
+    monkeypatch.setattr(settings, "PROFILER_TOKEN", "secret")
+    monkeypatch.setattr(settings, "STORAGE_LOCAL_ROOT", str(blocked))
+    get_storage.cache_clear()
+    paths = []
+
+    async def app(scope, receive, send):
+        paths.append(scope["path"])
+        raise ValueError("handler failed")
+
+    middleware = ProfilerMiddleware(app)
+    try:
+        for path in ("/api/v1/earnings/", f"{PROFILES_PATH}/abc"):
+            scope = {"type": "http", "method": "GET", "path": path, "headers": [(b"x-profile-token", b"secret")]}
+            with pytest.raises(ValueError, match="handler failed"):
+                await middleware(scope, None, None)
+    finally:
+        get_storage.cache_clear()
+
+    assert paths == ["/api/v1/earnings/", f"{PROFILES_PATH}/abc"]
+    assert not middleware._requested({"path": f"{PROFILES_PATH}/abc", "headers": [(b"x-profile-token", b"secret")]})
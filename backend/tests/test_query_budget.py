@@ -0,0 +1,67 @@
+"""
+Tests for SQL recording and per-endpoint query budgets.
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.query_log import assert_max_queries, record_queries
+from app.core.security import create_access_token
+from app.models.platform import ConnectedPlatform, Earning, PlatformType
+from app.models.user import User
+
+
+def test_repeated_statements_reported_with_call_site():
+    """Test that a statement run once per row is flagged with where it ran."""
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn, record_queries(capture_sites=True) as recorder:
+        conn.execute(text("SELECT 1"))
+        for value in range(3):
+            conn.execute(text("SELECT :value"), {"value": value})
+
+    assert len(recorder) == 4
+    [(statement, count, sites)] = recorder.duplicates()
+    assert (statement, count) == ("SELECT ?", 3)
+    assert len(sites) == 1
+    assert sites[0].startswith("tests/test_query_budget.py:")
+    assert sites[0].endswith(" in test_repeated_statements_reported_with_call_site")
+
+    with pytest.raises(AssertionError, match="at most 3 queries, ran 4"):
+        with engine.connect() as conn, assert_max_queries(3):
+            for value in range(4):
+                conn.execute(text("SELECT :value"), {"value": value})
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("platforms", [1, len(PlatformType)])
+async def test_earnings_summary_query_budget(client: AsyncClient, db_session: AsyncSession, platforms: int):
+    """Test the summary endpoint's queries don't grow with platforms and earnings."""
+    user = User(email="budget@example.com", hashed_password="x")
+    db_session.add(user)
+    await db_session.flush()
+    connected = [
+        ConnectedPlatform(user_id=user.id, platform_type=platform_type, access_token="x")
+        for platform_type in list(PlatformType)[:platforms]
+    ]
+    db_session.add_all(connected)
+    await db_session.flush()
+    now = datetime.utcnow()
+    db_session.add_all([
+        Earning(user_id=user.id, platform_id=platform.id, amount=Decimal("10"), earning_date=now - timedelta(days=days))
+        for platform in connected
+        for days in (0, 20, 40, 400)
+    ])
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
+
+    # Current user, totals, totals per platform, forecast
+    with assert_max_queries(4):
+        response = await client.get("/api/v1/earnings/summary", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["total_all_time"] == 40 * platforms
+    assert len(response.json()["by_platform"]) == platforms
@@ -0,0 +1,57 @@
+"""
+Tests for transaction reconciliation matching.
+"""
+from datetime import datetime
+from decimal import Decimal
+
+from app.models.expense import Expense, ExpenseCategory
+from app.models.platform import Earning
+from app.models.transaction import Transaction, TransactionType
+from app.services.reconciliation_service import ReconciliationService
+
+
+def make_transaction(id, amount, day, transaction_type, merchant=None):
+    return Transaction(
+        id=id,
+        amount=Decimal(amount),
+        currency="USD",
+        transaction_type=transaction_type,
+        transaction_date=datetime(2024, 3, day),
+        merchant=merchant,
+    )
+
+
+def test_deposits_match_nearest_payout():
+    """Test each deposit is paired with the closest matching payout once."""
+    earnings = [
+        Earning(id=1, amount=Decimal("500.00"), currency="USD", payout_date=datetime(2024, 3, 1)),
+        Earning(id=2, amount=Decimal("500.00"), currency="USD", payout_date=datetime(2024, 3, 14)),
+        Earning(id=3, amount=Decimal("75.00"), currency="EUR", payout_date=datetime(2024, 3, 14)),
+    ]
+    deposits = [
+        make_transaction(10, "500.00", 3, TransactionType.DEPOSIT),
+        make_transaction(11, "500.00", 15, TransactionType.DEPOSIT),
+        make_transaction(12, "75.00", 15, TransactionType.DEPOSIT),
+    ]
+
+    matches = ReconciliationService.match_deposits(deposits, earnings)
+
+    assert {(t.id, e.id) for t, e, _ in matches} == {(10, 1), (11, 2)}
+    assert all(0.5 <= confidence <= 1 for _, _, confidence in matches)
+
+
+def test_payments_prefer_matching_vendor():
+    """Test vendor similarity breaks ties between same-amount expenses."""
+    expenses = [
+        Expense(id=1, amount=Decimal("52.99"), currency="USD", vendor="Dropbox",
+                expense_date=datetime(2024, 3, 5), category=ExpenseCategory.SOFTWARE),
+        Expense(id=2, amount=Decimal("52.99"), currency="USD", vendor="Adobe Inc.",
+                expense_date=datetime(2024, 3, 5), category=ExpenseCategory.SOFTWARE),
+    ]
+    payments = [
+        make_transaction(20, "-52.99", 6, TransactionType.CARD_PAYMENT, merchant="Adobe Creative Cld"),
+    ]
+
+    matches = ReconciliationService.match_payments(payments, expenses)
+
+    assert [(t.id, e.id) for t, e, _ in matches] == [(20, 2)]
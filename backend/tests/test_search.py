@@ -0,0 +1,26 @@
+"""
+Tests for trigram vendor search.
+"""
+from app.services.search_service import TrigramIndex, similarity, trigrams, word_similarity
+
+
+def test_trigrams_match_pg_trgm():
+    """Test words are lowercased and padded like pg_trgm."""
+    assert trigrams("Adobe") == {"  a", " ad", "ado", "dob", "obe", "be "}
+    assert similarity("Adobe", "adobe") == 1.0
+    assert similarity("Adobe", None) == 0.0
+
+
+def test_index_finds_typos_and_partial_names():
+    """Test typeahead tolerates misspellings and ranks exact names first."""
+    index = TrigramIndex(["Adobe Inc.", "ADOBE *CREATIVE CLD", "Figma", "Adorama Camera"])
+
+    assert [name for name, _ in index.search("adbe")] == ["Adobe Inc.", "ADOBE *CREATIVE CLD"]
+    assert index.search("figma")[0] == ("Figma", 1.0)
+    assert index.search("zzz") == []
+
+
+def test_word_similarity_scores_containment():
+    """Test a short name inside a longer bank description scores high."""
+    assert word_similarity("adobe", "ADOBE *CREATIVE CLD") == 1.0
+    assert word_similarity("adobe inc", "ADOBE *CREATIVE CLD") == 0.6
@@ -0,0 +1,44 @@
+"""
+Tests for API process startup cost.
+"""
+import subprocess
+import sys
+
+from app.core.import_profile import profile_import
+
+# Cold `import app.main` in a fresh interpreter, mostly FastAPI and
+# SQLAlchemy. One eager import of prophet, pandas or scikit-learn is
+# enough to blow it.
+IMPORT_BUDGET_MS = 2500
+
+# Loaded on first use only, never by the API at startup
+HEAVY_MODULES = [
+    "numpy", "pandas", "prophet", "sklearn", "joblib", "xgboost",
+    "googleapiclient", "google_auth_oauthlib", "httpx", "celery", "PIL",
+]
+
+
+def test_api_import_skips_heavy_dependencies():
+    """Test that importing the app loads none of the heavy packages."""
+    process = subprocess.run(
+        [
+            sys.executable, "-c",
+            f"import sys, app.main; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert process.stdout.strip() == ""
+
+
+def test_api_import_within_budget():
+    """Test that a cold import of the app stays within the startup budget."""
+    # Best of two, so one slow run on a busy machine doesn't fail the test
+    total_ms = min(
+        next(t.cumulative_ms for t in profile_import("app.main") if t.module == "app.main")
+        for _ in range(2)
+    )
+
+    assert total_ms < IMPORT_BUDGET_MS, f"import app.main took {total_ms:.0f} ms"
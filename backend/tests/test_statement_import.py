@@ -0,0 +1,92 @@
+"""
+Tests for bank statement parsing.
+"""
+import io
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.transaction import TransactionType
+from app.models.user import User
+from app.services.statement_import_service import StatementImportService, StatementFormatError
+
+
+CSV_STATEMENT = """Date,Description,Amount
+2024-01-02,SQ *BLUE BOTTLE COFFEE #123,-4.50
+2024-01-02,SQ *BLUE BOTTLE COFFEE #123,-4.50
+2024-01-03,YOUTUBE PAYOUT 88812345,"1,250.00"
+"""
+
+OFX_STATEMENT = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><CURDEF>EUR
+<BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>POS
+<DTPOSTED>20240105120000.000[-5:EST]
+<TRNAMT>-52.99
+<FITID>2024010501
+<NAME>ADOBE *CREATIVE CLD
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>DIRECTDEP
+<DTPOSTED>20240106
+<TRNAMT>300.00
+<FITID>2024010602
+<NAME>PATREON
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+def test_csv_rows_get_distinct_stable_ids():
+    """Test identical same-day CSV rows are kept apart but stay stable."""
+    rows = list(StatementImportService.iter_csv(io.StringIO(CSV_STATEMENT)))
+    again = list(StatementImportService.iter_csv(io.StringIO(CSV_STATEMENT)))
+
+    assert len(rows) == 3
+    assert rows[0]["external_id"] != rows[1]["external_id"]
+    assert [r["external_id"] for r in rows] == [r["external_id"] for r in again]
+    assert rows[0]["merchant"] == "Blue Bottle Coffee"
+    assert rows[0]["transaction_type"] == TransactionType.WITHDRAWAL
+    assert rows[2]["amount"] == Decimal("1250.00")
+    assert rows[2]["transaction_type"] == TransactionType.DEPOSIT
+
+
+def test_ofx_transactions():
+    """Test OFX blocks are parsed with type, currency and UTC dates."""
+    rows = list(StatementImportService.iter_ofx(io.StringIO(OFX_STATEMENT)))
+
+    assert len(rows) == 2
+    assert rows[0]["external_id"] == "2024010501"
+    assert rows[0]["transaction_type"] == TransactionType.CARD_PAYMENT
+    assert rows[0]["currency"] == "EUR"
+    assert rows[0]["transaction_date"].hour == 17
+    assert rows[1]["transaction_type"] == TransactionType.ACH_IN
+
+
+def test_detect_format():
+    """Test statement format detection from file names."""
+    assert StatementImportService.detect_format("jan.CSV") == "csv"
+    assert StatementImportService.detect_format("jan.qfx") == "ofx"
+    assert StatementImportService.detect_format("jan.pdf") is None
+
+
+@pytest.mark.asyncio
+async def test_failed_import_reports_committed_rows(db_session: AsyncSession):
+    """Test a parse error midway reports the batches kept, and a fixed re-import skips them."""
+    user = User(email="creator@example.com", hashed_password="x")
+    db_session.add(user)
+    await db_session.commit()
+    broken = OFX_STATEMENT.replace(
+        "</BANKTRANLIST>",
+        "<STMTTRN>\n<TRNTYPE>DEBIT\n<DTPOSTED>yesterday\n<TRNAMT>-9.99\n<FITID>2024010703\n</STMTTRN>\n</BANKTRANLIST>",
+    )
+
+    with pytest.raises(StatementFormatError) as error:
+        await StatementImportService.import_statement(db_session, user.id, io.StringIO(broken), "ofx", batch_size=2)
+    assert error.value.totals == {"read": 2, "inserted": 2, "duplicates": 0}
+
+    fixed = broken.replace("<DTPOSTED>yesterday", "<DTPOSTED>20240107")
+    totals = await StatementImportService.import_statement(db_session, user.id, io.StringIO(fixed), "ofx", batch_size=2)
+    assert totals == {"read": 3, "inserted": 1, "duplicates": 2}